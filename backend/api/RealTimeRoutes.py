@@ -2,33 +2,20 @@ from flask import Blueprint, jsonify, request
 from models.video import Video
 from models.motion import MotionData
 import threading
-import cv2
 import numpy as np
-import cloudinary
-import cloudinary.uploader
 import json
 from datetime import datetime
-import mediapipe as mp
 from bson.objectid import ObjectId
 from services.db import get_db
-import os
+from services.lazy import lazy
+from services.pose_pool import get_pose_pool
 # Initialize Blueprint for session_routes
 session_routes = Blueprint('session_routes', __name__, url_prefix="/api/")
 
 # Database Collections
-db = get_db()
-Video_collection = Video(db)
-motion_data_collection = MotionData(db)
-
-# Cloudinary Setup
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-)
-
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
+db = lazy(get_db)
+Video_collection = lazy(lambda: Video(db))
+motion_data_collection = lazy(lambda: MotionData(db))
 
 comparison_running = False  # Track comparison status
 
@@ -59,7 +46,10 @@ def calculate_similarity(reference_pose, live_pose):
 
 def draw_stickman(frame, pose_landmarks, color):
     """Draw stickman on frames to visualize the pose."""
-    for connection in mp_pose.POSE_CONNECTIONS:
+    import cv2
+    import mediapipe as mp
+
+    for connection in mp.solutions.pose.POSE_CONNECTIONS:
         part1 = pose_landmarks[connection[0]]
         part2 = pose_landmarks[connection[1]]
 
@@ -72,6 +62,12 @@ def draw_stickman(frame, pose_landmarks, color):
 
 def compare_live_pose(reference_json, video_url):
     """Compare live pose with reference pose from Cloudinary video."""
+    with get_pose_pool().checkout() as pose:
+        _compare_with_pose(reference_json, video_url, pose)
+
+def _compare_with_pose(reference_json, video_url, pose):
+    import cv2
+
     cap_webcam = cv2.VideoCapture(0)  # Open webcam
     cap_video = cv2.VideoCapture(video_url)  # Open reference video from Cloudinary
 
@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
 from services.db import get_db
+from services.lazy import lazy
 from models.category import Category
 
 category_routes = Blueprint("category_routes", __name__, url_prefix="/api/categories")
-db = get_db()
-category_model = Category(db)
+db = lazy(get_db)
+category_model = lazy(lambda: Category(db))
 
 @category_routes.route("/", methods=["POST"])
 def create_category():
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from services.db import get_db
+from services.lazy import lazy
 from bson import ObjectId
 
 feedback_routes = Blueprint("feedback_routes", __name__, url_prefix="/api/feedback")  # <- Added `url_prefix`
-db = get_db()
+db = lazy(get_db)
 
 @feedback_routes.route("/", methods=["POST"])
 def submit_feedback():
@@ -1,83 +1,114 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from bson.errors import InvalidId
 from services.db import get_db
-from models.user import User
+from services.lazy import lazy
 from models.result import Result
 from services.mail_config import mail
 
 result_routes = Blueprint("result", __name__, url_prefix="/api")
-db = get_db()
-user_model = User(db)
-result_model = Result(db)
+db = lazy(get_db)
+result_model = lazy(lambda: Result(db))
+
+
+def _stream_json_array(documents, serialize):
+    """Stream a cursor as a JSON array so the response starts before the last document is read."""
+    def generate():
+        yield "["
+        for index, document in enumerate(documents):
+            yield ("," if index else "") + current_app.json.dumps(serialize(document))
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+# Streamed serializers read every field with .get(): a KeyError after the opening "[" has been
+# sent would truncate the response. Joined user fields are missing when the profile lacks them.
+def _serialize_result(result):
+    return {
+        "result_id": str(result["_id"]),
+        "user_id": str(result["user_id"]),
+        "name": result.get("name", ""),
+        "image": result.get("image", ""),
+        "email": result.get("email", ""),
+        "is_admin": result.get("is_admin", False),
+        "video_id": str(result["video_id"]),
+        "accuracy_score": result.get("accuracy_score"),
+        "calories_burned": result.get("calories_burned"),
+        "exercise_duration": result.get("exercise_duration"),
+        "steps_taken": result.get("steps_taken"),
+        "movement_efficiency": result.get("movement_efficiency"),
+        "performance_score": result.get("performance_score"),
+        "motion_matching_score": result.get("motion_matching_score"),
+        "user_feedback": result.get("user_feedback"),
+        "energy_expenditure": result.get("energy_expenditure"),
+        "steps_per_minute": result.get("steps_per_minute"),
+        "weight": result.get("weight"),  # Include weight
+        "height": result.get("height"),  # Include height
+        "created_at": result.get("created_at")
+    }
+
+
+def _serialize_leaderboard_entry(entry):
+    return {
+        "user_id": str(entry["_id"]),
+        "name": entry.get("name", ""),
+        "email": entry.get("email", ""),
+        "average_accuracy": entry.get("average_accuracy"),
+        "total_dances": entry.get("total_dances")
+    }
 
 
 @result_routes.route("/leaderboard", methods=["GET"])
 def leaderboard():
     user_id = request.args.get("user_id")  # Optional: Fetch ranking for a specific user
     fetch_all = request.args.get("fetch_all", default="false").lower() == "true"  # Optional: Fetch all results
+    # Optional pagination: limit/offset, or for fetch_all the last result_id already seen as `after`
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", default=0, type=int)
+    after = request.args.get("after")
+
+    try:
+        if fetch_all:
+            # Results of every user (or of user_id), joined with user details in a single aggregation
+            results = result_model.get_enriched_results(user_id, limit, offset, after)
+            return _stream_json_array(results, _serialize_result)
+
+        # Top-K from the precomputed leaderboard, optionally for one video or ISO week
+        leaderboard_data = result_model.get_leaderboard(
+            user_id, limit, offset, request.args.get("video_id"), request.args.get("week")
+        )
+        return _stream_json_array(leaderboard_data, _serialize_leaderboard_entry)
+    except InvalidId:
+        return jsonify({"error": "Invalid user_id or after"}), 400
+
+@result_routes.route("/leaderboard/rank/<user_id>", methods=["GET"])
+def leaderboard_rank(user_id):
+    """A user's rank and aggregate, overall or for ?video_id= / ?week=YYYY-Www"""
+    try:
+        stats = result_model.get_rank(user_id, request.args.get("video_id"), request.args.get("week"))
+    except InvalidId:
+        return jsonify({"error": "Invalid user_id"}), 400
+    if not stats:
+        return jsonify({"error": "User has no results in this leaderboard"}), 404
+
+    return jsonify({
+        "user_id": str(stats["user_id"]),
+        "scope": stats["scope"],
+        "key": stats["key"],
+        "rank": stats["rank"],
+        "average_accuracy": stats["average_accuracy"],
+        "total_dances": stats["total_dances"]
+    }), 200
 
-    if fetch_all:
-        # Fetch all results for all users if user_id is not provided
-        if user_id:
-            user_results = result_model.find_results_by_user(user_id)
-        else:
-            user_results = result_model.get_all_results()
-
-        # Enrich the results with user details
-        enriched_results = []
-        for result in user_results:
-            user = user_model.find_user_by_id(result["user_id"])
-            if user:
-                enriched_results.append({
-                    "result_id": str(result["_id"]),
-                    "user_id": str(result["user_id"]),
-                    "name": user["name"],
-                    "image": user["image"],
-                    "email": user["email"],
-                    "is_admin": user["is_admin"],
-                    "video_id": str(result["video_id"]),
-                    "accuracy_score": result["accuracy_score"],
-                    "calories_burned": result["calories_burned"],
-                    "exercise_duration": result["exercise_duration"],
-                    "steps_taken": result["steps_taken"],
-                    "movement_efficiency": result["movement_efficiency"],
-                    "performance_score": result["performance_score"],
-                    "motion_matching_score": result["motion_matching_score"],
-                    "user_feedback": result["user_feedback"],
-                    "energy_expenditure": result["energy_expenditure"],
-                    "steps_per_minute": result["steps_per_minute"],
-                    "weight": user["weight"],  # Include weight
-                    "height": user["height"],  # Include height
-                    "created_at": result["created_at"]
-                })
-
-        return jsonify(enriched_results), 200
-    else:
-        # Fetch leaderboard data
-        leaderboard_data = result_model.get_leaderboard(user_id)
-
-        # Enrich the leaderboard data with user details
-        enriched_leaderboard = []
-        for entry in leaderboard_data:
-            user = user_model.find_user_by_id(entry["_id"])
-            if user:
-                enriched_leaderboard.append({
-                    "user_id": str(entry["_id"]),
-                    "name": user["name"],
-                    "email": user["email"],
-                    "average_accuracy": entry["average_accuracy"],
-                    "total_dances": entry["total_dances"]
-                })
-
-        return jsonify(enriched_leaderboard), 200
 
 @result_routes.route("/results/<result_id>/archive", methods=["PUT"])
 def archive_result(result_id):
     data = request.get_json()
     archived = data.get("archived", True)
 
-    result = result_model.archive_result(result_id, archived)
+    found = result_model.archive_result(result_id, archived)
 
-    if result.matched_count > 0:
+    if found:
         return jsonify({"message": "Result archived successfully" if archived else "Result unarchived successfully"}), 200
     else:
         return jsonify({"message": "Result not found"}), 404
\ No newline at end of file
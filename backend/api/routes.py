@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify, url_for, redirect
 from services.db import get_db
+from services.lazy import lazy
 from models.user import User
+from services.uploader import configure_cloudinary
 from services.token_utils import generate_token, require_auth, decode_token
 from werkzeug.security import check_password_hash, generate_password_hash
-from cloudinary.uploader import upload, destroy
 from flask_mail import Message
 from services.mail_config import mail
 from bson.objectid import ObjectId
@@ -13,12 +14,15 @@ import string
 def generate_otp(length=6):
     return ''.join(random.choices(string.digits, k=length))
 routes = Blueprint("routes", __name__, url_prefix="/api")
-db = get_db()
-user_model = User(db)
+db = lazy(get_db)
+user_model = lazy(lambda: User(db))
 # result_model = Result(db)
 
 @routes.route("/register", methods=["POST"])
 def register():
+    configure_cloudinary()
+    from cloudinary.uploader import upload
+
     data = request.form
     if user_model.find_user_by_email(data["email"]):
         return jsonify({"error": "User already exists"}), 400
@@ -177,6 +181,9 @@ def update_user_profile(user_id):
 @routes.route("/user/<user_id>/image", methods=["PUT"])
 @require_auth
 def update_user_image(user_id):
+    configure_cloudinary()
+    from cloudinary.uploader import upload, destroy
+
     user = user_model.find_user_by_id(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -1,26 +1,30 @@
-from flask import Blueprint, request, jsonify
+import io
+from flask import Blueprint, Response, request, jsonify
 from models.video import Video
-from models.motion import MotionData
+from models.job import INGEST, FAILED
+from models.motion import MotionData, select_motion_window
 from services.db import get_db
-import tempfile
+from services.lazy import lazy
+from services.ingestion import IngestionQueue
 from bson.objectid import ObjectId
+from config import Config
 import numpy as np
-import cv2
-import mediapipe as mp
 import os
 
-video_routes = Blueprint("video_routes", __name__, url_prefix="/api/videos")
-db = get_db()
-video_model = Video(db)
-motion_model = MotionData(db)
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for format=msgpack
+    msgpack = None
 
-# MediaPipe Pose setup for real-time comparison
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=False, model_complexity=1, smooth_landmarks=True)
+video_routes = Blueprint("video_routes", __name__, url_prefix="/api/videos")
+db = lazy(get_db)
+video_model = lazy(lambda: Video(db))
+motion_model = lazy(lambda: MotionData(db))
+ingestion_queue = lazy(lambda: IngestionQueue(db, video_model))
 
 @video_routes.route("/", methods=["POST"])
 def upload_video():
-    """Upload a new video and extract motion data."""
+    """Queue a new video for upload and motion data extraction."""
     data = request.form
     category_id = data.get("category_id")
     title = data.get("title")
@@ -31,56 +35,84 @@ def upload_video():
         return jsonify({"error": "Category ID, title, and video file are required"}), 400
 
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_video:
-            video_file.save(temp_video.name)
-            temp_path = temp_video.name
+        # Upload and extraction run in the background; clients poll the job
+        temp_path = ingestion_queue.save_upload(video_file)
+        job_id = ingestion_queue.enqueue(temp_path, category_id, title, description, socket_id=data.get("socket_id"))
 
-        # Upload video and extract motion data
-        video = video_model.upload_video(category_id, title, temp_path, description)
-        video_id = str(video.inserted_id)
+        return jsonify({"message": "Video queued for processing", "job_id": job_id}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Extract motion data and store it in the motion_data collection
-        motion_model = MotionData(db)  # Assuming db is your MongoDB client
-        motion_model.extract_motion_data(temp_path, video_id)
 
-        os.remove(temp_path)  # Cleanup after processing
+def _job_video_id(job):
+    """A new video's ID is reserved before its upload; report it only once the video exists."""
+    pending_upload = job.get("kind", INGEST) == INGEST and not job.get("replace") and not job.get("uploaded")
+    return str(job["video_id"]) if job.get("video_id") and not pending_upload else None
 
-        return jsonify({"message": "Video uploaded and motion data extracted", "id": video_id}), 201
-    except Exception as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)  # Ensure cleanup on failure
-        return jsonify({"error": str(e)}), 500
+
+@video_routes.route("/jobs/<job_id>", methods=["GET"])
+def get_ingestion_job(job_id):
+    """Get the state and progress of a video ingestion job"""
+    if not ObjectId.is_valid(job_id):
+        return jsonify({"error": "Invalid job ID"}), 400
+    job = ingestion_queue.jobs.find_job_by_id(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({
+        "id": str(job["_id"]),
+        "state": job["state"],
+        "progress": job["progress"],
+        "kind": job.get("kind", INGEST),
+        "video_id": _job_video_id(job),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "retryable": job["state"] == FAILED and bool(job.get("file_path")),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }), 200
 
 
+@video_routes.route("/jobs/<job_id>/retry", methods=["POST"])
+def retry_ingestion_job(job_id):
+    """Requeue a failed ingestion job from its kept upload file"""
+    if not ObjectId.is_valid(job_id):
+        return jsonify({"error": "Invalid job ID"}), 400
+    if not ingestion_queue.retry(job_id):
+        return jsonify({"error": "Job not found or cannot be retried"}), 409
+
+    return jsonify({"message": "Job queued for retry", "job_id": job_id}), 202
+
 
 @video_routes.route("/", methods=["GET"])
 def get_videos():
-    """Get all videos or filter by category"""
+    """Get all videos or filter by category, optionally paged with limit/offset"""
     category_id = request.args.get("category_id")
-    videos = video_model.get_all_videos(category_id)
-
-    # Fetch motion data for each video to get the duration
-    video_list = []
-    for video in videos:
-        video_id = str(video["_id"])
-        motion_data = db["motion_data"].find_one({"video_id": ObjectId(video_id)})
-
-        # Include duration from motion_data if available
-        duration = motion_data["duration"] if motion_data else None
-
-        video_list.append({
-            "id": video_id,
-            "title": video["title"],
-            "description": video["description"],
-            "video_url": video["video_url"],
-            "thumbnail_url": video.get("thumbnail_url", ""),  # Include thumbnail URL
-            "category_id": str(video["category_id"]), 
-            "created_at": video["created_at"],
-            "updated_at": video["updated_at"],
-            "duration": duration  # Add duration to the response
-        })
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", default=0, type=int)
+
+    # One projected query; duration and fps are stored on the video document itself
+    video_list = [{
+        "id": str(video["_id"]),
+        "title": video["title"],
+        "description": video["description"],
+        "video_url": video["video_url"],
+        "thumbnail_url": video.get("thumbnail_url", ""),  # Include thumbnail URL
+        "category_id": str(video["category_id"]),
+        "created_at": video["created_at"],
+        "updated_at": video["updated_at"],
+        "duration": video.get("duration"),
+        "fps": video.get("fps"),
+        "frame_count": video.get("frame_count")
+    } for video in video_model.list_videos(category_id, limit, offset)]
 
-    return jsonify(video_list), 200
+    response = jsonify(video_list)
+    if limit:
+        response.headers["X-Total-Count"] = str(video_model.count_videos(category_id))
+    # Clients revalidate with If-None-Match and get a bodiless 304 when nothing changed
+    response.add_etag()
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 
 @video_routes.route("/<video_id>", methods=["GET"])
@@ -115,6 +147,95 @@ def get_video_by_id(video_id):
 
 
 
+def _parse_joints(value, num_joints):
+    """Comma-separated joint indices, or None for all joints; raises ValueError when invalid."""
+    if not value:
+        return None
+    joints = [int(joint) for joint in value.split(",")]
+    if any(joint < 0 or joint >= num_joints for joint in joints):
+        raise ValueError(f"Joint indices must be between 0 and {num_joints - 1}")
+    return joints
+
+
+def _encode_motion_window(window, output_format):
+    """Serialize a motion window as (body, mimetype) in the requested format."""
+    if output_format == "npy":
+        # One structured record per frame; numpy.load / npy readers restore the fields
+        num_joints = len(window["joints"])
+        records = np.zeros(len(window["frame_numbers"]), dtype=[
+            ("frame_number", "<i4"), ("timestamp", "<f4"),
+            ("keypoints", "<f4", (num_joints, 3)), ("visibility", "<f4", (num_joints,))
+        ])
+        records["frame_number"] = window["frame_numbers"]
+        records["timestamp"] = window["timestamps"]
+        records["keypoints"] = window["keypoints"]
+        records["visibility"] = window["visibility"]
+        buffer = io.BytesIO()
+        np.save(buffer, records, allow_pickle=False)
+        return buffer.getvalue(), "application/octet-stream"
+
+    if output_format == "msgpack":
+        # Little-endian raw arrays; shapes let the client view them without copying
+        return msgpack.packb({
+            "fps": float(window["fps"]),
+            "joints": window["joints"].tolist(),
+            "shape": list(window["keypoints"].shape),
+            "frame_numbers": window["frame_numbers"].astype("<i4").tobytes(),
+            "timestamps": window["timestamps"].astype("<f4").tobytes(),
+            "keypoints": window["keypoints"].astype("<f4").tobytes(),
+            "visibility": window["visibility"].astype("<f4").tobytes()
+        }), "application/x-msgpack"
+
+    return None, None
+
+
+@video_routes.route("/<video_id>/motion", methods=["GET"])
+def get_motion_window(video_id):
+    """Get a window of a video's motion frames: ?start=&end= (seconds), ?joints=0,11,12, ?fps=, ?format=json|npy|msgpack"""
+    if not ObjectId.is_valid(video_id):
+        return jsonify({"error": "Invalid video ID"}), 400
+    output_format = request.args.get("format", "json")
+    if output_format not in ("json", "npy", "msgpack"):
+        return jsonify({"error": "format must be json, npy or msgpack"}), 400
+    if output_format == "msgpack" and msgpack is None:
+        return jsonify({"error": "msgpack output is not available on this server"}), 406
+
+    motion_data = motion_model.get_motion_data(video_id, as_arrays=True)
+    if not motion_data:
+        return jsonify({"error": "Motion data not found"}), 404
+
+    try:
+        joints = _parse_joints(request.args.get("joints"), motion_data["keypoints"].shape[1])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    start = request.args.get("start", type=float)
+    end = request.args.get("end", type=float)
+    window = select_motion_window(motion_data, start, end, joints, request.args.get("fps", type=float))
+
+    if output_format == "json":
+        response = jsonify({
+            "video_id": video_id,
+            "fps": window["fps"],
+            "joints": window["joints"].tolist(),
+            "frame_numbers": window["frame_numbers"].tolist(),
+            "timestamps": window["timestamps"].astype(np.float64).tolist(),
+            # Rounded in float64 so values come back as 0.123 rather than float32 noise
+            "keypoints": np.round(window["keypoints"].astype(np.float64), 3).tolist(),
+            "visibility": np.round(window["visibility"].astype(np.float64), 3).tolist()
+        })
+    else:
+        body, mimetype = _encode_motion_window(window, output_format)
+        response = Response(body, mimetype=mimetype)
+
+    response.headers["X-Motion-Fps"] = str(window["fps"])
+    response.headers["X-Frame-Count"] = str(len(window["frame_numbers"]))
+    timestamps = motion_data["timestamps"]
+    if end is not None and len(timestamps) and timestamps[-1] >= end:
+        response.headers["X-Next-Start"] = str(end)  # More frames follow; request the next window from here
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @video_routes.route("/<video_id>", methods=["DELETE"])
 def delete_video(video_id):
     """Delete a video by ID"""
@@ -142,15 +263,46 @@ def update_video(video_id):
         "category_id": ObjectId(data["category_id"]),
     }
 
-    # If a new video file is provided, update it
-    if video_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_video:
-            video_file.save(temp_video.name)
-            temp_path = temp_video.name
-            video_model.upload_video(data["category_id"], data["title"], temp_path, data.get("description", ""))
-
     # Update video metadata
     video_model.update_video(video_id, updated_data)
 
+    # If a new video file is provided, replace it and re-extract its motion data in the background
+    if video_file:
+        temp_path = ingestion_queue.save_upload(video_file)
+        job_id = ingestion_queue.enqueue(
+            temp_path, data["category_id"], data["title"], data.get("description", ""), video_id=video_id,
+            socket_id=data.get("socket_id")
+        )
+        return jsonify({"message": "Video updated, new file queued for processing", "job_id": job_id}), 202
+
     return jsonify({"message": "Video updated successfully"}), 200
 
+
+
+@video_routes.route("/<video_id>/score", methods=["POST"])
+def score_recorded_attempt(video_id):
+    """Queue scoring a recorded attempt at a video; the summary is stored as a result and on the job"""
+    user_id = request.form.get("user_id")
+    video_file = request.files.get("video_file")
+    if not user_id or not video_file:
+        return jsonify({"error": "User ID and video file are required"}), 400
+    if not ObjectId.is_valid(video_id) or not ObjectId.is_valid(user_id):
+        return jsonify({"error": "Invalid video or user ID"}), 400
+    if not video_model.find_video_by_id(video_id):
+        return jsonify({"error": "Video not found"}), 404
+
+    from services.extraction import video_properties
+
+    temp_path = ingestion_queue.save_upload(video_file)
+    try:
+        fps, frame_count = video_properties(temp_path)
+    except Exception as e:
+        os.remove(temp_path)
+        return jsonify({"error": str(e)}), 400
+    # Rejected before any extraction so one long upload cannot tie up a worker
+    if fps and frame_count / fps > Config.MAX_RECORDING_SECONDS:
+        os.remove(temp_path)
+        return jsonify({"error": f"Recordings longer than {Config.MAX_RECORDING_SECONDS:g} seconds cannot be scored"}), 413
+
+    job_id = ingestion_queue.enqueue_score(temp_path, video_id, user_id, socket_id=request.form.get("socket_id"))
+    return jsonify({"message": "Recording queued for scoring", "job_id": job_id}), 202
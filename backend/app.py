@@ -1,48 +1,63 @@
+import os
 import threading
 import numpy as np
-import cv2
-import base64
 import time
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, jsonify, request
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
-import mediapipe as mp
+from flask_socketio import join_room
 from services.db import get_db
+from services.lazy import lazy
 from models.video import Video
 from models.result import Result
 from models.user import User
 from models.motion import MotionData
+from services.scoring import (
+    score_pose, score_features, pose_to_array, landmarks_to_array, get_feedback, session_summary,
+    completion_payload
+)
+from services.pose_features import pose_features
 from config import Config
 
 from api.resultRoutes import result_routes
 from api.routes import routes
 from api.categoryRoutes import category_routes
-from api.videoRoutes import video_routes
+from api.videoRoutes import video_routes, ingestion_queue
+from services.ingestion import job_room
 from services.mail_config import configure_mail
+from services.socket_config import socketio, configure_socketio
+from services.pose_pool import get_pose_pool
+from services.alignment import OnlineAligner
+from services.pipeline import Pipeline
+from services.frame_skipping import FrameSkipper
+from services.sessions import SessionManager, SessionLimitReached, CALIBRATING, RUNNING, FAILED
+from services.indexes import ensure_indexes
+from services.metrics import (
+    configure_metrics, registry, observe_stage, time_stage,
+    LIVE_FRAMES, LIVE_FRAMES_WITHOUT_LANDMARKS, LIVE_FRAMES_EXTRAPOLATED, LIVE_SESSIONS_ACTIVE
+)
 from dotenv import load_dotenv
 from api.feedbackRoutes import feedback_routes
 load_dotenv()
 
-app = Flask(__name__)
-app.config.from_object(Config)
-configure_mail(app)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
-CORS(app) 
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Importing this module connects to nothing and loads no model: the database,
+# models and session manager are built on first use, and OpenCV/MediaPipe are
+# imported by the code that processes frames.
+live_routes = Blueprint("live_routes", __name__)
 
-db = get_db()
-app.config["VIDEO_INSTANCE"] = Video(db)
+db = lazy(get_db)
+# One pooled estimator per concurrent session instead of a single shared Pose
+session_manager = lazy(lambda: SessionManager(get_pose_pool(model_complexity=1), Config.MAX_SESSIONS))
+registry.add_collector(lambda: LIVE_SESSIONS_ACTIVE.set(session_manager.active_count()))
 
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-
-comparison_running = False
-video_model = Video(db)
-user_model = User(db)
-motion_data = MotionData(db)
+video_model = lazy(lambda: Video(db))
+user_model = lazy(lambda: User(db))
+motion_data = lazy(lambda: MotionData(db))
 
 def draw_stickman(frame, landmarks, color):
-    for connection in mp_pose.POSE_CONNECTIONS:
+    import cv2
+    import mediapipe as mp
+
+    for connection in mp.solutions.pose.POSE_CONNECTIONS:
         part1_idx, part2_idx = connection
         keypoint1 = landmarks.get(f"keypoint_{part1_idx}")
         keypoint2 = landmarks.get(f"keypoint_{part2_idx}")
@@ -58,313 +73,455 @@ def calculate_similarity(ref_pose, live_pose):
     if len(ref_pose) != len(live_pose):
         return 0
 
-    total_score = 0
-    num_keypoints = len(ref_pose)
-
-    for i in range(num_keypoints):
-        ref_key = f"keypoint_{i}"
-        live_key = f"keypoint_{i}"
-
-        if ref_key in ref_pose and live_key in live_pose:
-            ref_coords = np.array([ref_pose[ref_key]['x'], ref_pose[ref_key]['y']])
-            live_coords = np.array([live_pose[live_key]['x'], live_pose[live_key]['y']])
-            distance = np.linalg.norm(ref_coords - live_coords)
-            total_score += max(0, 1 - distance)
-
-    return (total_score / num_keypoints) * 100  
+    similarity, _, _ = score_pose(pose_to_array(ref_pose), pose_to_array(live_pose))
+    return similarity
 
-def get_feedback(score):
-    if score >= 90:
-        return "PERFECT!", (0, 255, 0)
-    elif score >= 75:
-        return "GREAT!", (0, 200, 255)
-    elif score >= 50:
-        return "GOOD!", (0, 165, 255)
-    else:
-        return "KEEP TRYING!", (0, 0, 255)
+def calculate_euclidean_distance(ref_pose, live_pose):
+    if len(ref_pose) != len(live_pose):
+        return float('inf')  # Return infinity if the poses don't match
 
-def calculate_metrics(weight_kg, duration_minutes, steps_taken, accuracy_score, active_frames, total_frames):
-    # Calculate activity level: percentage of frames where the user was active
-    activity_level = active_frames / total_frames if total_frames > 0 else 0
+    _, distance, _ = score_pose(pose_to_array(ref_pose), pose_to_array(live_pose))
+    return distance  # Average distance
 
-    # Adjust MET value based on activity level
-    # MET = 1.0 for no activity (resting), 5.0 for full activity
-    met_value = 1.0 + (4.0 * activity_level)  # Scales from 1.0 to 5.0 based on activity
+def create_streamer(session, fps):
+    from services.streaming import FrameStreamer
 
-    # Calculate calories burned based on adjusted MET value
-    calories_burned = (met_value * weight_kg * duration_minutes) / 60
+    return FrameStreamer(
+        session.id, session.room,
+        target_bitrate=Config.STREAM_TARGET_BITRATE,
+        max_fps=fps,
+        image_format=Config.STREAM_FORMAT,
+        max_in_flight=Config.STREAM_MAX_IN_FLIGHT,
+        binary=Config.STREAM_BINARY,
+        observer=lambda stage, seconds: observe_stage(session.kind, stage, seconds)
+    )
 
-    # Calculate other metrics
-    steps_per_minute = steps_taken / duration_minutes if duration_minutes > 0 else 0
-    energy_expenditure = calories_burned * 4184  # Convert calories to joules
-    movement_efficiency = (accuracy_score / 100) * steps_taken
-    performance_score = (accuracy_score + movement_efficiency) / 2
+def open_reference(video_id, video, motion_data):
+    """Reference frames from the local transcode cache, Cloudinary, or rendered from stored keypoints."""
+    from services.reference import ReferenceSource
 
-    return calories_burned, steps_per_minute, energy_expenditure, movement_efficiency, performance_score
+    return ReferenceSource(video_id, video["video_url"], motion_data, Config.REFERENCE_RENDER == "keypoints")
 
-def calculate_euclidean_distance(ref_pose, live_pose):
-    if len(ref_pose) != len(live_pose):
-        return float('inf')  # Return infinity if the poses don't match
+def create_roi_tracker():
+    from services.roi import RoiTracker
 
-    total_distance = 0
-    num_keypoints = len(ref_pose)
+    return RoiTracker(Config.ROI_PADDING, Config.ROI_MAX_SIDE) if Config.ROI_CROPPING else None
 
-    for i in range(num_keypoints):
-        ref_key = f"keypoint_{i}"
-        live_key = f"keypoint_{i}"
+def detect_pose(pose, frame, roi=None):
+    """Landmarks (J, 2) of a BGR frame in full-frame normalized coordinates, or None."""
+    import cv2
 
-        if ref_key in ref_pose and live_key in live_pose:
-            ref_coords = np.array([ref_pose[ref_key]['x'], ref_pose[ref_key]['y']])
-            live_coords = np.array([live_pose[live_key]['x'], live_pose[live_key]['y']])
-            distance = np.linalg.norm(ref_coords - live_coords)
-            total_distance += distance
+    if roi is not None:
+        return roi.detect(pose, frame)  # Crop around the person found in the previous frame
+    results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
 
-    return total_distance / num_keypoints  # Average distance
+def compare_live_pose(session):
+    import cv2
 
-def compare_live_pose(video_id, user_id):
-    global comparison_running
-    comparison_running = True
+    video_id, user_id, pose = session.video_id, session.user_id, session.pose
+    session.kind = "comparison"
+    session.state = RUNNING
 
     video = video_model.find_video_by_id(video_id)
     user = user_model.find_user_by_id(user_id)
     if not video or not user:
-        socketio.emit('comparison_error', {'message': 'Video or User not found'})
-        comparison_running = False
+        socketio.emit('comparison_error', {'message': 'Video or User not found'}, to=session.room)
+        session.state = FAILED
+        session.error = 'Video or User not found'
         return
 
     # Load preprocessed motion data
-    motion_data = MotionData(db).get_motion_data(video_id)
-    if not motion_data or "frames" not in motion_data:
-        socketio.emit('comparison_error', {'message': 'No preprocessed motion data found'})
-        comparison_running = False
+    motion_data = MotionData(db).get_motion_data(video_id, as_arrays=True)
+    if not motion_data or not len(motion_data["keypoints"]):
+        socketio.emit('comparison_error', {'message': 'No preprocessed motion data found'}, to=session.room)
+        session.state = FAILED
+        session.error = 'No preprocessed motion data found'
         return
 
-    reference_poses = motion_data["frames"]  # Use preprocessed keypoints
+    reference_poses = motion_data["keypoints"][:, :, :2]  # (T, J, 2) preprocessed keypoints
+    reference_frame_numbers = motion_data["frame_numbers"]
     fps = motion_data["fps"]  # Get FPS for synchronization
 
+    # Score in hip-centred, torso-scaled space (precomputed at ingestion) unless raw image space is configured
+    use_features = Config.SCORING_SPACE == "normalized"
+    reference_space = motion_data["normalized"] if use_features else reference_poses
+    reference_angles = motion_data["angles"]
+
+    # Align live poses to the reference with banded DTW instead of strict lockstep
+    aligner = OnlineAligner(reference_space, Config.ALIGNMENT_WINDOW, Config.ALIGNMENT_MAX_STEP) \
+        if Config.ALIGNMENT_WINDOW > 0 else None
+
+    # Full inference on every k-th frame within the session's budget; the frames in between are extrapolated
+    skipper = FrameSkipper(
+        session.inference_budget_ms / 1000, Config.FRAME_SKIP_MAX, Config.FRAME_SKIP_MOTION_THRESHOLD
+    ) if session.inference_budget_ms else None
+    roi = create_roi_tracker()
+
     weight_kg = float(user["weight"])
-    cap_webcam = cv2.VideoCapture(0)
-    cap_video = cv2.VideoCapture(video["video_url"])
+    cap_webcam = cv2.VideoCapture(session.camera_index)
+    reference = open_reference(video_id, video, motion_data)
+    session.stats["reference_source"] = reference.source
 
     frame_index = 0
     total_score = 0
     total_frames = 0  # Track all frames
     active_frames = 0  # Track frames where the user is actively detected
+    extrapolated_frames = 0  # Frames scored on an extrapolated pose (frame skipping)
     start_time = time.time()
     steps_taken = 0
 
-    while cap_webcam.isOpened() and cap_video.isOpened():
-        ret_webcam, frame_webcam = cap_webcam.read()
-        ret_video, frame_video = cap_video.read()
+    # Capture -> inference -> scoring -> encode/emit run on separate threads joined
+    # by bounded drop-oldest queues, so a slow stage drops stale frames instead of
+    # delaying the fresh ones.
+    def capture_frames():
+        next_frame_at = time.perf_counter()
+        while cap_webcam.isOpened() and reference.is_open() and not session.stopped:
+            with time_stage(session.kind, "capture"):
+                ret_webcam, frame_webcam = cap_webcam.read()
+                if not ret_webcam:
+                    break
+
+                # Already at display size when cached or rendered; resized only when streamed
+                height, width, _ = frame_webcam.shape
+                ret_video, frame_video_resized = reference.read(width, height)
+                if not ret_video:
+                    break
+                reference_frame_no = reference.frame_no
+            yield frame_webcam, frame_video_resized, reference_frame_no
+
+            # Synchronize with the reference video's FPS; wakes up early when the session is stopped
+            next_frame_at += 1 / fps
+            if session.wait(max(0, next_frame_at - time.perf_counter())):
+                break
 
-        if not ret_webcam or not ret_video:
-            break
+    def run_inference(frames):
+        frame_webcam, frame_video_resized, reference_frame_no = frames
 
-        height, width, _ = frame_webcam.shape
-        frame_video_resized = cv2.resize(frame_video, (width, height))
+        def detect():
+            return detect_pose(pose, frame_webcam, roi)
 
-        frame_rgb = cv2.cvtColor(frame_webcam, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
+        if skipper is None:
+            live_pose, extrapolated = detect(), False
+        elif skipper.should_infer():
+            live_pose, extrapolated = skipper.infer(detect), False
+        else:
+            live_pose, extrapolated = skipper.extrapolate(), True
+        return frame_webcam, frame_video_resized, reference_frame_no, live_pose, extrapolated
 
-        total_frames += 1  # Count all frames
+    def score_frame(inferred):
+        nonlocal frame_index, total_score, total_frames, active_frames, extrapolated_frames, steps_taken
+        frame_webcam, frame_video_resized, reference_frame_no, live_pose, extrapolated = inferred
 
-        if results.pose_landmarks:
+        total_frames += 1  # Count all frames
+        LIVE_FRAMES.inc(kind=session.kind)
+        if live_pose is None:
+            LIVE_FRAMES_WITHOUT_LANDMARKS.inc(kind=session.kind)
+        elif extrapolated:
+            extrapolated_frames += 1
+            LIVE_FRAMES_EXTRAPOLATED.inc(kind=session.kind)
+
+        if live_pose is not None:
             active_frames += 1  # Count frames where the user is actively detected
-            live_keypoints = {f"keypoint_{i}": {"x": lm.x, "y": lm.y, "z": lm.z} for i, lm in enumerate(results.pose_landmarks.landmark)}
-
-            if frame_index < len(reference_poses):
-                reference_pose = reference_poses[frame_index]["keypoints"]
-                frame_score = calculate_similarity(reference_pose, live_keypoints)
+            if use_features:
+                # Normalized coordinates and joint angles in one vectorized step
+                live_space, live_angles = pose_features(live_pose)
+            else:
+                live_space = live_pose
+
+            if aligner is not None:
+                # Best-matching reference frame within the lag window around the one on screen
+                expected_index = int(np.searchsorted(reference_frame_numbers, reference_frame_no))
+                reference_index, _ = aligner.update(live_space, expected_index)
+            else:
+                reference_index = frame_index  # Lockstep: one reference frame per detected frame
+
+            if reference_index < len(reference_poses):
+                # Similarity and Euclidean distance in a single vectorized pass
+                if use_features:
+                    frame_score, distance, _ = score_features(
+                        reference_space[reference_index], live_space,
+                        reference_angles[reference_index], live_angles,
+                        Config.NORMALIZED_TOLERANCE, Config.ANGLE_WEIGHT
+                    )
+                    frame_score, distance = float(frame_score), float(distance)
+                else:
+                    frame_score, distance, _ = score_pose(reference_poses[reference_index], live_pose)
                 total_score += frame_score
                 feedback, color = get_feedback(frame_score)
-                # draw_stickman(frame_webcam, live_keypoints, color)
-                # draw_stickman(frame_video_resized, reference_pose, (255, 255, 255))
 
-                # Calculate Euclidean distance
-                distance = calculate_euclidean_distance(reference_pose, live_keypoints)
                 distance_text = f"Distance: {distance:.2f}"
                 cv2.putText(frame_webcam, distance_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
-                # Check if the user is in the correct starting position
-                # if distance < 0.10:  # Threshold for correct position
-                #     cv2.putText(frame_webcam, "Correct Position", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                # else:
-                #     cv2.putText(frame_webcam, "Adjust Position", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
                 # Calculate text position for feedback at the top
                 text_size = cv2.getTextSize(feedback, cv2.FONT_HERSHEY_SIMPLEX, 1, 5)[0]
                 text_x = (frame_webcam.shape[1] - text_size[0]) // 2  # Center horizontally
                 text_y = text_size[1] + 10  # Place at the top with a small margin
                 cv2.putText(frame_webcam, feedback, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 5)
 
-                # Place the score below the feedback
-                cv2.putText(frame_webcam, f"Score: {frame_score:.2f}%", (10, text_y + text_size[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                # Place the score below the feedback; scores on extrapolated poses are marked as estimates
+                score_text = f"Score: {frame_score:.2f}%" + (" (est.)" if extrapolated else "")
+                cv2.putText(frame_webcam, score_text, (10, text_y + text_size[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
                 steps_taken += 1  # Only count steps when a person is detected
                 frame_index += 1
-        else:
-            # Assign a score of 0 for frames where no person is detected
-            total_score += 0
-
-        combined_frame = cv2.hconcat([frame_webcam, frame_video_resized])
-        _, buffer = cv2.imencode('.jpg', combined_frame)
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        socketio.emit('video_frame', {'frame': frame_base64})
-
-        # Synchronize with the reference video's FPS
-        delay = int(1000 / fps)  # Delay in milliseconds
-        if cv2.waitKey(delay) & 0xFF == ord('q'):
-            break
 
-    cap_webcam.release()
-    cap_video.release()
-    cv2.destroyAllWindows()
+        session.stats.update(
+            total_frames=total_frames,
+            active_frames=active_frames,
+            extrapolated_frames=extrapolated_frames,
+            average_score=total_score / total_frames
+        )
+        if skipper is not None:
+            session.stats["frame_skipping"] = skipper.stats()
+        if roi is not None:
+            session.stats["roi"] = roi.stats()
+        return cv2.hconcat([frame_webcam, frame_video_resized])
+
+    session.streamer = create_streamer(session, fps)
+
+    session.pipeline = (
+        Pipeline(
+            queue_size=Config.PIPELINE_QUEUE_SIZE,
+            observer=lambda stage, seconds: observe_stage(session.kind, stage, seconds)
+        )
+        .source("capture", capture_frames)
+        .stage("inference", run_inference)
+        .stage("scoring", score_frame)
+        .stage("emit", session.streamer.send)
+    )
+    try:
+        session.pipeline.run()
+    finally:
+        cap_webcam.release()
+        reference.release()
 
-    comparison_running = False
-    final_average_score = total_score / total_frames if total_frames > 0 else 0  # Average over all frames
     duration_minutes = float((time.time() - start_time) / 60)
 
     # Calculate metrics with activity level
-    calories_burned, steps_per_minute, energy_expenditure, movement_efficiency, performance_score = calculate_metrics(
-        weight_kg, duration_minutes, steps_taken, final_average_score, active_frames, total_frames
-    )
+    summary = session_summary(weight_kg, duration_minutes, total_score, total_frames, active_frames, steps_taken)
 
-    weight_loss_kg = calories_burned / 7700
+    weight_loss_kg = summary["calories_burned"] / 7700
     new_weight = weight_kg - weight_loss_kg
     user_model.update_user(user_id, {"weight": new_weight})
 
-    result = Result(db)
-    result.create_result(
-        video_id=video_id,
-        user_id=user_id,
-        accuracy_score=final_average_score,
-        calories_burned=calories_burned,
-        exercise_duration=duration_minutes,
-        steps_taken=steps_taken,
-        movement_efficiency=movement_efficiency,
-        performance_score=performance_score,
-        motion_matching_score=final_average_score,
-        user_feedback=get_feedback(final_average_score)[0],
-        energy_expenditure=energy_expenditure,
-        steps_per_minute=steps_per_minute
-    )
+    Result(db).create_result(video_id=video_id, user_id=user_id, **summary)
 
     # Emit all results to the frontend
-    socketio.emit('comparison_complete', {
-        'final_score': final_average_score,
-        'calories_burned': calories_burned,
-        'steps_taken': steps_taken,
-        'steps_per_minute': steps_per_minute,
-        'exercise_duration': duration_minutes,
-        'movement_efficiency': movement_efficiency,
-        'performance_score': performance_score,
-        'energy_expenditure': energy_expenditure,
-        'user_feedback': get_feedback(final_average_score)[0]
-    })
-    print(f"Final Average Accuracy Score: {final_average_score:.2f}%")
-
-@app.route('/start_calibration', methods=['POST'])
-def start_calibration():
-    global comparison_running
-
-    video_id = request.json.get("video_id")
-    user_id = request.json.get("user_id")
-    if not video_id or not user_id:
-        return jsonify({"error": "Video ID and User ID are required"}), 400
-
-    with comparison_lock:
-        if comparison_running:
-            return jsonify({"error": "Comparison already running"}), 400
-        comparison_running = True
+    socketio.emit('comparison_complete', completion_payload(summary), to=session.room)
+    print(f"Final Average Accuracy Score: {summary['accuracy_score']:.2f}%")
 
-    threading.Thread(target=calibrate_position, args=(video_id, user_id)).start()
-    return jsonify({"message": "Calibration started"}), 200
+def calibrate_position(session):
+    import cv2
 
-def calibrate_position(video_id, user_id):
-    global comparison_running
-    comparison_running = True
+    video_id, user_id, pose = session.video_id, session.user_id, session.pose
+    session.state = CALIBRATING
 
     video = video_model.find_video_by_id(video_id)
     user = user_model.find_user_by_id(user_id)
     if not video or not user:
-        socketio.emit('calibration_error', {'message': 'Video or User not found'})
-        comparison_running = False
+        socketio.emit('calibration_error', {'message': 'Video or User not found'}, to=session.room)
+        session.state = FAILED
+        session.error = 'Video or User not found'
         return
 
-    motion_data = MotionData(db).get_motion_data(video_id)
-    if not motion_data or "frames" not in motion_data:
-        socketio.emit('calibration_error', {'message': 'No preprocessed motion data found'})
-        comparison_running = False
+    motion_data = MotionData(db).get_motion_data(video_id, as_arrays=True)
+    if not motion_data or not len(motion_data["keypoints"]):
+        socketio.emit('calibration_error', {'message': 'No preprocessed motion data found'}, to=session.room)
+        session.state = FAILED
+        session.error = 'No preprocessed motion data found'
         return
 
-    reference_poses = motion_data["frames"]
+    reference_pose = motion_data["keypoints"][0, :, :2]  # Use the first frame as reference
     fps = motion_data["fps"]
 
-    cap_webcam = cv2.VideoCapture(0)
-    cap_video = cv2.VideoCapture(video["video_url"])
+    cap_webcam = cv2.VideoCapture(session.camera_index)
+    # The reference only paces calibration (it is not shown), so its frames are skipped, not decoded
+    reference = open_reference(video_id, video, motion_data)
+    session.streamer = create_streamer(session, fps)
+    roi = create_roi_tracker()
+    calibrated = False
 
-    while cap_webcam.isOpened() and cap_video.isOpened():
-        ret_webcam, frame_webcam = cap_webcam.read()
-        ret_video, frame_video = cap_video.read()
+    while cap_webcam.isOpened() and reference.is_open() and not session.stopped:
+        with time_stage(session.kind, "capture"):
+            ret_webcam, frame_webcam = cap_webcam.read()
+            ret_video = reference.advance()
 
         if not ret_webcam or not ret_video:
             break
 
-        frame_rgb = cv2.cvtColor(frame_webcam, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
+        with time_stage(session.kind, "inference"):
+            live_pose = detect_pose(pose, frame_webcam, roi)
+
+        LIVE_FRAMES.inc(kind=session.kind)
+        if live_pose is None:
+            LIVE_FRAMES_WITHOUT_LANDMARKS.inc(kind=session.kind)
 
-        if results.pose_landmarks:
-            live_keypoints = {f"keypoint_{i}": {"x": lm.x, "y": lm.y, "z": lm.z} for i, lm in enumerate(results.pose_landmarks.landmark)}
-            reference_pose = reference_poses[0]["keypoints"]  # Use the first frame as reference
-            distance = calculate_euclidean_distance(reference_pose, live_keypoints)
+        if live_pose is not None:
+            with time_stage(session.kind, "scoring"):
+                _, distance, _ = score_pose(reference_pose, live_pose)
 
-            socketio.emit('calibration_data', {'distance': distance})
+            socketio.emit('calibration_data', {'distance': distance}, to=session.room)
 
             if distance < 0.1:  # Threshold for correct position
-                socketio.emit('calibration_complete')
-                compare_live_pose(video_id, user_id)  # Automatically start the comparison
+                socketio.emit('calibration_complete', {'session_id': session.id}, to=session.room)
+                calibrated = True
                 break
 
-        _, buffer = cv2.imencode('.jpg', frame_webcam)
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
-        socketio.emit('video_frame', {'frame': frame_base64})
+        session.streamer.send(frame_webcam)
 
-        delay = int(1000 / fps)
-        if cv2.waitKey(delay) & 0xFF == ord('q'):
+        if session.wait(1 / fps):
             break
 
     cap_webcam.release()
-    cap_video.release()
-    cv2.destroyAllWindows()
-    comparison_running = False
-comparison_lock = threading.Lock()
+    reference.release()
 
-@app.route('/start_comparison', methods=['POST'])
-def start_comparison():
-    global comparison_running
+    if calibrated:
+        compare_live_pose(session)  # Automatically start the comparison in the same session
 
+def start_session(kind, target):
     video_id = request.json.get("video_id")
     user_id = request.json.get("user_id")
     if not video_id or not user_id:
         return jsonify({"error": "Video ID and User ID are required"}), 400
 
-    with comparison_lock:
-        if comparison_running:
-            return jsonify({"error": "Comparison already running"}), 400
-        comparison_running = True
-
-    threading.Thread(target=compare_live_pose, args=(video_id, user_id)).start()
-    return jsonify({"message": "Comparison started"}), 200
+    # Frame skipping: a per-session inference budget (0 = infer every frame), else the configured default
+    inference_budget_ms = request.json.get(
+        "inference_budget_ms", Config.INFERENCE_BUDGET_MS if Config.FRAME_SKIPPING else None
+    )
+    try:
+        inference_budget_ms = float(inference_budget_ms) if inference_budget_ms else None
+    except (TypeError, ValueError):
+        inference_budget_ms = -1.0
+    if inference_budget_ms is not None and not 0 <= inference_budget_ms < float("inf"):
+        return jsonify({"error": "inference_budget_ms must be a non-negative number"}), 400
+
+    try:
+        camera_index = int(request.json.get("camera_index", Config.CAMERA_INDEX))
+    except (TypeError, ValueError):
+        camera_index = -1
+    if camera_index < 0:
+        return jsonify({"error": "camera_index must be a non-negative integer"}), 400
+
+    # Put the caller's socket in the session room before the first event is emitted
+    socket_id = request.json.get("socket_id")
+    def join_caller(session):
+        if socket_id:
+            join_room(session.room, sid=socket_id, namespace="/")
+
+    try:
+        session = session_manager.start(
+            kind, video_id, user_id, target,
+            camera_index=camera_index,
+            inference_budget_ms=inference_budget_ms,
+            before_start=join_caller
+        )
+    except SessionLimitReached as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({"message": f"{kind.capitalize()} started", "session_id": session.id}), 200
+
+@live_routes.route('/start_calibration', methods=['POST'])
+def start_calibration():
+    return start_session("calibration", calibrate_position)
 
-@app.route('/status', methods=['GET'])
-def get_status():
-    return jsonify({"comparison_running": comparison_running})
+@live_routes.route('/start_comparison', methods=['POST'])
+def start_comparison():
+    return start_session("comparison", compare_live_pose)
+
+@live_routes.route('/sessions', methods=['GET'])
+def list_sessions():
+    active_only = request.args.get("active", default="false").lower() == "true"
+    return jsonify({
+        "active": session_manager.active_count(),
+        "max_sessions": session_manager.max_sessions,
+        "sessions": [session.to_dict() for session in session_manager.list_sessions(active_only)]
+    })
 
-app.register_blueprint(routes)
-app.register_blueprint(category_routes)
-app.register_blueprint(video_routes)
-app.register_blueprint(feedback_routes)
-app.register_blueprint(result_routes)
+@live_routes.route('/sessions/<session_id>/status', methods=['GET'])
+def get_session_status(session_id):
+    session = session_manager.get(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify(session.to_dict())
+
+@live_routes.route('/sessions/<session_id>/stop', methods=['POST'])
+def stop_session(session_id):
+    session = session_manager.stop(session_id)
+    if not session:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"message": "Session stopping", "session_id": session.id})
+
+@socketio.on('join_session')
+def handle_join_session(data):
+    """Subscribe this socket to a session's frames and results (e.g. after navigating pages)."""
+    if session_manager.get(data.get("session_id")):
+        join_room(data["session_id"])
+
+@socketio.on('join_job')
+def handle_join_job(data):
+    """Subscribe this socket to an ingestion job's `ingestion_progress` events."""
+    if data.get("job_id"):
+        join_room(job_room(data["job_id"]))
+
+@socketio.on('frame_ack')
+def handle_frame_ack(data):
+    """Client acknowledgement of a binary frame; drives streaming backpressure."""
+    session = session_manager.get(data.get("session_id"))
+    if session and session.streamer:
+        session.streamer.ack(int(data.get("seq", 0)))
+
+@socketio.on('stop_comparison')
+def handle_stop_comparison(data=None):
+    if data and data.get("session_id"):
+        session_manager.stop(data["session_id"])
+
+_services_lock = threading.Lock()
+_services_started = False
+
+def start_services():
+    """Provision indexes, resume interrupted ingestion jobs and warm the pose pool, once per process.
+
+    The pool is warmed on a background thread so the server starts accepting requests right away.
+    """
+    global _services_started
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
+    if Config.ENSURE_INDEXES:
+        ensure_indexes(db)
+    ingestion_queue.resume_pending()
+    threading.Thread(
+        target=session_manager.pose_pool.prewarm, args=(Config.POSE_POOL_PREWARM,), daemon=True
+    ).start()
+
+def create_app(start_background_services=True):
+    """Build and configure the Flask app; nothing heavy is loaded until a request needs it.
+
+    Unless `start_background_services` is False, `start_services()` runs too
+    (it does nothing if it already ran in this process).
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    configure_mail(app)
+    CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+    CORS(app) 
+    configure_socketio(app)
+    configure_metrics(app)
+    app.config["VIDEO_INSTANCE"] = video_model
+
+    app.register_blueprint(live_routes)
+    app.register_blueprint(routes)
+    app.register_blueprint(category_routes)
+    app.register_blueprint(video_routes)
+    app.register_blueprint(feedback_routes)
+    app.register_blueprint(result_routes)
+    if start_background_services:
+        start_services()
+    return app
 
 if __name__ == "__main__":
-    socketio.run(app, debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
+    # With the debug reloader only the serving child process starts the services
+    app = create_app(not Config.DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true")
+    socketio.run(app, debug=Config.DEBUG, host="0.0.0.0", port=5000)
@@ -0,0 +1,79 @@
+"""Benchmark serial vs. chunked parallel keypoint extraction.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extraction [--video routine.mp4] [--workers 4]
+
+Without --video a synthetic clip is generated. MediaPipe finds no person in
+it, so the numbers measure decode + detector cost; pass a real routine for
+representative figures.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from services.extraction import extract_keypoints
+
+
+def make_synthetic_video(path, seconds=20, fps=30, size=(640, 480)):
+    """Write a clip with a moving stick figure to `path`."""
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(seconds * fps):
+        frame = np.full((height, width, 3), 30, dtype=np.uint8)
+        x = int(width / 2 + 100 * np.sin(i / fps * 2 * np.pi / 4))
+        cv2.circle(frame, (x, 120), 30, (220, 220, 220), -1)
+        cv2.line(frame, (x, 150), (x, 300), (220, 220, 220), 8)
+        cv2.line(frame, (x, 300), (x - 50, 420), (220, 220, 220), 8)
+        cv2.line(frame, (x, 300), (x + 50, 420), (220, 220, 220), 8)
+        cv2.line(frame, (x - 80, 200), (x + 80, 200), (220, 220, 220), 8)
+        writer.write(frame)
+    writer.release()
+
+
+def time_extraction(video_path, workers, min_chunk_frames):
+    start = time.perf_counter()
+    arrays = extract_keypoints(video_path, workers=workers, min_chunk_frames=min_chunk_frames)
+    return time.perf_counter() - start, len(arrays["frame_numbers"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="Video to extract (default: generated clip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--min-chunk-frames", type=int, default=60)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    video_path = args.video
+    if not video_path:
+        video_path = os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+        make_synthetic_video(video_path)
+
+    frame_count = int(cv2.VideoCapture(video_path).get(cv2.CAP_PROP_FRAME_COUNT))
+    serial_seconds, serial_frames = time_extraction(video_path, 1, args.min_chunk_frames)
+    parallel_seconds, parallel_frames = time_extraction(video_path, args.workers, args.min_chunk_frames)
+
+    results = {
+        "benchmark": "extraction",
+        "video": video_path,
+        "frames": frame_count,
+        "workers": args.workers,
+        "serial_seconds": serial_seconds,
+        "serial_fps": frame_count / serial_seconds,
+        "serial_detected_frames": serial_frames,
+        "parallel_seconds": parallel_seconds,
+        "parallel_fps": frame_count / parallel_seconds,
+        "parallel_detected_frames": parallel_frames,
+        "speedup": serial_seconds / parallel_seconds,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
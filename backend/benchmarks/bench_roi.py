@@ -0,0 +1,123 @@
+"""Benchmark live pose inference on full frames vs. region-of-interest crops.
+
+Usage (from backend/):
+    python -m benchmarks.bench_roi [--video recording.mp4] [--frames 300] [--max-side 384] [--padding 0.25]
+
+Each frame goes through two estimators: one sees the full frame, the other
+a RoiTracker crop. Reported: frames/sec of each, how many frames used a
+crop, and the drift of the mapped-back crop landmarks from the full-frame
+ones (normalized image units) on frames where both found a person. A
+fixed-crop run measures raw throughput even when nobody is detected.
+Without --video a synthetic clip is generated; MediaPipe finds no person
+in it, so pass a webcam recording for drift figures.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from benchmarks.bench_extraction import make_synthetic_video
+
+
+def read_frames(video_path, limit):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(frames, detect):
+    """Time `detect(frame)` over every frame; returns (seconds, landmarks per frame)."""
+    landmarks = []
+    start = time.perf_counter()
+    for frame in frames:
+        landmarks.append(detect(frame))
+    return time.perf_counter() - start, landmarks
+
+
+def drift(full, cropped):
+    distances = [
+        np.linalg.norm(a[:, :2] - b[:, :2], axis=-1) for a, b in zip(full, cropped) if a is not None and b is not None
+    ]
+    if not distances:
+        return {"frames_compared": 0}
+    distances = np.stack(distances)
+    return {
+        "frames_compared": len(distances),
+        "mean": float(distances.mean()),
+        "p95": float(np.percentile(distances, 95)),
+        "max": float(distances.max()),
+    }
+
+
+def main():
+    import mediapipe as mp
+    from app import detect_pose
+    from services.roi import RoiTracker, crop_frame
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="Webcam-style recording (default: generated clip)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--max-side", type=int, default=384)
+    parser.add_argument("--padding", type=float, default=0.25)
+    parser.add_argument("--fixed-box", type=float, nargs=4, default=[0.25, 0.0, 0.75, 1.0],
+                        metavar=("X0", "Y0", "X1", "Y1"), help="Crop for the throughput-only run")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    video_path = args.video
+    if not video_path:
+        video_path = os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+        make_synthetic_video(video_path, seconds=max(1, args.frames // 30 + 1), size=(1280, 720))
+    frames = read_frames(video_path, args.frames)
+
+    def estimator():
+        pose = mp.solutions.pose.Pose(model_complexity=1)
+        pose.process(np.zeros((64, 64, 3), dtype=np.uint8))  # Load the model outside the timed loop
+        return pose
+
+    full_pose, roi_pose, fixed_pose = estimator(), estimator(), estimator()
+    tracker = RoiTracker(args.padding, args.max_side)
+    fixed_box = tuple(args.fixed_box)
+
+    full_seconds, full_landmarks = run(frames, lambda frame: detect_pose(full_pose, frame))
+    roi_seconds, roi_landmarks = run(frames, lambda frame: tracker.detect(roi_pose, frame))
+    fixed_seconds, _ = run(
+        frames, lambda frame: fixed_pose.process(cv2.cvtColor(crop_frame(frame, fixed_box, args.max_side)[0],
+                                                              cv2.COLOR_BGR2RGB))
+    )
+    for pose in (full_pose, roi_pose, fixed_pose):
+        pose.close()
+
+    results = {
+        "benchmark": "roi",
+        "video": video_path,
+        "frames": len(frames),
+        "frame_size": list(frames[0].shape[1::-1]) if frames else None,
+        "max_side": args.max_side,
+        "padding": args.padding,
+        "full_fps": len(frames) / full_seconds,
+        "full_detected_frames": sum(landmarks is not None for landmarks in full_landmarks),
+        "roi_fps": len(frames) / roi_seconds,
+        "roi_detected_frames": sum(landmarks is not None for landmarks in roi_landmarks),
+        "roi_cropped_frames": tracker.cropped_frames,
+        "roi_speedup": full_seconds / roi_seconds,
+        "fixed_crop_fps": len(frames) / fixed_seconds,
+        "fixed_crop_speedup": full_seconds / fixed_seconds,
+        "drift": drift(full_landmarks, roi_landmarks),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
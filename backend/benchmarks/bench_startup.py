@@ -0,0 +1,125 @@
+"""Benchmark backend cold start: importing `app` and building the Flask app.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--runs 5] [--compare REF] [--output startup.json]
+
+Each run is a fresh interpreter that imports `app`, calls `create_app()`
+when the tree has one, and reports wall time, peak RSS and which heavy
+libraries got loaded. One extra `python -X importtime` run lists the
+slowest imports. With --compare, the same measurements are taken on a
+temporary git worktree of REF (e.g. a commit before a startup change), so
+before/after numbers come from one command.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ("mediapipe", "cv2", "cloudinary", "matplotlib", "apscheduler")
+
+_CHILD = """
+import inspect, json, resource, sys, threading, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+if hasattr(app, "create_app"):
+    if "start_background_services" in inspect.signature(app.create_app).parameters:
+        app.create_app(start_background_services=False)  # No database to provision here
+    else:
+        app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "create_app_seconds": created - imported,
+    "total_seconds": created - start,
+    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    "threads": threading.active_count(),
+    "heavy_modules_loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _run_child(backend_dir, *python_flags):
+    env = {**os.environ, "PYTHONPATH": backend_dir}
+    return subprocess.run(
+        [sys.executable, *python_flags, "-c", _CHILD],
+        cwd=backend_dir, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def slowest_imports(stderr, top):
+    """Root packages from `-X importtime` output, by the cumulative time of their costliest import."""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        if package != "app":
+            packages[package] = max(packages.get(package, 0), int(cumulative))
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "cumulative_ms": microseconds / 1000} for name, microseconds in ranked]
+
+
+def measure_tree(backend_dir, runs, top):
+    samples = [json.loads(_run_child(backend_dir).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    importtime = _run_child(backend_dir, "-X", "importtime")
+
+    def median(key):
+        return sorted(sample[key] for sample in samples)[len(samples) // 2]
+
+    return {
+        "runs": runs,
+        "import_seconds": median("import_seconds"),
+        "create_app_seconds": median("create_app_seconds"),
+        "total_seconds": median("total_seconds"),
+        "max_rss_bytes": median("max_rss_bytes"),
+        "threads": samples[-1]["threads"],
+        "heavy_modules_loaded": samples[-1]["heavy_modules_loaded"],
+        "slowest_imports": slowest_imports(importtime.stderr, top),
+    }
+
+
+def measure_ref(ref, runs, top):
+    """Measure `ref` in a throwaway git worktree."""
+    repo_root = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    backend_rel = os.path.relpath(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), repo_root)
+    worktree = tempfile.mkdtemp(prefix="bench-startup-")
+    os.rmdir(worktree)
+    subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], check=True, capture_output=True)
+    try:
+        return measure_tree(os.path.join(worktree, backend_rel), runs, top)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], capture_output=True)
+        shutil.rmtree(worktree, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+    parser.add_argument("--compare", metavar="REF", help="Also measure this git ref as the baseline")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {"benchmark": "startup", "current": measure_tree(backend_dir, args.runs, args.top)}
+    if args.compare:
+        baseline = measure_ref(args.compare, args.runs, args.top)
+        results["baseline"] = {"ref": args.compare, **baseline}
+        results["speedup"] = baseline["total_seconds"] / results["current"]["total_seconds"]
+        results["rss_saved_bytes"] = baseline["max_rss_bytes"] - results["current"]["max_rss_bytes"]
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
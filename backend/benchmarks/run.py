@@ -0,0 +1,302 @@
+"""Benchmark suite for the scoring, extraction and API hot paths.
+
+Usage (from backend/):
+    python -m benchmarks.run [--only scoring,decode,...] [--mongo-uri URI] [--output results.json]
+
+Every benchmark uses synthetic pose sequences or a small generated video.
+Data goes to a throwaway `fitness-bench` database, which is an in-memory
+mongomock database unless --mongo-uri points at a local MongoDB (that
+database is dropped afterwards). Results are printed, and optionally
+written, as JSON: per-call latency percentiles, frames/sec where it
+applies, and the peak Python allocation of one call (tracemalloc).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from bson.objectid import ObjectId
+from benchmarks.bench_extraction import make_synthetic_video
+
+BENCH_DB = "fitness-bench"
+NUM_KEYPOINTS = 33
+
+
+def connect(mongo_uri=None):
+    """Point `services.db.get_db` at the benchmark database; must run before app modules are imported."""
+    if mongo_uri:
+        from pymongo import MongoClient
+        db = MongoClient(mongo_uri)[BENCH_DB]
+    else:
+        import mongomock
+        db = mongomock.MongoClient()[BENCH_DB]
+
+    import services.db
+    services.db.get_db = lambda: db
+    return db
+
+
+def measure(func, repeat, frames_per_call=None, warmup=3):
+    """Time `repeat` calls of `func` and report latency, throughput and one call's peak allocation."""
+    for _ in range(warmup):
+        func()
+
+    latencies = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = {
+        "calls": repeat,
+        "mean_ms": latencies.mean() * 1000,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p95_ms": np.percentile(latencies, 95) * 1000,
+        "max_ms": latencies.max() * 1000,
+        "calls_per_sec": repeat / latencies.sum(),
+        "peak_alloc_bytes": peak,
+    }
+    if frames_per_call:
+        stats["frames_per_sec"] = frames_per_call * repeat / latencies.sum()
+    return stats
+
+
+def synthetic_sequence(frames, seed=0):
+    """A smooth (T, 33, 3) pose sequence with (T, 33) visibility."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.2, 0.8, size=(NUM_KEYPOINTS, 3))
+    phase = np.linspace(0, 8 * np.pi, frames)[:, None, None]
+    keypoints = (base + 0.05 * np.sin(phase + base * 10)).astype(np.float32)
+    visibility = rng.uniform(0.5, 1.0, size=(frames, NUM_KEYPOINTS)).astype(np.float32)
+    return keypoints, visibility
+
+
+def pose_dict(keypoints):
+    return {f"keypoint_{i}": {"x": float(x), "y": float(y), "z": float(z)} for i, (x, y, z) in enumerate(keypoints)}
+
+
+def seed_videos(db, count, frames):
+    """Insert a category with `count` videos, each with packed motion data."""
+    from models.motion import pack_motion_arrays
+
+    keypoints, visibility = synthetic_sequence(frames)
+    category_id = db["categories"].insert_one({"name": "Benchmark"}).inserted_id
+    video_ids = []
+    for i in range(count):
+        video_id = db["videos"].insert_one({
+            "category_id": category_id,
+            "title": f"Routine {i}",
+            "description": "Synthetic benchmark routine",
+            "video_url": f"https://example.invalid/{i}.mp4",
+            "thumbnail_url": f"https://example.invalid/{i}.jpg",
+            "cloudinary_public_id": f"bench/{i}",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }).inserted_id
+        db["motion_data"].insert_one({
+            "video_id": video_id,
+            "fps": 30.0,
+            "duration": frames / 30.0,
+            "created_at": datetime.utcnow(),
+            **pack_motion_arrays(np.arange(frames), np.arange(frames) / 30.0, keypoints, visibility)
+        })
+        video_ids.append(video_id)
+    return video_ids
+
+
+def seed_results(db, users, results_per_user, video_ids):
+    """Insert users and their results in bulk, then rebuild the leaderboard aggregates the API reads."""
+    from models.leaderboard import Leaderboard
+
+    rng = np.random.default_rng(1)
+    user_ids = db["users"].insert_many([{
+        "name": f"User {i}", "email": f"user{i}@example.invalid", "password": "",
+        "gender": "other", "date_of_birth": "2000-01-01", "height": 170, "weight": 70.0,
+        "is_admin": False, "image": "", "status": "Active", "created_at": datetime.utcnow()
+    } for i in range(users)]).inserted_ids
+
+    db["results"].insert_many([{
+        "video_id": video_ids[j % len(video_ids)],
+        "user_id": user_id,
+        "accuracy_score": float(rng.uniform(40, 100)),
+        "calories_burned": 5.0, "exercise_duration": 2.0, "steps_taken": 100,
+        "movement_efficiency": 70.0, "performance_score": 80.0, "motion_matching_score": 75.0,
+        "user_feedback": "GREAT!", "energy_expenditure": 20920.0, "steps_per_minute": 50.0,
+        "archived": False, "created_at": datetime.utcnow()
+    } for user_id in user_ids for j in range(results_per_user)])
+    # Bypasses Result.create_result, which would update the aggregates one result at a time
+    Leaderboard(db).rebuild()
+
+
+def bench_scoring(args, db):
+    import app as app_module
+
+    keypoints, _ = synthetic_sequence(2, seed=2)
+    ref_pose, live_pose = pose_dict(keypoints[0]), pose_dict(keypoints[1])
+    ref_array, live_array = keypoints[0, :, :2], keypoints[1, :, :2]
+    ref_seq, _ = synthetic_sequence(args.frames, seed=3)
+    live_seq, _ = synthetic_sequence(args.frames, seed=4)
+
+    from services.scoring import score_pose, score_sequence
+    return {
+        "calculate_similarity": measure(lambda: app_module.calculate_similarity(ref_pose, live_pose), args.repeat * 10, 1),
+        "calculate_euclidean_distance": measure(
+            lambda: app_module.calculate_euclidean_distance(ref_pose, live_pose), args.repeat * 10, 1
+        ),
+        "score_pose": measure(lambda: score_pose(ref_array, live_array), args.repeat * 10, 1),
+        "score_sequence": measure(
+            lambda: score_sequence(ref_seq[:, :, :2], live_seq[:, :, :2]), args.repeat, args.frames
+        ),
+    }
+
+
+def bench_extraction(args, db):
+    from config import Config
+    from models.motion import MotionData
+    from services.extraction import video_properties
+
+    video_path = os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+    make_synthetic_video(video_path, seconds=args.video_seconds)
+    _, frame_count = video_properties(video_path)
+
+    motion_model = MotionData(db)
+    video_id = ObjectId()
+
+    def extract():
+        motion_model.extract_motion_data(video_path, video_id)
+        motion_model.delete_motion_data(video_id)
+
+    stats = measure(extract, max(1, args.repeat // 10), frame_count, warmup=1)
+    stats.update(video_frames=frame_count, workers=Config.EXTRACTION_WORKERS)
+    return {"extract_motion_data": stats}
+
+
+def bench_pose(args, db):
+    import mediapipe as mp
+    from models.motion import MotionData
+    from services.pose_pool import PosePool
+
+    # Each timed acquire takes a distinct pre-warmed estimator (release resets it, which costs a build)
+    repeat = max(1, args.repeat // 10)
+    pool = PosePool(repeat + 1, model_complexity=1)
+    pool.prewarm(repeat + 1)
+    acquired = []
+
+    stats = {
+        "pose_construct": measure(lambda: mp.solutions.pose.Pose(model_complexity=1).close(), repeat, warmup=1),
+        "pose_pool_acquire": measure(lambda: acquired.append(pool.acquire()), repeat, warmup=0),
+        "motion_data_init": measure(lambda: MotionData(db), args.repeat),
+    }
+    for pose in acquired:
+        pose.close()
+    return stats
+
+
+def bench_decode(args, db):
+    from models.motion import MotionData
+    from services.motion_cache import motion_cache
+
+    video_id = seed_videos(db, 1, args.frames)[0]
+    motion_model = MotionData(db)
+
+    def decode_cold(as_arrays):
+        motion_cache.clear()
+        return motion_model.get_motion_data(video_id, as_arrays=as_arrays)
+
+    return {
+        "get_motion_data_arrays_cold": measure(lambda: decode_cold(True), args.repeat, args.frames),
+        "get_motion_data_arrays_cached": measure(
+            lambda: motion_model.get_motion_data(video_id, as_arrays=True), args.repeat, args.frames
+        ),
+        "get_motion_data_frames_cold": measure(lambda: decode_cold(False), max(1, args.repeat // 5), args.frames),
+    }
+
+
+def bench_api(args, db):
+    import app as app_module
+
+    video_ids = seed_videos(db, args.videos, 300)
+    seed_results(db, args.users, args.results_per_user, video_ids)
+    client = app_module.create_app().test_client()
+
+    def get(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+            assert response.get_json(), f"{path} returned an empty body"  # An empty page is not a benchmark
+        return call
+
+    return {
+        "leaderboard": measure(get("/api/leaderboard"), args.repeat),
+        "leaderboard_fetch_all": measure(get("/api/leaderboard?fetch_all=true"), max(1, args.repeat // 5)),
+        "videos_list": measure(get("/api/videos/"), args.repeat),
+        "dataset": {"videos": args.videos, "users": args.users, "results": args.users * args.results_per_user},
+    }
+
+
+BENCHMARKS = {
+    "scoring": bench_scoring,
+    "extraction": bench_extraction,
+    "pose": bench_pose,
+    "decode": bench_decode,
+    "api": bench_api,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="Comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--mongo-uri", help="Benchmark against this MongoDB instead of mongomock")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=1800, help="Frames per synthetic pose sequence")
+    parser.add_argument("--video-seconds", type=int, default=4)
+    parser.add_argument("--videos", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--results-per-user", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    db = connect(args.mongo_uri)
+    results = {
+        "suite": "backend",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "database": "mongodb" if args.mongo_uri else "mongomock",
+        "benchmarks": {},
+    }
+    try:
+        for name in selected:
+            results["benchmarks"][name] = BENCHMARKS[name](args, db)
+    finally:
+        if args.mongo_uri:
+            db.client.drop_database(BENCH_DB)
+
+    # ru_maxrss is reported in kilobytes on Linux
+    results["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    output = json.dumps(results, indent=2, default=float)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
@@ -8,5 +9,80 @@ class Config:
     API_AUDIENCE = os.getenv("API_AUDIENCE")  
     ALGORITHMS = ["RS256"]
     MONGO_URI = os.getenv("MONGO_URI")  
+    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "fitness-db")
+    # Shared MongoClient pool; unset timeouts fall back to pymongo's defaults
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 0)) or None
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    # Flask debug mode and the reloader when running app.py directly; never in production
+    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    # Create missing MongoDB indexes when the server starts
+    ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "true").lower() == "true"
+    # Memory budget for parsed reference motion kept in-process
+    MOTION_CACHE_BYTES = int(os.getenv("MOTION_CACHE_BYTES", 256 * 1024 * 1024))
+    # Live sessions: concurrent limit (one pooled Pose each) and default webcam
+    MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 4))
+    CAMERA_INDEX = int(os.getenv("CAMERA_INDEX", 0))
+    # Frames buffered between live pipeline stages before the oldest is dropped
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+    # Live scoring space: "image" (raw x/y, what feedback thresholds and stored scores are calibrated on)
+    # or "normalized" (hip-centred, torso-scaled + joint angles; scores are not comparable with "image" ones)
+    SCORING_SPACE = os.getenv("SCORING_SPACE", "image")
+    # Torso lengths of joint error that score zero, and the share of the score from joint angles
+    NORMALIZED_TOLERANCE = float(os.getenv("NORMALIZED_TOLERANCE", 2.0))
+    ANGLE_WEIGHT = float(os.getenv("ANGLE_WEIGHT", 0.5))
+    # DTW alignment of live poses: +/- reference frames searched (0 = lockstep) and max advance per frame
+    ALIGNMENT_WINDOW = int(os.getenv("ALIGNMENT_WINDOW", 30))
+    ALIGNMENT_MAX_STEP = int(os.getenv("ALIGNMENT_MAX_STEP", 2))
+    # Live frame skipping: full inference only as often as INFERENCE_BUDGET_MS of inference per frame
+    # allows (at most every FRAME_SKIP_MAX-th frame), every frame while a joint moves faster than
+    # FRAME_SKIP_MOTION_THRESHOLD per frame; sessions may pass their own inference_budget_ms
+    FRAME_SKIPPING = os.getenv("FRAME_SKIPPING", "false").lower() == "true"
+    INFERENCE_BUDGET_MS = float(os.getenv("INFERENCE_BUDGET_MS", 15))
+    FRAME_SKIP_MAX = int(os.getenv("FRAME_SKIP_MAX", 4))
+    FRAME_SKIP_MOTION_THRESHOLD = float(os.getenv("FRAME_SKIP_MOTION_THRESHOLD", 0.02))
+    # Live pose inference on a crop around the previous frame's landmarks, padded by ROI_PADDING of the
+    # person's size per side and downscaled to at most ROI_MAX_SIDE pixels (check drift with benchmarks.bench_roi)
+    ROI_CROPPING = os.getenv("ROI_CROPPING", "false").lower() == "true"
+    ROI_PADDING = float(os.getenv("ROI_PADDING", 0.25))
+    ROI_MAX_SIDE = int(os.getenv("ROI_MAX_SIDE", 384))
+    # Live frame streaming: binary "jpeg"/"webp" payloads adapted to a target bitrate
+    STREAM_BINARY = os.getenv("STREAM_BINARY", "true").lower() == "true"
+    STREAM_FORMAT = os.getenv("STREAM_FORMAT", "jpeg")
+    STREAM_TARGET_BITRATE = int(os.getenv("STREAM_TARGET_BITRATE", 4_000_000))
+    STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", 2))
+    # Reference videos transcoded to the live display size on local disk, least recently used evicted
+    VIDEO_CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ifit-video-cache"))
+    VIDEO_CACHE_BYTES = int(os.getenv("VIDEO_CACHE_BYTES", 2 * 1024 * 1024 * 1024))
+    VIDEO_CACHE_WIDTH = int(os.getenv("VIDEO_CACHE_WIDTH", 640))
+    VIDEO_CACHE_HEIGHT = int(os.getenv("VIDEO_CACHE_HEIGHT", 480))
+    # Live reference side: "video" (cached transcode, else Cloudinary) or "keypoints" (drawn from motion data)
+    REFERENCE_RENDER = os.getenv("REFERENCE_RENDER", "video")
+    # Background video ingestion
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+    # Processes each ingestion or scoring job extracts keypoints with (1 = serial); by default the
+    # concurrent jobs share the CPUs instead of each starting one process per core
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", max(1, (os.cpu_count() or 1) // INGESTION_WORKERS)))
+    INGESTION_DIR = os.getenv("INGESTION_DIR", os.path.join(tempfile.gettempdir(), "ifit-ingestion"))
+    # Longest recorded attempt accepted for offline scoring
+    MAX_RECORDING_SECONDS = float(os.getenv("MAX_RECORDING_SECONDS", 900))
+    # Files of failed jobs are kept this long so the job can be retried
+    INGESTION_RETENTION_HOURS = float(os.getenv("INGESTION_RETENTION_HOURS", 72))
+    # "cloudinary" or "local" (copies files into LOCAL_UPLOAD_DIR instead)
+    VIDEO_UPLOADER = os.getenv("VIDEO_UPLOADER", "cloudinary")
+    LOCAL_UPLOAD_DIR = os.getenv("LOCAL_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "ifit-uploads"))
+    # Store only reference keyframes; other frames are interpolated within KEYFRAME_MAX_ERROR
+    # (x/y distance in normalized image units, 0.01 = 1% of the frame)
+    KEYFRAME_SAMPLING = os.getenv("KEYFRAME_SAMPLING", "false").lower() == "true"
+    KEYFRAME_MAX_ERROR = float(os.getenv("KEYFRAME_MAX_ERROR", 0.01))
+    # Pooled Pose estimators per configuration: enough for every live session plus serial ingestion
+    POSE_POOL_SIZE = int(os.getenv("POSE_POOL_SIZE", MAX_SESSIONS + INGESTION_WORKERS))
+    # Estimators built and warmed up when the server starts
+    POSE_POOL_PREWARM = int(os.getenv("POSE_POOL_PREWARM", 1))
 
 config = Config()
@@ -0,0 +1,153 @@
+"""Maintenance commands for the backend.
+
+Usage:
+    python manage.py migrate-motion [--batch-size N]
+    python manage.py rebuild-leaderboard
+    python manage.py indexes [--check]
+    python manage.py backfill-videos [--batch-size N]
+    python manage.py score-video VIDEO_FILE --video-id ID [--user-id ID | --weight KG] [--save] [--workers N]
+    python manage.py keyframe-report [--video-id ID] [--max-error E ...]
+    python manage.py cache-videos [--video-id ID]
+"""
+import argparse
+import json
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def migrate_motion(args):
+    """Convert legacy motion_data documents to the packed binary format."""
+    from services.db import get_db
+    from models.motion import MotionData
+
+    migrated = MotionData(get_db()).migrate_to_packed(batch_size=args.batch_size)
+    print(f"Migrated {migrated} motion_data document(s) to the packed format")
+
+
+def rebuild_leaderboard(args):
+    """Recompute the materialized leaderboard from the results collection."""
+    from services.db import get_db
+    from models.leaderboard import Leaderboard
+
+    count = Leaderboard(get_db()).rebuild(batch_size=args.batch_size)
+    print(f"Rebuilt {count} leaderboard aggregate(s)")
+
+
+def backfill_videos(args):
+    """Copy duration, fps and frame count from motion data onto existing video documents."""
+    from services.db import get_db
+    from models.motion import MotionData
+
+    updated = MotionData(get_db()).backfill_video_summaries(batch_size=args.batch_size)
+    print(f"Backfilled {updated} video document(s)")
+
+
+def indexes(args):
+    """Create the declared MongoDB indexes; with --check, fail if a hot query still scans a collection."""
+    from services.db import get_db
+    from services.indexes import ensure_indexes, check_query_plans
+
+    db = get_db()
+    for collection, names in ensure_indexes(db).items():
+        print(f"{collection}: {', '.join(names)}")
+
+    if args.check:
+        scans = 0
+        for description, stages, collection_scan in check_query_plans(db):
+            scans += collection_scan
+            print(f"{'FAIL' if collection_scan else 'ok  '} {description}: {' > '.join(stages)}")
+        if scans:
+            raise SystemExit(f"{scans} hot query(ies) use a collection scan")
+
+
+def score_video(args):
+    """Score a recorded attempt at a reference video offline, without a webcam."""
+    from services.db import get_db
+    from services.offline import score_attempt
+
+    if args.save and not args.user_id:
+        raise SystemExit("--save requires --user-id")
+
+    started = time.perf_counter()
+    summary = score_attempt(
+        get_db(), args.video_file, args.video_id, user_id=args.user_id, weight_kg=args.weight,
+        save=args.save, workers=args.workers
+    )
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary, indent=2))
+
+
+def keyframe_report(args):
+    """Report keyframe compression ratio and max reconstruction error per video, to choose KEYFRAME_MAX_ERROR."""
+    from services.db import get_db
+    from models.motion import MotionData
+
+    for report in MotionData(get_db()).keyframe_report(args.max_error, video_id=args.video_id):
+        print(json.dumps(report))
+
+
+def cache_videos(args):
+    """Transcode videos ingested before the local video cache existed (or evicted from it) for live sessions."""
+    from services.db import get_db
+    from models.video import Video
+    from services.video_cache import video_cache
+
+    video_model = Video(get_db())
+    videos = [video_model.find_video_by_id(args.video_id)] if args.video_id else video_model.get_all_videos()
+    for video in filter(None, videos):
+        video_id = str(video["_id"])
+        if video_cache.get(video_id):
+            continue
+        path = video_cache.transcode(video_id, video["video_url"])
+        print(f"{video_id}: {path or 'not cached'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate-motion", help=migrate_motion.__doc__)
+    migrate_parser.add_argument("--batch-size", type=int, default=50)
+    migrate_parser.set_defaults(func=migrate_motion)
+
+    leaderboard_parser = subparsers.add_parser("rebuild-leaderboard", help=rebuild_leaderboard.__doc__)
+    leaderboard_parser.add_argument("--batch-size", type=int, default=1000)
+    leaderboard_parser.set_defaults(func=rebuild_leaderboard)
+
+    backfill_parser = subparsers.add_parser("backfill-videos", help=backfill_videos.__doc__)
+    backfill_parser.add_argument("--batch-size", type=int, default=100)
+    backfill_parser.set_defaults(func=backfill_videos)
+
+    indexes_parser = subparsers.add_parser("indexes", help=indexes.__doc__)
+    indexes_parser.add_argument("--check", action="store_true", help="Verify query plans with explain()")
+    indexes_parser.set_defaults(func=indexes)
+
+    score_parser = subparsers.add_parser("score-video", help=score_video.__doc__)
+    score_parser.add_argument("video_file")
+    score_parser.add_argument("--video-id", required=True)
+    score_parser.add_argument("--user-id", help="Use this user's weight; required with --save")
+    score_parser.add_argument("--weight", type=float, default=70.0, help="Weight in kg when no user is given")
+    score_parser.add_argument("--save", action="store_true", help="Store the result like a live session")
+    score_parser.add_argument("--workers", type=int, default=None)
+    score_parser.set_defaults(func=score_video)
+
+    keyframe_parser = subparsers.add_parser("keyframe-report", help=keyframe_report.__doc__)
+    keyframe_parser.add_argument("--video-id", help="Only this video (default: every video with motion data)")
+    keyframe_parser.add_argument(
+        "--max-error", type=float, nargs="+", default=[0.0025, 0.005, 0.01, 0.02],
+        help="Error bounds to evaluate, in normalized image units"
+    )
+    keyframe_parser.set_defaults(func=keyframe_report)
+
+    cache_parser = subparsers.add_parser("cache-videos", help=cache_videos.__doc__)
+    cache_parser.add_argument("--video-id", help="Only this video (default: every video not cached yet)")
+    cache_parser.set_defaults(func=cache_videos)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 from datetime import datetime
 from bson.objectid import ObjectId
 
+
+def name_query(name):
+    return {"name": name}
+
+
 class Category:
     def __init__(self, db):
         self.collection = db["categories"]
@@ -17,7 +22,7 @@ class Category:
 
     def find_category_by_name(self, name):
         """Find category by name."""
-        return self.collection.find_one({"name": name})
+        return self.collection.find_one(name_query(name))
 
     def find_category_by_id(self, category_id):
         """Find category by ID."""
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+
+# Ingestion job states, in the order a successful job passes through them
+QUEUED = "queued"
+UPLOADING = "uploading"
+EXTRACTING = "extracting"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+# Jobs to resume after a restart, oldest first
+UNFINISHED_QUERY = {"state": {"$nin": list(FINISHED_STATES)}}
+UNFINISHED_SORT = [("created_at", 1)]
+
+# Job kinds: upload a reference video, or score a recorded attempt at one
+INGEST = "ingest"
+SCORE = "score"
+
+class IngestionJob:
+    def __init__(self, db):
+        self.collection = db["ingestion_jobs"]
+
+    def create_job(self, file_path, category_id, title, description="", video_id=None):
+        """Insert a queued job for an uploaded file.
+
+        With `video_id` the job replaces that video's file and motion data
+        instead of creating a new video.
+        """
+        job_data = {
+            "kind": INGEST,
+            "state": QUEUED,
+            "progress": 0.0,
+            "file_path": file_path,
+            "category_id": ObjectId(category_id) if category_id else None,
+            "title": title,
+            "description": description,
+            "video_id": ObjectId(video_id) if video_id else None,
+            "replace": video_id is not None,
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        return self.collection.insert_one(job_data)
+
+    def create_score_job(self, file_path, video_id, user_id):
+        """Insert a queued job scoring the recorded attempt at `file_path`; its summary goes to `result`."""
+        job_data = {
+            "kind": SCORE,
+            "state": QUEUED,
+            "progress": 0.0,
+            "file_path": file_path,
+            "video_id": ObjectId(video_id),
+            "user_id": user_id,
+            "result": None,
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        return self.collection.insert_one(job_data)
+
+    def find_job_by_id(self, job_id):
+        """Find a job by its ID."""
+        return self.collection.find_one({"_id": ObjectId(job_id)})
+
+    def find_unfinished_jobs(self):
+        """Jobs that were queued or running when the server last stopped."""
+        return list(self.collection.find(UNFINISHED_QUERY).sort(UNFINISHED_SORT))
+
+    def find_expired_failed_jobs(self, max_age_hours):
+        """Failed jobs last updated more than `max_age_hours` ago that still hold an upload file."""
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        return list(self.collection.find({"state": FAILED, "updated_at": {"$lt": cutoff}, "file_path": {"$ne": None}}))
+
+    def update_job(self, job_id, **fields):
+        """Update job state, progress or result fields."""
+        fields["updated_at"] = datetime.utcnow()
+        self.collection.update_one({"_id": ObjectId(job_id)}, {"$set": fields})
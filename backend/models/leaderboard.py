@@ -0,0 +1,157 @@
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+# Aggregation windows kept per user
+SCOPE_ALL = "all"
+SCOPE_VIDEO = "video"
+SCOPE_WEEK = "week"
+
+LEADERBOARD_INDEXES = [
+    IndexModel([("user_id", ASCENDING), ("scope", ASCENDING), ("key", ASCENDING)], unique=True),
+    # Serves top-K and rank queries within one window
+    IndexModel([("scope", ASCENDING), ("key", ASCENDING), ("average_accuracy", DESCENDING), ("user_id", ASCENDING)]),
+]
+
+
+# Order of a top-K page; served by the second index above
+TOP_SORT = [("average_accuracy", DESCENDING), ("user_id", ASCENDING)]
+
+
+def top_query(scope=SCOPE_ALL, key=None, user_id=None):
+    """Aggregates listed in a window's top-K (optionally one user's)."""
+    query = {"scope": scope, "key": key, "total_dances": {"$gt": 0}}
+    if user_id:
+        query["user_id"] = ObjectId(user_id)
+    return query
+
+
+def week_key(moment):
+    """ISO week of a datetime, e.g. "2024-W07"."""
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _windows(result):
+    """(scope, key) of every aggregate a result counts towards."""
+    return [
+        (SCOPE_ALL, None),
+        (SCOPE_VIDEO, str(result["video_id"])),
+        (SCOPE_WEEK, week_key(result["created_at"])),
+    ]
+
+
+class Leaderboard:
+    """Per-user accuracy aggregates over all results, per video and per ISO week.
+
+    Each `leaderboard_stats` document holds `total_dances`, `total_accuracy`
+    and `average_accuracy` for one (user_id, scope, key). Documents are
+    updated atomically with update pipelines as results are created,
+    archived or unarchived; archived results do not count. `rebuild()`
+    recomputes everything from the results collection.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db["leaderboard_stats"]
+
+    def ensure_indexes(self, collection=None):
+        collection = collection if collection is not None else self.collection
+        collection.create_indexes(LEADERBOARD_INDEXES)
+
+    def record(self, result, delta=1):
+        """Add (delta=1) or remove (delta=-1) one result in each of its aggregates."""
+        accuracy = result.get("accuracy_score") or 0.0
+        for scope, key in _windows(result):
+            total_dances = {"$add": [{"$ifNull": ["$total_dances", 0]}, delta]}
+            total_accuracy = {"$add": [{"$ifNull": ["$total_accuracy", 0]}, delta * accuracy]}
+            self._upsert(
+                {"user_id": result["user_id"], "scope": scope, "key": key},
+                [
+                    {"$set": {"total_dances": total_dances, "total_accuracy": total_accuracy}},
+                    {"$set": {
+                        "average_accuracy": {"$cond": [
+                            {"$gt": ["$total_dances", 0]}, {"$divide": ["$total_accuracy", "$total_dances"]}, None
+                        ]},
+                        "updated_at": datetime.utcnow()
+                    }}
+                ]
+            )
+
+    def _upsert(self, query, update):
+        try:
+            self.collection.update_one(query, update, upsert=True)
+        except DuplicateKeyError:
+            # Another writer created the document first; the retry updates it instead
+            self.collection.update_one(query, update, upsert=True)
+
+    def top(self, limit=None, offset=0, scope=SCOPE_ALL, key=None, user_id=None):
+        """Users ordered by average accuracy within a window, joined with their name and email."""
+        pipeline = [{"$match": top_query(scope, key, user_id)}, {"$sort": dict(TOP_SORT)}]
+        if offset:
+            pipeline.append({"$skip": offset})
+        if limit:
+            pipeline.append({"$limit": limit})
+        pipeline += [
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "_id", "as": "user"}},
+            {"$unwind": "$user"},
+            {"$project": {
+                "_id": "$user_id", "average_accuracy": 1, "total_dances": 1,
+                "name": "$user.name", "email": "$user.email"
+            }}
+        ]
+        return self.collection.aggregate(pipeline)
+
+    def rank(self, user_id, scope=SCOPE_ALL, key=None):
+        """The user's aggregate in a window plus their 1-based `rank`, or None without results there."""
+        stats = self.collection.find_one(
+            {"user_id": ObjectId(user_id), "scope": scope, "key": key, "total_dances": {"$gt": 0}}
+        )
+        if not stats:
+            return None
+
+        ahead = self.collection.count_documents({
+            "scope": scope, "key": key, "total_dances": {"$gt": 0},
+            "$or": [
+                {"average_accuracy": {"$gt": stats["average_accuracy"]}},
+                {"average_accuracy": stats["average_accuracy"], "user_id": {"$lt": stats["user_id"]}}
+            ]
+        })
+        stats["rank"] = ahead + 1
+        return stats
+
+    def rebuild(self, batch_size=1000):
+        """Recompute every aggregate from the results collection and swap it in.
+
+        Results created while the rebuild runs may be missed; run it again
+        (or during a quiet period) if that matters.
+        """
+        aggregates = {}
+        results = self.db["results"].find(
+            {"archived": {"$ne": True}}, {"user_id": 1, "video_id": 1, "accuracy_score": 1, "created_at": 1}
+        ).batch_size(batch_size)
+        for result in results:
+            for scope, key in _windows(result):
+                totals = aggregates.setdefault((result["user_id"], scope, key), [0, 0.0])
+                totals[0] += 1
+                totals[1] += result.get("accuracy_score") or 0.0
+
+        now = datetime.utcnow()
+        staging = self.db["leaderboard_stats_rebuild"]
+        staging.drop()
+        self.ensure_indexes(staging)
+        documents = [{
+            "user_id": user_id, "scope": scope, "key": key,
+            "total_dances": count, "total_accuracy": total,
+            "average_accuracy": total / count, "updated_at": now
+        } for (user_id, scope, key), (count, total) in aggregates.items()]
+        for start in range(0, len(documents), batch_size):
+            staging.insert_many(documents[start:start + batch_size])
+
+        if documents:
+            staging.rename(self.collection.name, dropTarget=True)
+        else:
+            staging.drop()
+            self.collection.delete_many({})
+        return len(documents)
@@ -1,13 +1,185 @@
 from datetime import datetime
+from bson.binary import Binary
 from bson.objectid import ObjectId
-import mediapipe as mp
-import cv2
 import numpy as np
+from config import Config
+from services.keyframes import interpolate_keyframes, keyframe_stats, select_keyframes
+from services.motion_cache import motion_cache
+from services.pose_features import pose_features
+from services.scoring import frames_to_array
+
+# Version 1 documents store `frames` as a list of `keypoint_N` dicts.
+# Version 2 documents store packed little-endian columns as BSON binary:
+#   frame_numbers int32 (T,), timestamps float32 (T,),
+#   keypoints float32 (T, J, 3) as x/y/z, visibility float32 (T, J)
+# Version 3 adds precomputed scoring features:
+#   normalized float32 (T, J, 2) hip-centred torso-scaled x/y, angles float32 (T, A)
+# Keyframe-sampled documents (any version >= 2) hold keypoints and visibility
+# for K kept frames only, plus `keyframes` int32 (K,) indices into the T
+# frame_numbers/timestamps; other frames are interpolated and the scoring
+# features recomputed when read. `sampling` records the error bound, the
+# compression ratio and the measured maximum error.
+MOTION_FORMAT_VERSION = 3
+
+
+def _pack(array, dtype):
+    return Binary(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+
+def _unpack(blob, dtype, shape):
+    # np.frombuffer wraps the decoded BSON bytes without copying (read-only view)
+    return np.frombuffer(blob, dtype=dtype).reshape(shape)
+
+
+def video_summary(fps, duration):
+    """Playback fields denormalized onto the video document so listings never read motion data."""
+    return {"fps": fps, "duration": duration, "frame_count": int(round(duration * fps))}
+
+
+def pack_motion_arrays(frame_numbers, timestamps, keypoints, visibility, keyframe_error=None):
+    """Build the packed column fields of a motion_data document, including scoring features.
+
+    With `keyframe_error`, only keyframes are stored such that interpolation
+    rebuilds every joint's x/y within that distance (normalized image units).
+    """
+    frame_count, num_joints = keypoints.shape[0], keypoints.shape[1]
+    packed = {
+        "format_version": MOTION_FORMAT_VERSION,
+        "frame_count": frame_count,
+        "num_joints": num_joints,
+        "frame_numbers": _pack(frame_numbers, "<i4"),
+        "timestamps": _pack(timestamps, "<f4"),
+    }
+    if keyframe_error is not None:
+        keyframes = select_keyframes(keypoints, keyframe_error)
+        # Measured on the float32 values actually stored
+        stored = np.asarray(keypoints[keyframes], dtype=np.float32)
+        packed.update({
+            "keyframe_count": len(keyframes),
+            "keyframes": _pack(keyframes, "<i4"),
+            "keypoints": _pack(stored, "<f4"),
+            "visibility": _pack(visibility[keyframes], "<f4"),
+            "sampling": keyframe_stats(keypoints, keyframes, keyframe_error, stored),
+        })
+        return packed
+
+    normalized, angles = pose_features(keypoints)
+    packed.update({
+        "keypoints": _pack(keypoints, "<f4"),
+        "visibility": _pack(visibility, "<f4"),
+        "num_angles": angles.shape[1],
+        "normalized": _pack(normalized, "<f4"),
+        "angles": _pack(angles, "<f4"),
+    })
+    return packed
+
+
+def unpack_motion_arrays(document):
+    """Return the NumPy array view of a motion_data document of any version."""
+    arrays = {key: document[key] for key in ("video_id", "fps", "duration", "created_at") if key in document}
+
+    if document.get("format_version", 1) >= 2:
+        frame_count, num_joints = document["frame_count"], document["num_joints"]
+        stored_count = document.get("keyframe_count", frame_count)
+        arrays.update({
+            "frame_numbers": _unpack(document["frame_numbers"], "<i4", (frame_count,)),
+            "timestamps": _unpack(document["timestamps"], "<f4", (frame_count,)),
+            "keypoints": _unpack(document["keypoints"], "<f4", (stored_count, num_joints, 3)),
+            "visibility": _unpack(document["visibility"], "<f4", (stored_count, num_joints)),
+        })
+        if "keyframes" in document:
+            keyframes = _unpack(document["keyframes"], "<i4", (stored_count,))
+            arrays["keypoints"] = interpolate_keyframes(keyframes, arrays["keypoints"], frame_count)
+            arrays["visibility"] = interpolate_keyframes(keyframes, arrays["visibility"], frame_count)
+            arrays["sampling"] = document.get("sampling")
+        if "normalized" in document:
+            arrays["normalized"] = _unpack(document["normalized"], "<f4", (frame_count, num_joints, 2))
+            arrays["angles"] = _unpack(document["angles"], "<f4", (frame_count, document["num_angles"]))
+        else:
+            arrays["normalized"], arrays["angles"] = pose_features(arrays["keypoints"])
+        return arrays
+
+    # Legacy documents are converted once per read
+    frames = document.get("frames", [])
+    keypoints = frames_to_array(frames, dims=3)
+    arrays.update({
+        "frame_numbers": np.array([frame["frame_no"] for frame in frames], dtype=np.int32),
+        "timestamps": np.array([frame["timestamp"] for frame in frames], dtype=np.float32),
+        "keypoints": keypoints,
+        "visibility": np.array(
+            [[frame["keypoints"].get(f"keypoint_{i}", {}).get("score", np.nan) for i in range(keypoints.shape[1])]
+             for frame in frames],
+            dtype=np.float32
+        ).reshape(len(frames), keypoints.shape[1]),
+    })
+    arrays["normalized"], arrays["angles"] = pose_features(keypoints)
+    return arrays
+
+
+def arrays_to_frames(arrays):
+    """Rebuild the legacy `frames` list of `keypoint_N` dicts from the array view."""
+    # Round in float64 so values come back as 0.123 rather than float32 noise
+    keypoints = np.round(arrays["keypoints"].astype(np.float64), 3).tolist()
+    visibility = np.round(arrays["visibility"].astype(np.float64), 3).tolist()
+    frame_numbers = arrays["frame_numbers"].tolist()
+    timestamps = arrays["timestamps"].astype(np.float64).tolist()
+
+    frames = []
+    for frame_no, timestamp, frame_keypoints, frame_visibility in zip(frame_numbers, timestamps, keypoints, visibility):
+        frames.append({
+            "frame_no": frame_no,
+            "timestamp": timestamp,
+            "keypoints": {
+                f"keypoint_{idx}": {"x": x, "y": y, "z": z, "score": score}
+                for idx, ((x, y, z), score) in enumerate(zip(frame_keypoints, frame_visibility))
+            }
+        })
+    return frames
+
+
+def select_motion_window(arrays, start=None, end=None, joints=None, fps=None):
+    """Slice motion arrays to the timestamps in [start, end), a joint subset and at most `fps` frames/second.
+
+    Returns a dict with `frame_numbers`, `timestamps`, `keypoints` (T, J, 3)
+    and `visibility` (T, J) for the selected frames, plus `joints` (the
+    joint indices kept) and `fps` (the rate actually delivered).
+    """
+    timestamps = arrays["timestamps"]
+    selected = np.ones(len(timestamps), dtype=bool)
+    if start is not None:
+        selected &= timestamps >= start
+    if end is not None:
+        selected &= timestamps < end
+    indices = np.flatnonzero(selected)
+
+    source_fps = arrays["fps"]
+    if fps and source_fps and fps < source_fps:
+        # Keep the first frame in each 1/fps slot
+        _, first = np.unique(np.floor(timestamps[indices] * fps).astype(np.int64), return_index=True)
+        indices = indices[first]
+    else:
+        fps = source_fps
+
+    joints = np.arange(arrays["keypoints"].shape[1]) if joints is None else np.asarray(joints, dtype=np.int64)
+    return {
+        "frame_numbers": arrays["frame_numbers"][indices],
+        "timestamps": timestamps[indices],
+        "keypoints": arrays["keypoints"][indices][:, joints],
+        "visibility": arrays["visibility"][indices][:, joints],
+        "joints": joints,
+        "fps": fps,
+    }
+
+
+def motion_query(video_id):
+    """Filter for a video's motion document."""
+    return {"video_id": ObjectId(video_id)}
+
 
 class MotionData:
     def __init__(self, db):
         self.collection = db["motion_data"]
-        self.pose = mp.solutions.pose.Pose(model_complexity=1)  # Use BlazePose
+        self.video_collection = db["videos"]
 
         # Store only essential keypoints
         self.important_joints = {
@@ -19,59 +191,127 @@ class MotionData:
             27: "left_ankle", 28: "right_ankle"
         }
 
-    def extract_motion_data(self, video_path, video_id):
-        """Extract keypoints from video and store in MongoDB."""
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise Exception("Error opening video file")
+    def extract_motion_data(self, video_path, video_id, workers=None, progress=None, keyframe_error=None):
+        """Extract keypoints from video and store them in MongoDB in the packed format.
+
+        Long videos are split into frame ranges processed by `workers`
+        processes (default: `Config.EXTRACTION_WORKERS`). `progress(fraction)`
+        is called as extraction advances. `keyframe_error` stores keyframes
+        only (see `pack_motion_arrays`); it defaults to
+        `Config.KEYFRAME_MAX_ERROR` when `Config.KEYFRAME_SAMPLING` is on.
+        """
+        if keyframe_error is None and Config.KEYFRAME_SAMPLING:
+            keyframe_error = Config.KEYFRAME_MAX_ERROR
 
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / fps
+        # OpenCV and MediaPipe load only when a video is actually processed
+        from services.extraction import extract_keypoints
+
+        # Serial runs borrow an estimator from the shared pose pool; MotionData itself holds no model
+        arrays = extract_keypoints(video_path, workers=workers or Config.EXTRACTION_WORKERS, progress=progress)
 
         motion_data = {
             "video_id": ObjectId(video_id),
-            "fps": fps,
-            "duration": duration,
-            "frames": [],
-            "created_at": datetime.utcnow()
+            "fps": arrays["fps"],
+            "duration": arrays["duration"],
+            "created_at": datetime.utcnow(),
+            **pack_motion_arrays(
+                arrays["frame_numbers"], arrays["timestamps"], arrays["keypoints"], arrays["visibility"],
+                keyframe_error=keyframe_error
+            )
         }
+        result = self.collection.insert_one(motion_data)
+        self.video_collection.update_one(
+            {"_id": ObjectId(video_id)}, {"$set": video_summary(arrays["fps"], arrays["duration"])}
+        )
+        motion_cache.invalidate(video_id)
+        return result
+
+    def delete_motion_data(self, video_id):
+        """Remove the stored motion data of a video (before re-extraction)."""
+        result = self.collection.delete_many(motion_query(video_id))
+        motion_cache.invalidate(video_id)
+        return result
+
+    def get_motion_data(self, video_id, as_arrays=False):
+        """Retrieve motion data for accuracy comparison.
+
+        With `as_arrays=True` the keypoints come back as NumPy arrays
+        (`keypoints`, `visibility`, `frame_numbers`, `timestamps`); otherwise
+        the legacy shape with a `frames` list of `keypoint_N` dicts is returned.
+        Parsed arrays are served from the in-process motion cache when possible.
+        """
+        arrays = motion_cache.get(video_id)
+        if arrays is None:
+            generation = motion_cache.generation(video_id)
+            document = self.collection.find_one(motion_query(video_id), {"_id": 0})
+            if not document:
+                return None
+            arrays = unpack_motion_arrays(document)
+            motion_cache.put(video_id, arrays, generation)
+
+        if as_arrays:
+            return arrays
+
+        return {
+            "video_id": arrays["video_id"],
+            "fps": arrays["fps"],
+            "duration": arrays["duration"],
+            "created_at": arrays.get("created_at"),
+            "frames": arrays_to_frames(arrays)
+        }
+
+    def migrate_to_packed(self, batch_size=50):
+        """Rewrite motion_data documents older than MOTION_FORMAT_VERSION in the packed format.
+
+        Returns the number of migrated documents. Safe to re-run; up-to-date
+        documents are skipped.
+        """
+        legacy_query = {"$or": [
+            {"format_version": {"$exists": False}},
+            {"format_version": {"$lt": MOTION_FORMAT_VERSION}}
+        ]}
+        migrated = 0
+        for document in self.collection.find(legacy_query, batch_size=batch_size):
+            arrays = unpack_motion_arrays(document)
+            packed = pack_motion_arrays(
+                arrays["frame_numbers"], arrays["timestamps"], arrays["keypoints"], arrays["visibility"]
+            )
+            self.collection.update_one(
+                {"_id": document["_id"], "format_version": document.get("format_version", {"$exists": False})},
+                {"$set": packed, "$unset": {"frames": ""}}
+            )
+            motion_cache.invalidate(document["video_id"])
+            migrated += 1
+        return migrated
+
+    def keyframe_report(self, max_errors, video_id=None, batch_size=20):
+        """Yield, per video, the compression ratio and max reconstruction error keyframe sampling gets at each bound.
+
+        Nothing is written. Documents that are already keyframe-sampled are
+        measured against their interpolated frames and also carry their
+        stored `sampling` stats.
+        """
+        query = {"video_id": ObjectId(video_id)} if video_id else {}
+        for document in self.collection.find(query, batch_size=batch_size):
+            keypoints = unpack_motion_arrays(document)["keypoints"]
+            yield {
+                "video_id": str(document["video_id"]),
+                "stored_sampling": document.get("sampling"),
+                "bounds": [
+                    keyframe_stats(keypoints, select_keyframes(keypoints, max_error), max_error)
+                    for max_error in max_errors
+                ],
+            }
 
-        frame_number = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # Get the timestamp of the current frame
-            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0  # Convert to seconds
-
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.pose.process(rgb_frame)
-
-            if results.pose_landmarks:
-                keypoints = {
-                    f"keypoint_{idx}": {
-                        "x": round(landmark.x, 3),
-                        "y": round(landmark.y, 3),
-                        "z": round(landmark.z, 3),
-                        "score": round(landmark.visibility, 3)
-                    }
-                    for idx, landmark in enumerate(results.pose_landmarks.landmark)
-                }
-
-                motion_data["frames"].append({
-                    "frame_no": frame_number,
-                    "timestamp": timestamp,  # Store the timestamp
-                    "keypoints": keypoints
-                })
-
-            frame_number += 1
-
-        cap.release()
-        return self.collection.insert_one(motion_data)
-
-    def get_motion_data(self, video_id):
-        """Retrieve motion data for accuracy comparison."""
-        return self.collection.find_one({"video_id": ObjectId(video_id)}, {"_id": 0})
\ No newline at end of file
+    def backfill_video_summaries(self, batch_size=100):
+        """Copy fps, duration and frame count onto videos that predate them; returns the number updated."""
+        updated = 0
+        videos = self.video_collection.find({"frame_count": {"$exists": False}}, {"_id": 1}, batch_size=batch_size)
+        for video in videos:
+            motion = self.collection.find_one({"video_id": video["_id"]}, {"fps": 1, "duration": 1})
+            if motion:
+                self.video_collection.update_one(
+                    {"_id": video["_id"]}, {"$set": video_summary(motion["fps"], motion["duration"])}
+                )
+                updated += 1
+        return updated
@@ -1,10 +1,27 @@
 from pymongo import MongoClient
 from datetime import datetime
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from models.leaderboard import Leaderboard, SCOPE_ALL, SCOPE_VIDEO, SCOPE_WEEK
+
+RESULT_FIELDS = (
+    "user_id", "video_id", "accuracy_score", "calories_burned", "exercise_duration", "steps_taken",
+    "movement_efficiency", "performance_score", "motion_matching_score", "user_feedback",
+    "energy_expenditure", "steps_per_minute", "created_at"
+)
+
+def user_results_query(user_id):
+    return {"user_id": ObjectId(user_id)}
+
+
+def video_results_query(video_id):
+    return {"video_id": ObjectId(video_id)}
+
 
 class Result:
     def __init__(self, db):
         self.collection = db["results"]
+        self.leaderboard = Leaderboard(db)
 
     def create_result(self, video_id, user_id, accuracy_score, calories_burned, exercise_duration, 
                       steps_taken, movement_efficiency, performance_score, motion_matching_score, 
@@ -26,44 +43,98 @@ class Result:
             "archived": archived,
             "created_at": datetime.utcnow()
         }
-        return self.collection.insert_one(result_data)
+        inserted = self.collection.insert_one(result_data)
+        if not archived:
+            self.leaderboard.record(result_data)
+        return inserted
 
     def find_results_by_user(self, user_id):
         """Find results by user ID."""
-        return list(self.collection.find({"user_id": ObjectId(user_id)}))
+        return list(self.collection.find(user_results_query(user_id)))
 
     def find_results_by_video(self, video_id):
         """Find results by video ID."""
-        return list(self.collection.find({"video_id": ObjectId(video_id)}))
+        return list(self.collection.find(video_results_query(video_id)))
 
     def get_all_results(self):
         """Fetch all results."""
         return list(self.collection.find({}))
 
-    def get_leaderboard(self, user_id=None):
-        """Fetch leaderboard or ranking for a specific user."""
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$user_id",
-                    "average_accuracy": {"$avg": "$accuracy_score"},
-                    "total_dances": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"average_accuracy": -1}
-            }
-        ]
+    def get_leaderboard(self, user_id=None, limit=None, offset=0, video_id=None, week=None):
+        """Fetch the top users (or one user's entry) by average accuracy from the precomputed leaderboard.
+
+        Only one window applies: a video's leaderboard, an ISO week ("2024-W07")
+        or, by default, all results.
+        """
+        scope, key = _window(video_id, week)
+        return self.leaderboard.top(limit, offset, scope, key, user_id)
+
+    def get_rank(self, user_id, video_id=None, week=None):
+        """A user's precomputed aggregate and rank within a window, or None."""
+        scope, key = _window(video_id, week)
+        return self.leaderboard.rank(user_id, scope, key)
+
+    def get_enriched_results(self, user_id=None, limit=None, offset=0, after=None):
+        """Fetch results in insertion order, each joined with its user's public profile fields.
 
+        `after` (a result ID) pages by key instead of `offset`, which stays
+        fast however deep the page is. Results whose user no longer exists
+        are skipped; only the public user fields are projected.
+        """
+        match = {}
         if user_id:
-            pipeline.insert(0, {"$match": {"user_id": ObjectId(user_id)}})
+            match["user_id"] = ObjectId(user_id)
+        if after:
+            match["_id"] = {"$gt": ObjectId(after)}
 
-        leaderboard_data = list(self.collection.aggregate(pipeline))
-        return leaderboard_data
+        pipeline = [{"$match": match}, {"$sort": {"_id": 1}}] + _page(limit, offset)
+        pipeline += _join_user("user_id")
+        pipeline.append({"$project": {
+            **{field: 1 for field in RESULT_FIELDS},
+            "name": "$user.name", "image": "$user.image", "email": "$user.email",
+            "is_admin": "$user.is_admin", "weight": "$user.weight", "height": "$user.height"
+        }})
+        return self.collection.aggregate(pipeline)
 
     def archive_result(self, result_id, archived=True):
-        """Archive or unarchive a result."""
-        return self.collection.update_one(
-            {"_id": ObjectId(result_id)},
-            {"$set": {"archived": archived}}
-        )
\ No newline at end of file
+        """Archive or unarchive a result, moving it out of or back into the leaderboard.
+
+        Returns False when the result does not exist.
+        """
+        # Only a real state change matches, so concurrent calls cannot count a result twice
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(result_id), "archived": {"$ne": archived}},
+            {"$set": {"archived": archived}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous:
+            self.leaderboard.record(previous, delta=-1 if archived else 1)
+            return True
+        return self.collection.count_documents({"_id": ObjectId(result_id)}, limit=1) > 0
+
+
+def _page(limit, offset):
+    """$skip/$limit stages for limit/offset pagination."""
+    stages = []
+    if offset:
+        stages.append({"$skip": offset})
+    if limit:
+        stages.append({"$limit": limit})
+    return stages
+
+
+def _join_user(local_field):
+    """Stages joining each document with the user whose ID is in `local_field`; unmatched documents are dropped."""
+    return [
+        {"$lookup": {"from": "users", "localField": local_field, "foreignField": "_id", "as": "user"}},
+        {"$unwind": "$user"}
+    ]
+
+
+def _window(video_id=None, week=None):
+    """(scope, key) of the leaderboard window selected by the query."""
+    if video_id:
+        return SCOPE_VIDEO, str(video_id)
+    if week:
+        return SCOPE_WEEK, week
+    return SCOPE_ALL, None
@@ -2,15 +2,29 @@ from pymongo import MongoClient
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
-from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
+import threading
 
-# Initialize the scheduler
-scheduler = BackgroundScheduler()
-scheduler.start()
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The background scheduler for delayed user jobs, started on first use rather than at import."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from apscheduler.schedulers.background import BackgroundScheduler
+
+            _scheduler = BackgroundScheduler()
+            _scheduler.start()
+            # Shut down the scheduler when the app exits
+            atexit.register(_scheduler.shutdown)
+        return _scheduler
+
+def email_query(email):
+    return {"email": email}
 
-# Shut down the scheduler when the app exits
-atexit.register(lambda: scheduler.shutdown())
 
 class User:
     def __init__(self, db):
@@ -37,7 +51,7 @@ class User:
         return self.collection.insert_one(user_data)
     def find_user_by_email(self, email):
         """Find user by email."""
-        return self.collection.find_one({"email": email})
+        return self.collection.find_one(email_query(email))
 
     def find_user_by_id(self, user_id):
         """Find user by ID."""
@@ -87,7 +101,7 @@ class User:
         
         # Schedule reactivation after 15 hours
         reactivation_time = datetime.utcnow() + timedelta(hours=15)
-        scheduler.add_job(
+        get_scheduler().add_job(
             func=self.reactivate_user,
             trigger='date',
             run_date=reactivation_time,
@@ -1,44 +1,92 @@
 from datetime import datetime
 from bson.objectid import ObjectId
-import cloudinary 
-import cloudinary.uploader
+from services.motion_cache import motion_cache
+from services.uploader import get_uploader
+from services.video_cache import video_cache
+
+# Fields returned by catalog listings; duration/fps/frame_count are copied from motion data at ingestion
+LISTING_FIELDS = {
+    "title": 1, "description": 1, "video_url": 1, "thumbnail_url": 1, "category_id": 1,
+    "created_at": 1, "updated_at": 1, "duration": 1, "fps": 1, "frame_count": 1
+}
+
+
+# Catalog order for paging
+LISTING_SORT = [("_id", 1)]
+
+
+def category_query(category_id):
+    return {"category_id": ObjectId(category_id)} if category_id else {}
+
 
 class Video:
-    def __init__(self, db):
+    def __init__(self, db, uploader=None):
         self.collection = db["videos"]
         self.motion_collection = db["motion_data"]
+        self.uploader = uploader or get_uploader()
     
-    def upload_video(self, category_id, title, video_file, description="", folder="fitness_videos"):
-        """Upload video to a folder in Cloudinary and store it in the database."""
-        # Upload the video to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            video_file,
-            resource_type="video",
-            folder=folder,  # Specify the folder for the video
-            eager=[{"width": 150, "height": 150, "crop": "fill", "format": "jpg"}]  # Generate thumbnail
-        )
+    def upload_video(self, category_id, title, video_file, description="", folder="fitness_videos",
+                     video_id=None, public_id=None):
+        """Upload video to a folder in the configured storage (Cloudinary by default) and store it in the database.
 
-        # The thumbnail URL will be available in the `eager` array of the upload response
-        thumbnail_url = upload_result['eager'][0]['secure_url']
+        Given `video_id` and `public_id` (the storage name) the call can be
+        repeated: the asset is overwritten and the document upserted, so a
+        retried upload never leaves a duplicate behind.
+        """
+        uploaded = self.uploader.upload_video(video_file, folder, public_id=public_id)
 
         video_data = {
             "category_id": ObjectId(category_id),
             "title": title,
             "description": description,
-            "video_url": upload_result["secure_url"],
-            "thumbnail_url": thumbnail_url,  # Store generated thumbnail URL
-            "cloudinary_public_id": upload_result["public_id"],
+            "video_url": uploaded["video_url"],
+            "thumbnail_url": uploaded["thumbnail_url"],  # Store generated thumbnail URL
+            "cloudinary_public_id": uploaded["public_id"],
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
 
-        return self.collection.insert_one(video_data)
+        if video_id is None:
+            return self.collection.insert_one(video_data)
+        created_at = video_data.pop("created_at")
+        return self.collection.update_one(
+            {"_id": ObjectId(video_id)},
+            {"$set": video_data, "$setOnInsert": {"created_at": created_at}},
+            upsert=True
+        )
+
+    def replace_video_file(self, video_id, video_file, folder="fitness_videos", public_id=None):
+        """Upload a new file for an existing video and remove the old one from storage.
+
+        With `public_id` a repeated call overwrites the same new asset and
+        keeps it, rather than deleting it as the "old" file.
+        """
+        video = self.find_video_by_id(video_id)
+        if not video:
+            return False
+
+        uploaded = self.uploader.upload_video(video_file, folder, public_id=public_id)
+        self.update_video(video_id, {
+            "video_url": uploaded["video_url"],
+            "thumbnail_url": uploaded["thumbnail_url"],
+            "cloudinary_public_id": uploaded["public_id"]
+        })
+        if video["cloudinary_public_id"] != uploaded["public_id"]:
+            self.uploader.destroy_video(video["cloudinary_public_id"])
+        return True
 
-    
     def find_video_by_id(self, video_id):
         """Find a video by its ID."""
         return self.collection.find_one({"_id": ObjectId(video_id)})
     
+    def list_videos(self, category_id=None, limit=None, offset=0):
+        """Page through videos (optionally of one category) with only the catalog fields."""
+        cursor = self.collection.find(category_query(category_id), LISTING_FIELDS).sort(LISTING_SORT).skip(offset)
+        return cursor.limit(limit) if limit else cursor
+
+    def count_videos(self, category_id=None):
+        return self.collection.count_documents(category_query(category_id))
+
     def get_all_videos(self, category_id=None):
         """Retrieve all videos or filter by category ID."""
         query = {}
@@ -53,6 +101,9 @@ class Video:
             {"_id": ObjectId(video_id)},
             {"$set": updated_data}
         )
+        motion_cache.invalidate(video_id)
+        if "video_url" in updated_data:
+            video_cache.invalidate(video_id)
         return result.modified_count
 
     def delete_video(self, video_id):
@@ -63,9 +114,11 @@ class Video:
         
         # Delete motion data related to this video (CASCADE DELETE)
         self.motion_collection.delete_many({"video_id": ObjectId(video_id)})
+        motion_cache.invalidate(video_id)
+        video_cache.invalidate(video_id)
 
         # Delete video from Cloudinary
-        cloudinary.uploader.destroy(video["cloudinary_public_id"], resource_type="video")
+        self.uploader.destroy_video(video["cloudinary_public_id"])
 
         # Delete video from MongoDB
         self.collection.delete_one({"_id": ObjectId(video_id)})
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class OnlineAligner:
+    """Incremental, banded dynamic-time-warping alignment of live poses to a reference.
+
+    Each live frame is compared (vectorized) against the reference frames in
+    a window of +/- `lag_window` frames and the accumulated DTW cost is
+    carried over from the previous live frame. A live frame may advance the
+    reference by 0..`max_step` frames, so the path handles a user lagging,
+    pausing or a webcam running at a different rate. Work and memory per
+    live frame are O(lag_window).
+    """
+
+    def __init__(self, reference, lag_window=30, max_step=2):
+        self.reference = reference  # (T, J, D)
+        self.lag_window = lag_window
+        self.max_step = max_step
+        self.position = 0
+        self._costs = None  # Accumulated costs over the previous band
+        self._band_start = 0
+
+    def reset(self):
+        self.position = 0
+        self._costs = None
+        self._band_start = 0
+
+    def update(self, live_pose, expected_index=None):
+        """Align one live (J, D) pose and return (reference_index, local_cost).
+
+        The search band is centred on `expected_index` (e.g. the reference
+        frame currently on screen) when given, otherwise on the last match.
+        """
+        center = self.position if expected_index is None else expected_index
+        frame_count = len(self.reference)
+        band_start = int(np.clip(center - self.lag_window, 0, frame_count - 1))
+        band_end = int(np.clip(center + self.lag_window + 1, band_start + 1, frame_count))
+
+        # Mean joint distance to every reference frame in the band, NaN joints ignored
+        errors = np.sqrt(np.sum(np.square(self.reference[band_start:band_end] - live_pose), axis=-1))
+        local_costs = np.nanmean(errors, axis=-1)
+
+        if self._costs is None:
+            costs = local_costs
+        else:
+            # Previous accumulated costs re-indexed onto this band (inf outside the old band)
+            previous = np.full(band_end - band_start + self.max_step, np.inf)
+            old_start, old_end = self._band_start, self._band_start + len(self._costs)
+            overlap_start, overlap_end = max(old_start, band_start - self.max_step), min(old_end, band_end)
+            if overlap_start < overlap_end:
+                offset = band_start - self.max_step
+                previous[overlap_start - offset:overlap_end - offset] = \
+                    self._costs[overlap_start - old_start:overlap_end - old_start]
+
+            # Best predecessor reached by advancing 0..max_step reference frames
+            best_previous = previous[self.max_step:]
+            for step in range(1, self.max_step + 1):
+                best_previous = np.minimum(best_previous, previous[self.max_step - step:len(previous) - step])
+            costs = local_costs + best_previous
+            if not np.isfinite(costs).any():
+                costs = local_costs  # Band jumped past the old path; restart from here
+
+        costs = costs - np.min(costs)  # Keep the accumulated values bounded
+        best = int(np.argmin(costs))
+        self._costs = costs
+        self._band_start = band_start
+        self.position = band_start + best
+        return self.position, float(local_costs[best])
@@ -1,7 +1,127 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+from config import Config
+from services.metrics import registry, Counter, Gauge, Histogram
 import os
+import threading
+
+MONGO_CONNECTIONS = registry.register(Gauge(
+    "ifit_mongo_connections", "MongoDB pool connections, open or checked out.", ["state"]
+))
+MONGO_CHECKOUTS = registry.register(Counter(
+    "ifit_mongo_checkouts_total", "MongoDB connection checkouts by outcome.", ["outcome"]
+))
+MONGO_CHECKOUT_WAIT_SECONDS = registry.register(Histogram(
+    "ifit_mongo_checkout_wait_seconds", "Time spent waiting for a pooled MongoDB connection."
+))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters for capacity planning, fed by pymongo's pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def connection_checked_out(self, event):
+        wait = getattr(event, "duration", 0.0) or 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        MONGO_CHECKOUTS.inc(outcome="ok")
+        MONGO_CHECKOUT_WAIT_SECONDS.observe(wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        MONGO_CHECKOUTS.inc(outcome=str(event.reason))
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    # Remaining pool events carry nothing we report
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_pool_size": Config.MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "mean_wait_ms": self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000
+            }
+
+
+pool_stats = PoolStats()
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide MongoClient, created on first use; its pool is shared by every model."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(
+                os.getenv("MONGO_URI"),
+                maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+                waitQueueTimeoutMS=Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=Config.MONGO_SOCKET_TIMEOUT_MS,
+                readPreference=Config.MONGO_READ_PREFERENCE,
+                event_listeners=[pool_stats]
+            )
+        return _client
+
 
 def get_db():
-    client = MongoClient(os.getenv("MONGO_URI"))
-    db = client["fitness-db"]
+    db = get_client()[Config.MONGO_DB_NAME]
     return db
+
+
+def _collect_pool_metrics():
+    stats = pool_stats.stats()
+    MONGO_CONNECTIONS.set(stats["open"], state="open")
+    MONGO_CONNECTIONS.set(stats["checked_out"], state="checked_out")
+
+
+registry.add_collector(_collect_pool_metrics)
@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import mediapipe as mp
+import numpy as np
+from services.pose_pool import get_pose_pool
+
+NUM_KEYPOINTS = 33
+# Frames decoded before each chunk starts so landmark smoothing has settled
+# by the first frame the chunk owns; their outputs are discarded.
+WARMUP_FRAMES = 15
+# Below this many frames per worker the pool start-up costs more than it saves
+MIN_CHUNK_FRAMES = 300
+# Serial extraction reports progress every this many frames
+PROGRESS_INTERVAL = 30
+
+_worker_pose = None
+
+
+def _init_worker(model_complexity):
+    """Build one Pose graph per worker process."""
+    global _worker_pose
+    _worker_pose = mp.solutions.pose.Pose(model_complexity=model_complexity)
+
+
+def _empty_chunk():
+    return {
+        "frame_numbers": np.zeros(0, dtype=np.int32),
+        "timestamps": np.zeros(0, dtype=np.float32),
+        "keypoints": np.zeros((0, NUM_KEYPOINTS, 3), dtype=np.float32),
+        "visibility": np.zeros((0, NUM_KEYPOINTS), dtype=np.float32),
+    }
+
+
+def _extract_range(video_path, start, end, warmup=0, pose=None, progress=None, total_frames=0):
+    """Run pose estimation over frames [start, end) of a video.
+
+    Decoding begins `warmup` frames before `start` so the tracker and its
+    smoothing filter are primed; only frames from `start` on are returned.
+    `end=None` reads until the end of the stream. `progress`, when given,
+    is called with the fraction of `total_frames` processed so far. A
+    given `pose` is used as is: pooled estimators were reset on release.
+    """
+    if pose is None:
+        pose = _worker_pose
+        pose.reset()  # Reused across every chunk this worker process runs
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception("Error opening video file")
+
+    frame_number = max(0, start - warmup)
+    if frame_number:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+    frame_numbers, timestamps, keypoints, visibility = [], [], [], []
+    while end is None or frame_number < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0  # Convert to seconds
+        results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        if results.pose_landmarks and frame_number >= start:
+            landmarks = results.pose_landmarks.landmark
+            frame_numbers.append(frame_number)
+            timestamps.append(timestamp)
+            keypoints.append([(lm.x, lm.y, lm.z) for lm in landmarks])
+            visibility.append([lm.visibility for lm in landmarks])
+
+        frame_number += 1
+        if progress and total_frames and frame_number % PROGRESS_INTERVAL == 0:
+            progress(min(1.0, frame_number / total_frames))
+
+    cap.release()
+    if not frame_numbers:
+        return _empty_chunk()
+
+    return {
+        "frame_numbers": np.array(frame_numbers, dtype=np.int32),
+        "timestamps": np.array(timestamps, dtype=np.float32),
+        "keypoints": np.array(keypoints, dtype=np.float32),
+        "visibility": np.array(visibility, dtype=np.float32),
+    }
+
+
+def _merge_chunks(chunks):
+    """Concatenate chunk results in frame order."""
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def plan_chunks(frame_count, workers, min_chunk_frames=MIN_CHUNK_FRAMES):
+    """Split [0, frame_count) into at most `workers` contiguous (start, end) ranges.
+
+    The last range is open-ended (`end=None`) because CAP_PROP_FRAME_COUNT is
+    only an estimate for many containers.
+    """
+    chunk_count = max(1, min(workers, frame_count // max(1, min_chunk_frames)))
+    bounds = np.linspace(0, frame_count, chunk_count + 1).astype(int).tolist()
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def video_properties(video_path):
+    """Return (fps, frame_count) for a video file."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception("Error opening video file")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frame_count
+
+
+def extract_keypoints(video_path, workers=None, model_complexity=1, pose=None,
+                      min_chunk_frames=MIN_CHUNK_FRAMES, warmup=WARMUP_FRAMES, progress=None):
+    """Extract pose keypoints from a video, in parallel chunks when it pays off.
+
+    Returns a dict with `fps`, `duration` and the `frame_numbers`,
+    `timestamps`, `keypoints` (T, 33, 3) and `visibility` (T, 33) arrays,
+    covering only frames in which a person was detected. With one worker
+    (or a short video) the whole video runs serially on `pose`, or on one
+    checked out of the shared pose pool when none is given. `progress(fraction)` is
+    called as frames (serial) or whole chunks (parallel) complete.
+    """
+    workers = workers or os.cpu_count() or 1
+    fps, frame_count = video_properties(video_path)
+    ranges = plan_chunks(frame_count, workers, min_chunk_frames)
+
+    if len(ranges) == 1 and pose is not None:
+        arrays = _extract_range(video_path, 0, None, pose=pose, progress=progress, total_frames=frame_count)
+    elif len(ranges) == 1:
+        with get_pose_pool(model_complexity=model_complexity).checkout() as pose:
+            arrays = _extract_range(video_path, 0, None, pose=pose, progress=progress, total_frames=frame_count)
+    else:
+        # spawn rather than fork: MediaPipe graphs do not survive a fork
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context,
+                                 initializer=_init_worker, initargs=(model_complexity,)) as executor:
+            futures = [executor.submit(_extract_range, video_path, start, end, warmup) for start, end in ranges]
+            if progress:
+                chunk_frames = {future: (end or frame_count) - start for future, (start, end) in zip(futures, ranges)}
+                done_frames = 0
+                for future in as_completed(futures):
+                    done_frames += chunk_frames[future]
+                    progress(min(1.0, done_frames / max(1, frame_count)))
+            arrays = _merge_chunks([future.result() for future in futures])
+
+    arrays["fps"] = fps
+    arrays["duration"] = frame_count / fps if fps else 0
+    return arrays
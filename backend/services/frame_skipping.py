@@ -0,0 +1,81 @@
+import math
+import time
+import numpy as np
+
+# Weight of the newest measurement in the running average of inference time
+INFERENCE_SMOOTHING = 0.2
+
+
+class FrameSkipper:
+    """Run full pose inference on every k-th live frame and extrapolate the frames in between.
+
+    k (`interval`) is the measured inference time (running average) over
+    `budget_seconds`, the inference time the session may spend per frame on
+    average, clipped to 1..`max_interval`. While any joint moves faster
+    than `motion_threshold` (normalized image units per frame) every frame
+    is inferred, since extrapolation only holds up for slow movement.
+    Skipped frames get the last detected pose advanced by its per-frame
+    velocity, damped by `damping` each frame so estimates settle instead
+    of drifting.
+    """
+
+    def __init__(self, budget_seconds, max_interval=4, motion_threshold=0.02, damping=0.8):
+        self.budget_seconds = budget_seconds
+        self.max_interval = max(1, max_interval)
+        self.motion_threshold = motion_threshold
+        self.damping = damping
+        self.interval = 1
+        self.inference_seconds = None
+        self.inferred_frames = 0
+        self.extrapolated_frames = 0
+        self._since_inference = 0
+        self._last_pose = None
+        self._velocity = None
+
+    def should_infer(self):
+        """Whether the next frame needs full inference (always after a frame without a detected pose)."""
+        return self._last_pose is None or self._since_inference + 1 >= self.interval
+
+    def infer(self, detect):
+        """Time `detect()`, which returns a (J, D) pose array or None, and adapt the interval to it."""
+        start = time.perf_counter()
+        pose = detect()
+        elapsed = time.perf_counter() - start
+
+        self.inferred_frames += 1
+        self.inference_seconds = elapsed if self.inference_seconds is None else (
+            INFERENCE_SMOOTHING * elapsed + (1 - INFERENCE_SMOOTHING) * self.inference_seconds
+        )
+        if pose is None:
+            self._last_pose = self._velocity = None
+        else:
+            frames = self._since_inference + 1
+            self._velocity = np.zeros_like(pose) if self._last_pose is None else (pose - self._last_pose) / frames
+            self._last_pose = pose
+        self._since_inference = 0
+        self.interval = self._next_interval()
+        return pose
+
+    def extrapolate(self):
+        """Estimate the pose of a skipped frame from the last detected pose and its velocity."""
+        self._since_inference += 1
+        self.extrapolated_frames += 1
+        steps = self._since_inference
+        # Distance covered with the velocity shrinking by `damping` every frame
+        factor = steps if self.damping >= 1 else self.damping * (1 - self.damping ** steps) / (1 - self.damping)
+        return self._last_pose + self._velocity * factor
+
+    def _next_interval(self):
+        if self._velocity is None or self.budget_seconds <= 0:
+            return 1
+        if float(np.nanmax(np.linalg.norm(self._velocity, axis=-1), initial=0.0)) > self.motion_threshold:
+            return 1
+        return int(min(self.max_interval, max(1, math.ceil(self.inference_seconds / self.budget_seconds))))
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "inference_ms": (self.inference_seconds or 0.0) * 1000,
+            "inferred_frames": self.inferred_frames,
+            "extrapolated_frames": self.extrapolated_frames,
+        }
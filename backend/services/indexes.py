@@ -0,0 +1,64 @@
+from pymongo import ASCENDING, IndexModel
+from models.category import name_query
+from models.job import UNFINISHED_QUERY, UNFINISHED_SORT
+from models.leaderboard import LEADERBOARD_INDEXES, TOP_SORT, top_query
+from models.motion import motion_query
+from models.result import user_results_query, video_results_query
+from models.user import email_query
+from models.video import LISTING_SORT, category_query
+
+# Indexes behind every per-request lookup, by collection
+INDEXES = {
+    "motion_data": [IndexModel([("video_id", ASCENDING)])],
+    "results": [
+        IndexModel([("user_id", ASCENDING)]),
+        IndexModel([("video_id", ASCENDING)]),
+    ],
+    "users": [IndexModel([("email", ASCENDING)])],
+    "categories": [IndexModel([("name", ASCENDING)])],
+    "videos": [IndexModel([("category_id", ASCENDING), ("_id", ASCENDING)])],
+    "ingestion_jobs": [IndexModel([("state", ASCENDING), ("created_at", ASCENDING)])],
+    "leaderboard_stats": LEADERBOARD_INDEXES,
+}
+
+# (description, collection, filter, sort) of the queries the models run on hot paths,
+# built with the models' own query helpers so the check follows model changes
+_PLACEHOLDER_ID = "000000000000000000000000"
+HOT_QUERIES = [
+    ("MotionData.get_motion_data", "motion_data", motion_query(_PLACEHOLDER_ID), None),
+    ("Result.find_results_by_user", "results", user_results_query(_PLACEHOLDER_ID), None),
+    ("Result.find_results_by_video", "results", video_results_query(_PLACEHOLDER_ID), None),
+    ("User.find_user_by_email", "users", email_query("user@example.com"), None),
+    ("Category.find_category_by_name", "categories", name_query("Category"), None),
+    ("Video.list_videos", "videos", category_query(_PLACEHOLDER_ID), LISTING_SORT),
+    ("IngestionJob.find_unfinished_jobs", "ingestion_jobs", UNFINISHED_QUERY, UNFINISHED_SORT),
+    ("Leaderboard.top", "leaderboard_stats", top_query(), TOP_SORT),
+]
+
+def ensure_indexes(db):
+    """Create any missing declared index; returns the index names per collection."""
+    return {name: db[name].create_indexes(indexes) for name, indexes in INDEXES.items()}
+
+
+def _plan_stages(plan):
+    """Every `stage` name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def check_query_plans(db):
+    """explain() each hot query; returns (description, winning stages, collection_scan) per query."""
+    report = []
+    for description, collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = list(_plan_stages(cursor.explain()["queryPlanner"]["winningPlan"]))
+        report.append((description, stages, "COLLSCAN" in stages))
+    return report
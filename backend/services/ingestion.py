@@ -0,0 +1,196 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from bson.objectid import ObjectId
+from flask_socketio import join_room
+from config import Config
+from models.job import IngestionJob, SCORE, QUEUED, UPLOADING, EXTRACTING, DONE, FAILED
+from models.motion import MotionData
+from models.video import Video
+from services.offline import score_attempt
+from services.socket_config import socketio
+from services.video_cache import video_cache
+
+# Share of the job's progress covered by the upload step; extraction fills the rest
+UPLOAD_PROGRESS = 0.1
+# Smallest progress change that is persisted and pushed to clients
+PROGRESS_STEP = 0.01
+
+
+def job_room(job_id):
+    """Socket.IO room that receives a job's `ingestion_progress` events."""
+    return f"ingestion:{job_id}"
+
+
+class IngestionQueue:
+    """Run video ingestion jobs (storage upload + keypoint extraction) on a local worker pool.
+
+    Scoring recorded attempts runs through the same pool as `SCORE` jobs.
+
+    Job state lives in the `ingestion_jobs` collection so clients can poll it
+    and interrupted jobs can be resumed; progress is also pushed as
+    `ingestion_progress` Socket.IO events to the job's room.
+    """
+
+    def __init__(self, db, video_model=None, workers=None):
+        self.db = db
+        self.jobs = IngestionJob(db)
+        self.video_model = video_model or Video(db)
+        self.workers = workers or Config.INGESTION_WORKERS
+        self._executor = None
+        self._lock = threading.Lock()
+        self._last_progress = {}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingestion")
+            return self._executor
+
+    def save_upload(self, video_file):
+        """Persist an uploaded file where its job can still find it after a restart."""
+        os.makedirs(Config.INGESTION_DIR, exist_ok=True)
+        path = os.path.join(Config.INGESTION_DIR, f"{uuid.uuid4().hex}.mp4")
+        video_file.save(path)
+        return path
+
+    def enqueue(self, file_path, category_id, title, description="", video_id=None, socket_id=None):
+        """Queue a saved upload for processing and return the job ID.
+
+        With `socket_id` that client is subscribed to the job's progress events.
+        """
+        job_id = str(self.jobs.create_job(file_path, category_id, title, description, video_id).inserted_id)
+        return self._submit(job_id, socket_id)
+
+    def enqueue_score(self, file_path, video_id, user_id, socket_id=None):
+        """Queue scoring a saved recording of `user_id` attempting `video_id` and return the job ID."""
+        job_id = str(self.jobs.create_score_job(file_path, video_id, user_id).inserted_id)
+        return self._submit(job_id, socket_id)
+
+    def _submit(self, job_id, socket_id=None):
+        if socket_id:
+            join_room(job_room(job_id), sid=socket_id, namespace="/")
+        self._emit(job_id, QUEUED, 0.0)
+        self._get_executor().submit(self.run_job, job_id)
+        return job_id
+
+    def retry(self, job_id):
+        """Requeue a failed job whose upload file is still kept; returns False if it cannot be retried."""
+        job = self.jobs.find_job_by_id(job_id)
+        if not job or job["state"] != FAILED or not job.get("file_path") or not os.path.exists(job["file_path"]):
+            return False
+        self.jobs.update_job(job_id, error=None)
+        self._set_state(job_id, QUEUED, job.get("progress", 0.0))
+        self._get_executor().submit(self.run_job, job_id)
+        return True
+
+    def resume_pending(self):
+        """Requeue jobs interrupted by a restart; fail those whose upload file is gone."""
+        self.purge_expired()
+        for job in self.jobs.find_unfinished_jobs():
+            job_id = str(job["_id"])
+            if os.path.exists(job["file_path"]):
+                self.jobs.update_job(job_id, state=QUEUED)
+                self._get_executor().submit(self.run_job, job_id)
+            else:
+                self._set_state(job_id, FAILED, job.get("progress", 0.0), error="Upload file was lost before processing finished")
+
+    def purge_expired(self):
+        """Delete the upload files of failed jobs older than `Config.INGESTION_RETENTION_HOURS`."""
+        for job in self.jobs.find_expired_failed_jobs(Config.INGESTION_RETENTION_HOURS):
+            self._remove_upload(str(job["_id"]), job["file_path"])
+
+    def run_job(self, job_id):
+        """Run an ingestion or scoring job.
+
+        The upload file is deleted once the job is done; a failed job keeps
+        it so it can be retried until it expires.
+        """
+        job = self.jobs.find_job_by_id(job_id)
+        file_path = job["file_path"]
+        try:
+            if job.get("kind") == SCORE:
+                self._score(job_id, job)
+            else:
+                self._ingest(job_id, job)
+        except Exception as e:
+            self._set_state(job_id, FAILED, self._last_progress.get(job_id, 0.0), error=str(e))
+        else:
+            self._remove_upload(job_id, file_path)
+        finally:
+            self._last_progress.pop(job_id, None)
+
+    def _ingest(self, job_id, job):
+        """Upload the job's file (unless already done) and extract its motion data."""
+        file_path = job["file_path"]
+        video_id = job.get("video_id")
+        if not job.get("uploaded"):
+            # Asset name and video ID are recorded before uploading, so a job
+            # resumed after a crash overwrites the same asset and document
+            public_id = job.get("public_id") or f"ingest_{job_id}"
+            if video_id is None:
+                video_id = ObjectId()
+            self.jobs.update_job(job_id, video_id=ObjectId(video_id), public_id=public_id)
+
+            self._set_state(job_id, UPLOADING, 0.0)
+            if job["replace"]:
+                if not self.video_model.replace_video_file(video_id, file_path, public_id=public_id):
+                    raise Exception("Video not found")
+            else:
+                self.video_model.upload_video(
+                    job["category_id"], job["title"], file_path, job["description"],
+                    video_id=video_id, public_id=public_id
+                )
+            self.jobs.update_job(job_id, uploaded=True)
+
+        self._set_state(job_id, EXTRACTING, UPLOAD_PROGRESS)
+        motion_model = MotionData(self.db)
+        motion_model.delete_motion_data(video_id)  # Replaced video or resumed job
+        motion_model.extract_motion_data(
+            file_path, str(video_id),
+            progress=lambda fraction: self._report(job_id, UPLOAD_PROGRESS + (1 - UPLOAD_PROGRESS) * fraction)
+        )
+        # Transcode for live sessions from the local upload, so no session has to stream the original.
+        # Best effort: without it sessions stream the original
+        try:
+            video_cache.transcode(str(video_id), file_path)
+        except Exception as e:
+            print(f"Could not cache a transcode of video {video_id}: {e}")
+        self._set_state(job_id, DONE, 1.0, video_id=str(video_id))
+
+    def _score(self, job_id, job):
+        """Score the recorded attempt and store the summary (and a `Result`) for the client to poll."""
+        self._set_state(job_id, EXTRACTING, 0.0)
+        summary = score_attempt(
+            self.db, job["file_path"], str(job["video_id"]), job["user_id"],
+            progress=lambda fraction: self._report(job_id, fraction)
+        )
+        self.jobs.update_job(job_id, result=summary)
+        self._set_state(job_id, DONE, 1.0, video_id=str(job["video_id"]))
+
+    def _remove_upload(self, job_id, file_path):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        self.jobs.update_job(job_id, file_path=None)
+
+    def _set_state(self, job_id, state, progress, error=None, video_id=None):
+        self._last_progress[job_id] = progress
+        fields = {"state": state, "progress": progress}
+        if error is not None:
+            fields["error"] = error
+        self.jobs.update_job(job_id, **fields)
+        self._emit(job_id, state, progress, error=error, video_id=video_id)
+
+    def _report(self, job_id, progress):
+        if progress - self._last_progress.get(job_id, 0.0) >= PROGRESS_STEP:
+            self._set_state(job_id, EXTRACTING, progress)
+
+    def _emit(self, job_id, state, progress, error=None, video_id=None):
+        socketio.emit("ingestion_progress", {
+            "job_id": job_id,
+            "state": state,
+            "progress": progress,
+            "error": error,
+            "video_id": video_id
+        }, to=job_room(job_id))
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def interpolate_keyframes(keyframes, values, frame_count):
+    """Rebuild `frame_count` rows from `values` (K, ...) held at ascending frame indices `keyframes` (K,).
+
+    Frames between two keyframes are linearly interpolated; frames outside
+    the keyframe range repeat the nearest keyframe.
+    """
+    keyframes = np.asarray(keyframes, dtype=np.int64)
+    values = np.asarray(values)
+    if len(keyframes) == 1:
+        return np.repeat(values, frame_count, axis=0)
+
+    positions = np.arange(frame_count)
+    right = np.clip(np.searchsorted(keyframes, positions, side="right"), 1, len(keyframes) - 1)
+    left = right - 1
+    weights = np.clip((positions - keyframes[left]) / (keyframes[right] - keyframes[left]), 0.0, 1.0)
+    weights = weights.reshape((-1,) + (1,) * (values.ndim - 1)).astype(values.dtype)
+    return values[left] + (values[right] - values[left]) * weights
+
+
+def _segment_error(points, start, end):
+    """Largest joint distance between frames start..end and their interpolation from the two ends."""
+    if end - start < 2:
+        return 0.0
+    weights = (np.arange(1, end - start) / (end - start))[:, None, None]
+    interpolated = points[start] + (points[end] - points[start]) * weights
+    return float(np.nanmax(np.linalg.norm(points[start + 1:end] - interpolated, axis=-1), initial=0.0))
+
+
+def select_keyframes(keypoints, max_error):
+    """Frame indices to keep so interpolation rebuilds every joint's x/y within `max_error`.
+
+    `keypoints` is (T, J, 2+) in normalized image coordinates. The first
+    and last frames are always kept; each segment is grown as far as
+    interpolation stays within the bound (doubling, then bisecting the
+    boundary), so held poses collapse to their two ends while fast
+    movement keeps most frames.
+    """
+    frame_count = len(keypoints)
+    if frame_count <= 2:
+        return np.arange(frame_count, dtype=np.int32)
+
+    points = np.asarray(keypoints, dtype=np.float64)[..., :2]
+    keyframes = [0]
+    start = 0
+    while start < frame_count - 1:
+        good, bad, step = start + 1, None, 2
+        while good < frame_count - 1:
+            candidate = min(start + step, frame_count - 1)
+            if _segment_error(points, start, candidate) > max_error:
+                bad = candidate
+                break
+            good, step = candidate, step * 2
+        while bad is not None and bad - good > 1:
+            middle = (good + bad) // 2
+            if _segment_error(points, start, middle) <= max_error:
+                good = middle
+            else:
+                bad = middle
+        keyframes.append(good)
+        start = good
+    return np.array(keyframes, dtype=np.int32)
+
+
+def reconstruction_error(keypoints, keyframes, stored=None):
+    """Largest x/y distance between `keypoints` and their rebuild from `stored` (default: the keyframe rows)."""
+    stored = keypoints[keyframes] if stored is None else stored
+    rebuilt = interpolate_keyframes(keyframes, stored, len(keypoints))
+    distances = np.linalg.norm((rebuilt[..., :2] - keypoints[..., :2]).astype(np.float64), axis=-1)
+    return float(np.nanmax(distances, initial=0.0))
+
+
+def keyframe_stats(keypoints, keyframes, max_error, stored=None):
+    """Compression ratio (frames per kept frame) and measured worst-case error of one keyframe selection."""
+    return {
+        "max_error_bound": max_error,
+        "frame_count": len(keypoints),
+        "keyframe_count": len(keyframes),
+        "compression_ratio": len(keypoints) / max(len(keyframes), 1),
+        "max_error": reconstruction_error(keypoints, keyframes, stored),
+    }
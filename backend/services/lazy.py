@@ -0,0 +1,21 @@
+import threading
+from werkzeug.local import LocalProxy
+
+
+def lazy(factory):
+    """A proxy to `factory()`, built once on first use.
+
+    Lets modules declare their database handle and models at the top level
+    without connecting to MongoDB when they are imported.
+    """
+    lock = threading.Lock()
+    built = []
+
+    def resolve():
+        if not built:
+            with lock:
+                if not built:
+                    built.append(factory())
+        return built[0]
+
+    return LocalProxy(resolve)
@@ -0,0 +1,203 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, request
+
+# Seconds; spans a fast numpy call up to a stalled camera read or slow request
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, typically refreshed by a collector before rendering."""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram, one series per label combination."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0, 0.0]  # bucket counts, count, sum
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, (list(series[0]), series[1], series[2])) for key, series in self._values.items())
+        for key, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+class Registry:
+    """Metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Call `collector()` before every render, e.g. to refresh gauges from live objects."""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+LIVE_STAGE_SECONDS = registry.register(Histogram(
+    "ifit_live_stage_seconds", "Time spent per frame in each stage of a live session.", ["kind", "stage"]
+))
+LIVE_FRAMES = registry.register(Counter(
+    "ifit_live_frames_total", "Frames processed by live sessions.", ["kind"]
+))
+LIVE_FRAMES_WITHOUT_LANDMARKS = registry.register(Counter(
+    "ifit_live_frames_without_landmarks_total", "Live frames in which no pose was detected.", ["kind"]
+))
+LIVE_FRAMES_EXTRAPOLATED = registry.register(Counter(
+    "ifit_live_frames_extrapolated_total", "Live frames scored on an extrapolated instead of a detected pose.", ["kind"]
+))
+LIVE_SESSIONS = registry.register(Counter(
+    "ifit_live_sessions_total", "Live sessions that have ended, by their last kind and final state.", ["kind", "state"]
+))
+LIVE_SESSIONS_ACTIVE = registry.register(Gauge(
+    "ifit_live_sessions_active", "Live sessions currently starting, calibrating or running."
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "ifit_http_request_duration_seconds", "Flask request latency per route.", ["endpoint", "method", "status"]
+))
+
+
+def observe_stage(kind, stage, seconds):
+    LIVE_STAGE_SECONDS.observe(seconds, kind=kind, stage=stage)
+
+
+def time_stage(kind, stage):
+    """Context manager timing one live-session stage."""
+    return LIVE_STAGE_SECONDS.time(kind=kind, stage=stage)
+
+
+def configure_metrics(app):
+    """Time every request per route and serve the registry on /metrics."""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop("metrics_request_started", None)
+        if started is not None and request.endpoint != "metrics":
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=response.status_code
+            )
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import Config
+
+
+def _entry_size(arrays):
+    return sum(value.nbytes for value in arrays.values() if isinstance(value, np.ndarray))
+
+
+class MotionCache:
+    """In-process LRU cache of parsed reference motion, bounded by total array bytes.
+
+    Entries are the array view returned by `MotionData.get_motion_data(as_arrays=True)`,
+    keyed by video id. Arrays are marked read-only because every session
+    shares them. `invalidate()` bumps the video's generation; a reader that
+    took `generation()` before its database read cannot put what it read
+    back after an invalidation.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._generations = {}
+        self._epoch = 0  # Bumped by clear(), which invalidates every video
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, video_id):
+        """Return a copy of the cached entry dict, or None."""
+        key = str(video_id)
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(arrays)
+
+    def generation(self, video_id):
+        """Token to take before reading motion data from the database and pass to `put()`."""
+        with self._lock:
+            return self._epoch, self._generations.get(str(video_id), 0)
+
+    def put(self, video_id, arrays, generation=None):
+        """Cache an entry, evicting least recently used ones to stay within budget.
+
+        With `generation`, the entry is dropped if the video was invalidated since it was taken.
+        """
+        size = _entry_size(arrays)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+
+        for value in arrays.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+        key = str(video_id)
+        with self._lock:
+            if generation is not None and (self._epoch, self._generations.get(key, 0)) != generation:
+                return  # Read before an invalidation: stale
+            self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = dict(arrays)
+            self._sizes[key] = size
+            self._bytes += size
+
+    def invalidate(self, video_id):
+        """Drop a video's entry after its motion data changed or was deleted."""
+        key = str(video_id)
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self._bytes -= self._sizes.pop(key)
+
+
+motion_cache = MotionCache(Config.MOTION_CACHE_BYTES)
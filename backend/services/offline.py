@@ -0,0 +1,99 @@
+import numpy as np
+from config import Config
+from models.motion import MotionData
+from models.result import Result
+from models.user import User
+from models.video import Video
+from services.alignment import OnlineAligner
+from services.pose_features import pose_features
+from services.scoring import score_features, score_sequence, session_summary
+
+
+def score_recording(video_path, reference, weight_kg, workers=None, progress=None):
+    """Score a recorded attempt against reference motion arrays as fast as the CPU allows.
+
+    `reference` is `MotionData.get_motion_data(..., as_arrays=True)`. Live
+    keypoints are extracted in parallel chunks (see `extract_keypoints`),
+    aligned to the reference the same way the live loop does, and scored
+    in one vectorized pass. Returns (summary, frame_scores), where summary
+    holds the same fields a live session stores in its `Result`.
+    """
+    from services.extraction import extract_keypoints
+
+    live = extract_keypoints(video_path, workers=workers or Config.EXTRACTION_WORKERS, progress=progress)
+    reference_fps = reference["fps"]
+    live_fps = live["fps"] or reference_fps
+
+    # A live session ends with the reference video, so later recorded frames are not scored
+    recorded_frames = int(round(live["duration"] * live_fps))
+    total_frames = min(recorded_frames, int(np.ceil(reference["duration"] * live_fps)))
+    detected = live["frame_numbers"] < total_frames
+    live_frame_numbers = live["frame_numbers"][detected]
+    live_poses = live["keypoints"][detected][:, :, :2]
+    active_frames = len(live_poses)
+
+    use_features = Config.SCORING_SPACE == "normalized"
+    if use_features:
+        reference_space = reference["normalized"]
+        live_space, live_angles = pose_features(live_poses)
+    else:
+        reference_space = reference["keypoints"][:, :, :2]
+        live_space = live_poses
+
+    if Config.ALIGNMENT_WINDOW > 0 and active_frames:
+        # Reference frame that would have been on screen when each recorded frame was captured
+        expected = np.searchsorted(reference["frame_numbers"], live_frame_numbers * reference_fps / live_fps)
+        aligner = OnlineAligner(reference_space, Config.ALIGNMENT_WINDOW, Config.ALIGNMENT_MAX_STEP)
+        reference_indices = np.array(
+            [aligner.update(pose, int(index))[0] for pose, index in zip(live_space, expected)], dtype=np.int64
+        )
+    else:
+        reference_indices = np.arange(active_frames)  # Lockstep: one reference frame per detected frame
+
+    scored = reference_indices < len(reference_space)
+    reference_indices = reference_indices[scored]
+    if use_features:
+        frame_scores, _, _ = score_features(
+            reference_space[reference_indices], live_space[scored],
+            reference["angles"][reference_indices], live_angles[scored],
+            Config.NORMALIZED_TOLERANCE, Config.ANGLE_WEIGHT
+        )
+    else:
+        frame_scores, _, _ = score_sequence(reference_space[reference_indices], live_space[scored])
+
+    duration_minutes = total_frames / live_fps / 60 if live_fps else 0.0
+    summary = session_summary(
+        weight_kg, duration_minutes, float(np.sum(frame_scores)), total_frames, active_frames, int(np.sum(scored))
+    )
+    return summary, frame_scores
+
+
+def score_attempt(db, video_path, video_id, user_id=None, weight_kg=None, save=True, workers=None, progress=None):
+    """Score a recorded attempt at `video_id` and, with `save`, store it like a live session.
+
+    The user's weight is used for the metrics when `user_id` is given;
+    saving requires a user and, as in a live session, updates their weight.
+    Raises LookupError when the video, its motion data or the user is missing.
+    """
+    if not Video(db).find_video_by_id(video_id):
+        raise LookupError("Video not found")
+    reference = MotionData(db).get_motion_data(video_id, as_arrays=True)
+    if not reference or not len(reference["keypoints"]):
+        raise LookupError("No preprocessed motion data found")
+
+    user_model = User(db)
+    user = user_model.find_user_by_id(user_id) if user_id else None
+    if user_id and not user:
+        raise LookupError("User not found")
+    if user:
+        weight_kg = float(user["weight"])
+
+    summary, frame_scores = score_recording(video_path, reference, weight_kg or 0.0, workers, progress)
+
+    if save and user:
+        user_model.update_user(user_id, {"weight": weight_kg - summary["calories_burned"] / 7700})
+        result = Result(db).create_result(video_id=video_id, user_id=user_id, **summary)
+        summary["result_id"] = str(result.inserted_id)
+
+    summary["scored_frames"] = len(frame_scores)
+    return summary
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+_END = object()
+
+
+class DropOldestQueue:
+    """Bounded queue that discards its oldest item instead of blocking the producer.
+
+    Consumers therefore always see the freshest data. `close()` marks the end
+    of the stream; `get()` returns `_END` once the queue is closed and drained.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+        self.puts = 0
+        self.drops = 0
+
+    def put(self, item):
+        with self._condition:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.drops += 1
+            self._items.append(item)
+            self.puts += 1
+            self._condition.notify()
+
+    def get(self):
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            return self._items.popleft() if self._items else _END
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Pipeline:
+    """A source and a chain of stages, each on its own thread, joined by drop-oldest queues.
+
+    The source is a generator function; each stage is a function taking the
+    previous stage's output and returning its own (None drops the item).
+    The output of the last stage is discarded, so it acts as the sink.
+    `observer(stage_name, seconds)`, when given, is called after every
+    stage call with how long it took.
+    """
+
+    def __init__(self, queue_size=2, observer=None):
+        self.queue_size = queue_size
+        self.observer = observer
+        self._source = None
+        self._stages = []
+        self._queues = []
+        self._processed = {}
+        self._error = None
+
+    def source(self, name, generator_func):
+        self._source = (name, generator_func)
+        self._processed[name] = 0
+        return self
+
+    def stage(self, name, func):
+        self._stages.append((name, func))
+        self._queues.append(DropOldestQueue(self.queue_size))
+        self._processed[name] = 0
+        return self
+
+    def run(self):
+        """Run every stage to completion; re-raises the first stage error."""
+        threads = [threading.Thread(target=self._run_source, daemon=True)]
+        for index, (name, func) in enumerate(self._stages):
+            threads.append(threading.Thread(target=self._run_stage, args=(index, name, func), daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._error:
+            raise self._error
+
+    def _run_source(self):
+        name, generator_func = self._source
+        output = self._queues[0]
+        try:
+            for item in generator_func():
+                if self._error:
+                    break
+                output.put(item)
+                self._processed[name] += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            output.close()
+
+    def _run_stage(self, index, name, func):
+        inbox = self._queues[index]
+        output = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        try:
+            while True:
+                item = inbox.get()
+                if item is _END or self._error:
+                    break
+                started = time.perf_counter()
+                result = func(item)
+                if self.observer:
+                    self.observer(name, time.perf_counter() - started)
+                self._processed[name] += 1
+                if output is not None and result is not None:
+                    output.put(result)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if output is not None:
+                output.close()
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        # Unblock every stage so the pipeline can wind down
+        for queue in self._queues:
+            queue.close()
+
+    def stats(self):
+        """Items processed per stage, plus depth and drop counters of each stage's input queue."""
+        stats = {self._source[0]: {"processed": self._processed[self._source[0]]}} if self._source else {}
+        for (name, _), queue in zip(self._stages, self._queues):
+            stats[name] = {
+                "processed": self._processed[name],
+                "queue_depth": len(queue),
+                "queue_size": queue.maxsize,
+                "dropped": queue.drops
+            }
+        return stats
@@ -0,0 +1,48 @@
+import numpy as np
+
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Angle measured at the middle joint of each (a, b, c) BlazePose triplet
+JOINT_ANGLES = {
+    "left_elbow": (11, 13, 15), "right_elbow": (12, 14, 16),
+    "left_shoulder": (13, 11, 23), "right_shoulder": (14, 12, 24),
+    "left_hip": (11, 23, 25), "right_hip": (12, 24, 26),
+    "left_knee": (23, 25, 27), "right_knee": (24, 26, 28),
+}
+_ANGLE_TRIPLETS = np.array(list(JOINT_ANGLES.values()))
+
+# Guards against a collapsed torso (e.g. a side-on or partially visible body)
+_MIN_TORSO = 1e-3
+
+
+def normalize_poses(keypoints):
+    """Hip-centred, torso-scaled x/y coordinates for (..., J, D) keypoints.
+
+    The origin is the mid-point of the hips and one unit is the distance
+    from the hip mid-point to the shoulder mid-point, so the result does not
+    depend on where the person stands or how far they are from the camera.
+    """
+    coords = np.asarray(keypoints, dtype=np.float32)[..., :2]
+    hip_center = (coords[..., LEFT_HIP, :] + coords[..., RIGHT_HIP, :]) / 2
+    shoulder_center = (coords[..., LEFT_SHOULDER, :] + coords[..., RIGHT_SHOULDER, :]) / 2
+    torso = np.linalg.norm(shoulder_center - hip_center, axis=-1)
+    torso = np.maximum(torso, _MIN_TORSO)
+    return (coords - hip_center[..., None, :]) / torso[..., None, None]
+
+
+def joint_angles(keypoints):
+    """Interior angles (radians, 0..pi) at the JOINT_ANGLES joints for (..., J, D) keypoints."""
+    coords = np.asarray(keypoints, dtype=np.float32)[..., :2]
+    a = coords[..., _ANGLE_TRIPLETS[:, 0], :]
+    b = coords[..., _ANGLE_TRIPLETS[:, 1], :]
+    c = coords[..., _ANGLE_TRIPLETS[:, 2], :]
+    ba, bc = a - b, c - b
+    cross = ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0]
+    dot = np.sum(ba * bc, axis=-1)
+    return np.abs(np.arctan2(cross, dot)).astype(np.float32)
+
+
+def pose_features(keypoints):
+    """Return (normalized, angles) for one pose (J, D) or a sequence (T, J, D) in one pass."""
+    return normalize_poses(keypoints), joint_angles(keypoints)
@@ -0,0 +1,113 @@
+import queue
+import threading
+from contextlib import contextmanager
+import numpy as np
+from config import Config
+from services.metrics import registry, Gauge
+
+# mediapipe.solutions.pose.Pose defaults, so Pose() and Pose(model_complexity=1) share a pool
+_DEFAULT_OPTIONS = {"static_image_mode": False, "model_complexity": 1}
+
+
+class PosePool:
+    """Fixed-size pool of reusable MediaPipe Pose estimators.
+
+    Estimators are built lazily up to `max_size`; `checkout()` blocks when
+    all of them are in use. Returned estimators are reset (which rebuilds
+    the graph, ~100 ms) by the releasing thread, so tracking state never
+    leaks into the next session and checkouts stay cheap.
+    """
+
+    def __init__(self, max_size, **pose_options):
+        self.max_size = max_size
+        self.pose_options = pose_options
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _build(self):
+        """Build an estimator for a slot already counted in `_created`; the slot is freed if building fails."""
+        try:
+            # Imported here: mediapipe is by far the slowest import of the backend
+            import mediapipe as mp
+
+            return mp.solutions.pose.Pose(**self.pose_options)
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def prewarm(self, count=1):
+        """Build up to `count` idle estimators now and run one frame through each, so the model is loaded."""
+        blank = np.zeros((64, 64, 3), dtype=np.uint8)
+        while self._idle.qsize() < count:
+            with self._lock:
+                if self._created >= self.max_size:
+                    return
+                self._created += 1
+            pose = self._build()
+            pose.process(blank)
+            self._idle.put(pose)
+
+    def acquire(self, timeout=None):
+        try:
+            pose = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+            pose = self._build() if can_create else self._idle.get(timeout=timeout)
+        return pose
+
+    def release(self, pose):
+        pose.reset()
+        self._idle.put(pose)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        pose = self.acquire(timeout)
+        try:
+            yield pose
+        finally:
+            self.release(pose)
+
+    def stats(self):
+        return {"size": self._created, "idle": self._idle.qsize(), "max_size": self.max_size}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+POSE_ESTIMATORS = registry.register(Gauge(
+    "ifit_pose_estimators", "Pooled MediaPipe Pose estimators per configuration, built or idle.", ["config", "state"]
+))
+
+
+def get_pose_pool(max_size=None, **pose_options):
+    """The process-wide pool for one Pose configuration (complexity, static mode, ...), created on first use.
+
+    `max_size` (default `Config.POSE_POOL_SIZE`) only applies when the pool is created.
+    """
+    options = {**_DEFAULT_OPTIONS, **pose_options}
+    key = tuple(sorted(options.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PosePool(max_size or Config.POSE_POOL_SIZE, **options)
+        return _pools[key]
+
+
+def pose_pool_stats():
+    """Stats of every pool, keyed by its configuration."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {",".join(f"{name}={value}" for name, value in key): pool.stats() for key, pool in pools}
+
+
+def _collect_pool_metrics():
+    for config, stats in pose_pool_stats().items():
+        POSE_ESTIMATORS.set(stats["size"], config=config, state="built")
+        POSE_ESTIMATORS.set(stats["idle"], config=config, state="idle")
+
+
+registry.add_collector(_collect_pool_metrics)
@@ -0,0 +1,78 @@
+import cv2
+import numpy as np
+from services.video_cache import video_cache
+
+REFERENCE_COLOR = (255, 255, 255)
+
+
+class ReferenceSource:
+    """The reference side of a live session, read one frame per webcam frame at the webcam's size.
+
+    Plays the locally cached transcode when there is one; otherwise it
+    streams `video_url` (resizing every frame). Transcodes are made by
+    ingestion, not here, so a session never competes with one. With `render_keypoints` no video is decoded at all:
+    the stored keypoints of the frame that is due are drawn on a blank
+    canvas. `frame_no` is the reference video frame number last read.
+    """
+
+    def __init__(self, video_id, video_url, motion, render_keypoints=False):
+        self.frame_no = -1
+        self._motion = motion
+        self._capture = None
+        if render_keypoints:
+            import mediapipe as mp
+
+            self.source = "keypoints"
+            self._connections = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS))
+            self._last_frame_no = int(motion["frame_numbers"][-1]) if len(motion["frame_numbers"]) else -1
+        else:
+            path = video_cache.get(video_id)
+            self.source = "cache" if path else "stream"
+            self._capture = cv2.VideoCapture(path or video_url)
+
+    def is_open(self):
+        return self._capture is None or self._capture.isOpened()
+
+    def read(self, width, height):
+        """(ok, frame) for the next reference frame, sized width x height."""
+        if self._capture is None:
+            self.frame_no += 1
+            if self.frame_no > self._last_frame_no:
+                return False, None
+            return True, self._render(width, height)
+
+        ret, frame = self._capture.read()
+        if not ret:
+            return False, None
+        self.frame_no = int(self._capture.get(cv2.CAP_PROP_POS_FRAMES)) - 1
+        if frame.shape[1::-1] != (width, height):
+            frame = cv2.resize(frame, (width, height))
+        return True, frame
+
+    def advance(self):
+        """Step to the next reference frame without decoding or drawing it; False at the end."""
+        if self._capture is None:
+            self.frame_no += 1
+            return self.frame_no <= self._last_frame_no
+        if not self._capture.grab():
+            return False
+        self.frame_no += 1
+        return True
+
+    def _render(self, width, height):
+        frame_numbers = self._motion["frame_numbers"]
+        index = min(int(np.searchsorted(frame_numbers, self.frame_no)), len(frame_numbers) - 1)
+        keypoints = self._motion["keypoints"][index, :, :2]
+        visible = np.isfinite(keypoints).all(axis=-1)
+        points = np.round(np.where(visible[:, None], keypoints, 0) * (width, height)).astype(np.int32)
+
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        lines = [points[pair] for pair in self._connections if visible[pair].all()]
+        cv2.polylines(canvas, lines, False, REFERENCE_COLOR, 3)
+        for x, y in points[visible]:
+            cv2.circle(canvas, (int(x), int(y)), 5, REFERENCE_COLOR, -1)
+        return canvas
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
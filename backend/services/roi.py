@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+from services.scoring import landmarks_to_array
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+# Smallest crop, as a fraction of the frame side, so a partly detected person is not cut too tight
+MIN_BOX_SIDE = 0.2
+
+
+def landmark_box(pose, padding=0.25):
+    """Normalized (x0, y0, x1, y1) around the (J, 2+) landmarks, padded by `padding` of its size per side."""
+    points = pose[..., :2][np.isfinite(pose[..., :2]).all(axis=-1)]
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    pad_x = max((x1 - x0) * padding, (MIN_BOX_SIDE - (x1 - x0)) / 2, 0.0)
+    pad_y = max((y1 - y0) * padding, (MIN_BOX_SIDE - (y1 - y0)) / 2, 0.0)
+    return (
+        float(np.clip(x0 - pad_x, 0, 1)), float(np.clip(y0 - pad_y, 0, 1)),
+        float(np.clip(x1 + pad_x, 0, 1)), float(np.clip(y1 + pad_y, 0, 1))
+    )
+
+
+def crop_frame(frame, box, max_side=None):
+    """Cut `box` out of `frame`, downscaled so its longest side is at most `max_side` pixels.
+
+    Returns (crop, box) where box is the normalized region actually cut
+    after snapping to whole pixels, for mapping landmarks back.
+    """
+    height, width = frame.shape[:2]
+    left, top = int(box[0] * width), int(box[1] * height)
+    right, bottom = max(left + 1, int(np.ceil(box[2] * width))), max(top + 1, int(np.ceil(box[3] * height)))
+    crop = frame[top:bottom, left:right]
+    scale = max_side / max(crop.shape[:2]) if max_side else 1.0
+    if scale < 1.0:
+        # Bilinear: INTER_AREA costs several ms at webcam sizes, more than the crop saves
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    return crop, (left / width, top / height, right / width, bottom / height)
+
+
+def to_full_frame(pose, box):
+    """Map (J, 2+) landmarks normalized to the crop `box` back to full-frame normalized x/y."""
+    x0, y0, x1, y1 = box
+    mapped = np.array(pose, dtype=np.float32, copy=True)
+    mapped[..., 0] = x0 + mapped[..., 0] * (x1 - x0)
+    mapped[..., 1] = y0 + mapped[..., 1] * (y1 - y0)
+    return mapped
+
+
+def _contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+class RoiTracker:
+    """Run pose inference on a padded crop around the person found in the previous frame.
+
+    The crop is downscaled to at most `max_side` pixels. Landmarks come
+    back in full-frame normalized coordinates, so scoring is unaffected.
+    The first frame, and any frame after tracking is lost, uses the full
+    frame; a crop that misses the person is retried on the full frame at
+    once. The crop is kept while the person stays inside it and is not
+    much smaller than it, so the estimator sees a steady image.
+    """
+
+    def __init__(self, padding=0.25, max_side=384):
+        self.padding = padding
+        self.max_side = max_side
+        self.box = None
+        self.cropped_frames = 0
+        self.full_frames = 0
+
+    def detect(self, pose, frame):
+        """Landmarks (J, 2) of BGR `frame` in full-frame normalized coordinates, or None."""
+        if self.box is not None:
+            landmarks = self._process(pose, frame, self.box)
+            if landmarks is not None:
+                self.cropped_frames += 1
+                self._track(landmarks)
+                return landmarks
+
+        self.full_frames += 1
+        landmarks = self._process(pose, frame, FULL_FRAME)
+        self.box = None
+        if landmarks is not None:
+            self._track(landmarks)
+        return landmarks
+
+    def _process(self, pose, frame, box):
+        if box == FULL_FRAME:
+            image = frame
+        else:
+            image, box = crop_frame(frame, box, self.max_side)
+        results = pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks:
+            return None
+        landmarks = landmarks_to_array(results.pose_landmarks)
+        return landmarks if box == FULL_FRAME else to_full_frame(landmarks, box)
+
+    def _track(self, landmarks):
+        tight = landmark_box(landmarks, padding=0.0)
+        wanted = landmark_box(landmarks, self.padding)
+        if self.box is not None and _contains(self.box, tight):
+            # Keep a crop that still fits unless it has grown to more than twice the needed area
+            box_area = (self.box[2] - self.box[0]) * (self.box[3] - self.box[1])
+            if box_area <= 2 * (wanted[2] - wanted[0]) * (wanted[3] - wanted[1]):
+                return
+        self.box = wanted
+
+    def stats(self):
+        return {"box": self.box, "cropped_frames": self.cropped_frames, "full_frames": self.full_frames}
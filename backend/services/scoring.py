@@ -0,0 +1,159 @@
+import numpy as np
+
+NUM_KEYPOINTS = 33
+
+
+def pose_to_array(pose, dims=2, num_keypoints=None):
+    """Convert a `keypoint_{i}` dict into a (J, dims) float32 array.
+
+    Missing keypoints are filled with NaN so they drop out of the scores.
+    """
+    if isinstance(pose, np.ndarray):
+        return np.asarray(pose[..., :dims], dtype=np.float32)
+
+    axes = ("x", "y", "z")[:dims]
+    num_keypoints = len(pose) if num_keypoints is None else num_keypoints
+    coords = np.full((num_keypoints, dims), np.nan, dtype=np.float32)
+    for i in range(num_keypoints):
+        keypoint = pose.get(f"keypoint_{i}")
+        if keypoint:
+            coords[i] = [keypoint[axis] for axis in axes]
+    return coords
+
+
+def landmarks_to_array(landmarks, dims=2):
+    """Convert MediaPipe pose landmarks straight into a (J, dims) float32 array."""
+    if dims == 3:
+        return np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark], dtype=np.float32)
+    return np.array([(lm.x, lm.y) for lm in landmarks.landmark], dtype=np.float32)
+
+
+def frames_to_array(frames, dims=2):
+    """Stack stored motion frames into a (T, J, dims) float32 array."""
+    if not frames:
+        return np.zeros((0, NUM_KEYPOINTS, dims), dtype=np.float32)
+    num_keypoints = len(frames[0]["keypoints"])
+    return np.stack([pose_to_array(frame["keypoints"], dims, num_keypoints) for frame in frames])
+
+
+def joint_errors(ref, live):
+    """Per-joint Euclidean distance for (..., J, D) arrays; NaN where a joint is missing."""
+    return np.sqrt(np.sum(np.square(ref - live), axis=-1))
+
+
+def score_pose(ref, live):
+    """Score one live pose against a reference pose in a single pass.
+
+    Returns (similarity, mean_distance, per_joint_errors) using the same
+    formulas as the original dict-based scoring: similarity is the mean of
+    max(0, 1 - d) over all reference joints, as a percentage, and the
+    distance is the mean joint distance. Mismatched poses score 0 / inf.
+    """
+    if ref.shape[0] != live.shape[0]:
+        return 0.0, float("inf"), None
+
+    errors = joint_errors(ref, live)
+    num_keypoints = ref.shape[0]
+    similarity = np.nansum(np.maximum(0.0, 1.0 - errors)) / num_keypoints * 100
+    distance = np.nansum(errors) / num_keypoints
+    return float(similarity), float(distance), errors
+
+
+def score_sequence(ref_seq, live_seq):
+    """Score whole (T, J, D) sequences at once.
+
+    Returns per-frame similarity and distance arrays of shape (T,) plus the
+    (T, J) per-joint errors.
+    """
+    if ref_seq.shape[1:] != live_seq.shape[1:] or ref_seq.shape[0] != live_seq.shape[0]:
+        raise ValueError(f"Sequence shapes do not match: {ref_seq.shape} vs {live_seq.shape}")
+
+    errors = joint_errors(ref_seq, live_seq)
+    num_keypoints = ref_seq.shape[1]
+    similarity = np.nansum(np.maximum(0.0, 1.0 - errors), axis=-1) / num_keypoints * 100
+    distance = np.nansum(errors, axis=-1) / num_keypoints
+    return similarity, distance, errors
+
+
+def score_features(ref_normalized, live_normalized, ref_angles, live_angles, tolerance=2.0, angle_weight=0.5):
+    """Score poses in hip-centred, torso-scaled space blended with joint-angle agreement.
+
+    Works on single poses ((J, 2) / (A,)) or sequences ((T, J, 2) / (T, A)).
+    Position similarity is the mean of max(0, 1 - d / tolerance), with d in
+    torso lengths; angle similarity is the mean of 1 - |dtheta| / pi.
+    Returns (similarity, mean_distance, per_joint_errors).
+    """
+    errors = joint_errors(ref_normalized, live_normalized)
+    num_keypoints = ref_normalized.shape[-2]
+    position_similarity = np.nansum(np.maximum(0.0, 1.0 - errors / tolerance), axis=-1) / num_keypoints * 100
+    angle_similarity = (1.0 - np.nanmean(np.abs(ref_angles - live_angles), axis=-1) / np.pi) * 100
+    similarity = (1 - angle_weight) * position_similarity + angle_weight * angle_similarity
+    distance = np.nansum(errors, axis=-1) / num_keypoints
+    return similarity, distance, errors
+
+
+def get_feedback(score):
+    """Feedback label and BGR overlay colour for a similarity score."""
+    if score >= 90:
+        return "PERFECT!", (0, 255, 0)
+    elif score >= 75:
+        return "GREAT!", (0, 200, 255)
+    elif score >= 50:
+        return "GOOD!", (0, 165, 255)
+    else:
+        return "KEEP TRYING!", (0, 0, 255)
+
+
+def calculate_metrics(weight_kg, duration_minutes, steps_taken, accuracy_score, active_frames, total_frames):
+    # Calculate activity level: percentage of frames where the user was active
+    activity_level = active_frames / total_frames if total_frames > 0 else 0
+
+    # Adjust MET value based on activity level
+    # MET = 1.0 for no activity (resting), 5.0 for full activity
+    met_value = 1.0 + (4.0 * activity_level)  # Scales from 1.0 to 5.0 based on activity
+
+    # Calculate calories burned based on adjusted MET value
+    calories_burned = (met_value * weight_kg * duration_minutes) / 60
+
+    # Calculate other metrics
+    steps_per_minute = steps_taken / duration_minutes if duration_minutes > 0 else 0
+    energy_expenditure = calories_burned * 4184  # Convert calories to joules
+    movement_efficiency = (accuracy_score / 100) * steps_taken
+    performance_score = (accuracy_score + movement_efficiency) / 2
+
+    return calories_burned, steps_per_minute, energy_expenditure, movement_efficiency, performance_score
+
+
+def session_summary(weight_kg, duration_minutes, total_score, total_frames, active_frames, steps_taken):
+    """Result fields for a finished session, keyed like `Result.create_result` arguments."""
+    final_average_score = total_score / total_frames if total_frames > 0 else 0  # Average over all frames
+    calories_burned, steps_per_minute, energy_expenditure, movement_efficiency, performance_score = calculate_metrics(
+        weight_kg, duration_minutes, steps_taken, final_average_score, active_frames, total_frames
+    )
+    return {
+        "accuracy_score": final_average_score,
+        "calories_burned": calories_burned,
+        "exercise_duration": duration_minutes,
+        "steps_taken": steps_taken,
+        "movement_efficiency": movement_efficiency,
+        "performance_score": performance_score,
+        "motion_matching_score": final_average_score,
+        "user_feedback": get_feedback(final_average_score)[0],
+        "energy_expenditure": energy_expenditure,
+        "steps_per_minute": steps_per_minute
+    }
+
+
+def completion_payload(summary):
+    """The `comparison_complete` event body for a session summary."""
+    return {
+        "final_score": summary["accuracy_score"],
+        "calories_burned": summary["calories_burned"],
+        "steps_taken": summary["steps_taken"],
+        "steps_per_minute": summary["steps_per_minute"],
+        "exercise_duration": summary["exercise_duration"],
+        "movement_efficiency": summary["movement_efficiency"],
+        "performance_score": summary["performance_score"],
+        "energy_expenditure": summary["energy_expenditure"],
+        "user_feedback": summary["user_feedback"]
+    }
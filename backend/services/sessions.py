@@ -0,0 +1,151 @@
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from services.metrics import LIVE_SESSIONS
+from services.socket_config import socketio
+
+# Session states
+STARTING = "starting"
+CALIBRATING = "calibrating"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+ACTIVE_STATES = (STARTING, CALIBRATING, RUNNING)
+
+# Finished sessions kept around so clients can still read their final status
+FINISHED_HISTORY = 100
+
+
+class SessionLimitReached(Exception):
+    pass
+
+
+class LiveSession:
+    """State of one live calibration/comparison run."""
+
+    def __init__(self, kind, video_id, user_id, camera_index=0, inference_budget_ms=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.video_id = video_id
+        self.user_id = user_id
+        self.camera_index = camera_index
+        # Average pose inference time allowed per frame; None runs inference on every frame
+        self.inference_budget_ms = inference_budget_ms
+        self.state = STARTING
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.stats = {}
+        self.pose = None
+        self.pipeline = None
+        self.streamer = None
+        self._stop_event = threading.Event()
+
+    @property
+    def room(self):
+        """Socket.IO room the session's events are emitted to."""
+        return self.id
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def wait(self, seconds):
+        """Sleep for `seconds`, returning True early if the session was stopped."""
+        return self._stop_event.wait(seconds)
+
+    def to_dict(self):
+        return {
+            "session_id": self.id,
+            "kind": self.kind,
+            "video_id": self.video_id,
+            "user_id": self.user_id,
+            "inference_budget_ms": self.inference_budget_ms,
+            "state": self.state,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stats": dict(self.stats),
+            "pipeline": self.pipeline.stats() if self.pipeline else None,
+            "streaming": self.streamer.stats() if self.streamer else None
+        }
+
+
+class SessionManager:
+    """Run live sessions on their own threads, each with a pooled Pose estimator."""
+
+    def __init__(self, pose_pool, max_sessions):
+        self.pose_pool = pose_pool
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        # Reentrant: start() counts active sessions while holding it
+        self._lock = threading.RLock()
+
+    def start(self, kind, video_id, user_id, target, camera_index=0, inference_budget_ms=None, before_start=None):
+        """Register a session and run `target(session)` on a new thread.
+
+        `before_start(session)` runs before the thread starts (e.g. to join the
+        caller's socket to the session room). Raises SessionLimitReached when
+        `max_sessions` sessions are already active.
+        """
+        session = LiveSession(kind, video_id, user_id, camera_index, inference_budget_ms)
+        with self._lock:
+            if self.active_count() >= self.max_sessions:
+                raise SessionLimitReached(f"At most {self.max_sessions} sessions can run at once")
+            self._sessions[session.id] = session
+            self._prune()
+
+        if before_start:
+            before_start(session)
+        threading.Thread(target=self._run, args=(session, target), daemon=True).start()
+        return session
+
+    def _run(self, session, target):
+        try:
+            with self.pose_pool.checkout() as pose:
+                session.pose = pose
+                target(session)
+            if session.state != FAILED:
+                session.state = FINISHED
+        except Exception as e:
+            print(f"Live session {session.id} ({session.kind}) failed:")
+            traceback.print_exc()
+            session.state = FAILED
+            session.error = str(e)
+            # Clients wait on frames; tell them to stop waiting
+            socketio.emit("session_error", {"session_id": session.id, "message": session.error}, to=session.room)
+        finally:
+            session.pose = None
+            session.finished_at = time.time()
+            LIVE_SESSIONS.inc(kind=session.kind, state=session.state)
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def stop(self, session_id):
+        session = self.get(session_id)
+        if session:
+            session.stop()
+        return session
+
+    def list_sessions(self, active_only=False):
+        """Snapshot of the sessions; safe to call from other threads (e.g. the metrics collector)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        if active_only:
+            sessions = [session for session in sessions if session.state in ACTIVE_STATES]
+        return sessions
+
+    def active_count(self):
+        return len(self.list_sessions(active_only=True))
+
+    def _prune(self):
+        finished = [key for key, session in self._sessions.items() if session.state not in ACTIVE_STATES]
+        for key in finished[:max(0, len(finished) - FINISHED_HISTORY)]:
+            del self._sessions[key]
@@ -0,0 +1,6 @@
+from flask_socketio import SocketIO
+
+socketio = SocketIO()
+
+def configure_socketio(app):
+    socketio.init_app(app, cors_allowed_origins="*")
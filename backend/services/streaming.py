@@ -0,0 +1,224 @@
+import base64
+import math
+import threading
+import time
+from collections import deque
+import cv2
+from services.socket_config import socketio
+
+# Quality / resolution / frame-rate ladder bounds
+MIN_QUALITY, MAX_QUALITY, QUALITY_STEP = 35, 85, 10
+MIN_SCALE, MAX_SCALE, SCALE_STEP = 0.4, 1.0, 0.1
+MIN_FPS = 5
+# Seconds between two adaptation decisions
+ADAPT_INTERVAL = 1.0
+# Unacknowledged frames older than this are treated as lost
+ACK_TIMEOUT = 2.0
+# Round-trip samples kept (~10 s at 30 fps); the smallest is the round trip without queueing
+RTT_SAMPLES = 300
+# Adaptation windows to wait before stepping up again after a step-up caused congestion (doubles, capped)
+MAX_STEP_UP_HOLD = 16
+
+_ENCODE_PARAMS = {
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+class FrameStreamer:
+    """Send video frames of one session as binary JPEG/WebP Socket.IO payloads.
+
+    Quality, resolution and frame rate are adapted once per ADAPT_INTERVAL to
+    stay under `target_bitrate` (bits/s). Clients acknowledge frames with a
+    `frame_ack` event; once they do, at most one round trip worth of frames
+    (at the current frame rate, using the smallest round trip measured, so
+    queueing delay still counts) plus `max_in_flight` may be unacknowledged,
+    and frames that would exceed that are dropped before encoding.
+    Step-downs lower quality first, then resolution, then frame rate;
+    step-ups restore quality and resolution before frame rate, and after a
+    step-up that led to congestion wait increasingly long before the next.
+    `observer(stage, seconds)`, when given, receives the encode, base64 and
+    socketio_emit timings. `clock` is for tests.
+    """
+
+    def __init__(self, session_id, room, target_bitrate, max_fps, image_format="jpeg",
+                 max_in_flight=2, binary=True, observer=None, clock=time.monotonic):
+        self.session_id = session_id
+        self.room = room
+        self.target_bitrate = target_bitrate
+        self.max_fps = max_fps
+        self.image_format = image_format if image_format in _ENCODE_PARAMS else "jpeg"
+        self.max_in_flight = max_in_flight
+        self.binary = binary
+        self.observer = observer
+        self.clock = clock
+
+        self.quality = MAX_QUALITY
+        self.scale = MAX_SCALE
+        self.fps = max_fps
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._acked_seq = 0
+        self._acks_enabled = False
+        self._last_ack_at = 0.0
+        self._last_sent_at = 0.0
+        self._sent_at = {}
+        self._rtt_samples = deque(maxlen=RTT_SAMPLES)
+        self.min_rtt = 0.0
+        self._window_started_at = clock()
+        self._window_bytes = 0
+        self._window_congested = False
+        self._stepped_up = False
+        self._step_up_hold = 0
+        self._hold_windows = 0
+
+        self.sent_frames = 0
+        self.sent_bytes = 0
+        self.skipped_rate = 0
+        self.skipped_backpressure = 0
+        self.bitrate = 0.0
+
+    def send(self, frame):
+        """Encode and emit `frame` unless rate limiting or backpressure drops it."""
+        now = self.clock()
+        with self._lock:
+            if self.fps < self.max_fps and now - self._last_sent_at < 1.0 / self.fps:
+                self.skipped_rate += 1
+                return False
+            if self._acks_enabled and self._seq - self._acked_seq >= self._in_flight_limit():
+                if now - self._last_ack_at > ACK_TIMEOUT:
+                    self._acked_seq = self._seq  # Stop waiting for acks that are not coming
+                    self._sent_at.clear()
+                    self._last_ack_at = now
+                self.skipped_backpressure += 1
+                self._window_congested = True
+                self._adapt(now)
+                return False
+            self._seq += 1
+            seq = self._seq
+            self._last_sent_at = now
+            self._sent_at[seq] = now
+            quality, scale = self.quality, self.scale
+
+        started = time.perf_counter()
+        if scale < MAX_SCALE:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        extension, quality_flag = _ENCODE_PARAMS[self.image_format]
+        _, buffer = cv2.imencode(extension, frame, [quality_flag, quality])
+        payload = buffer.tobytes()
+        started = self._observe("encode", started)
+
+        if self.binary:
+            message = {
+                "frame": payload,
+                "format": self.image_format,
+                "seq": seq,
+                "session_id": self.session_id,
+                "width": frame.shape[1],
+                "height": frame.shape[0]
+            }
+        else:
+            message = {"frame": base64.b64encode(payload).decode("utf-8")}
+            started = self._observe("base64", started)
+        socketio.emit("video_frame", message, to=self.room)
+        self._observe("socketio_emit", started)
+
+        with self._lock:
+            self.sent_frames += 1
+            self.sent_bytes += len(payload)
+            self._window_bytes += len(payload)
+            self._adapt(now)
+        return True
+
+    def _observe(self, stage, started):
+        """Report the time since `started` for `stage`; returns the new start time."""
+        now = time.perf_counter()
+        if self.observer:
+            self.observer(stage, now - started)
+        return now
+
+    def ack(self, seq):
+        """Record a client acknowledgement of frame `seq`."""
+        with self._lock:
+            now = self.clock()
+            self._acks_enabled = True
+            self._last_ack_at = now
+            sent_at = self._sent_at.get(seq)
+            if sent_at is not None:
+                self._rtt_samples.append(now - sent_at)
+                self.min_rtt = min(self._rtt_samples)
+            self._acked_seq = max(self._acked_seq, min(seq, self._seq))
+            for acked in [key for key in self._sent_at if key <= self._acked_seq]:
+                del self._sent_at[acked]
+
+    def _in_flight_limit(self):
+        """Unacknowledged frames allowed: a round trip's worth at the current rate, plus `max_in_flight`."""
+        return self.max_in_flight + math.ceil(self.min_rtt * self.fps)
+
+    def _adapt(self, now):
+        elapsed = now - self._window_started_at
+        if elapsed < ADAPT_INTERVAL:
+            return
+
+        self.bitrate = self._window_bytes * 8 / elapsed
+        if self._window_congested or self.bitrate > self.target_bitrate * 1.1:
+            if self._stepped_up:
+                # The last step-up did not fit: wait longer before trying again
+                self._step_up_hold = min(MAX_STEP_UP_HOLD, max(1, self._step_up_hold * 2))
+                self._hold_windows = self._step_up_hold
+            # Far over budget: take one step per doubling so large overshoots converge quickly
+            overshoot = self.bitrate / self.target_bitrate
+            for _ in range(min(4, max(1, math.ceil(math.log2(max(overshoot, 1.0)))))):
+                self._step_down()
+            self._stepped_up = False
+        elif self._hold_windows > 0:
+            self._hold_windows -= 1
+            self._stepped_up = False
+        elif self.bitrate < self.target_bitrate * 0.7:
+            self._stepped_up = self._step_up()
+        else:
+            self._stepped_up = False
+            self._step_up_hold = 0  # Settled within budget
+
+        self._window_started_at = now
+        self._window_bytes = 0
+        self._window_congested = False
+
+    def _step_down(self):
+        if self.quality > MIN_QUALITY:
+            self.quality = max(MIN_QUALITY, self.quality - QUALITY_STEP)
+        elif self.scale > MIN_SCALE:
+            self.scale = max(MIN_SCALE, round(self.scale - SCALE_STEP, 2))
+        else:
+            self.fps = max(MIN_FPS, self.fps * 0.75)
+
+    def _step_up(self):
+        """Take one step back towards full quality; False when already there."""
+        if self.quality < MAX_QUALITY:
+            self.quality = min(MAX_QUALITY, self.quality + QUALITY_STEP)
+        elif self.scale < MAX_SCALE:
+            self.scale = min(MAX_SCALE, round(self.scale + SCALE_STEP, 2))
+        elif self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps / 0.75)
+        else:
+            return False
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "format": self.image_format if self.binary else "base64",
+                "quality": self.quality,
+                "scale": self.scale,
+                "fps": round(self.fps, 2),
+                "bitrate": round(self.bitrate),
+                "target_bitrate": self.target_bitrate,
+                "in_flight": self._seq - self._acked_seq if self._acks_enabled else None,
+                "in_flight_limit": self._in_flight_limit(),
+                "min_rtt_ms": round(self.min_rtt * 1000, 1),
+                "sent_frames": self.sent_frames,
+                "sent_bytes": self.sent_bytes,
+                "skipped_rate": self.skipped_rate,
+                "skipped_backpressure": self.skipped_backpressure
+            }
@@ -0,0 +1,86 @@
+import os
+import shutil
+import uuid
+from config import Config
+
+_cloudinary_configured = False
+
+
+def configure_cloudinary():
+    """Import the Cloudinary SDK and apply CLOUDINARY_CLOUD_NAME/_API_KEY/_API_SECRET once.
+
+    Without those variables the SDK keeps its own configuration (CLOUDINARY_URL).
+    """
+    global _cloudinary_configured
+    import cloudinary
+
+    if not _cloudinary_configured:
+        credentials = {
+            "cloud_name": os.getenv("CLOUDINARY_CLOUD_NAME"),
+            "api_key": os.getenv("CLOUDINARY_API_KEY"),
+            "api_secret": os.getenv("CLOUDINARY_API_SECRET"),
+        }
+        credentials = {key: value for key, value in credentials.items() if value}
+        if credentials:
+            cloudinary.config(**credentials)
+        _cloudinary_configured = True
+    return cloudinary
+
+
+class CloudinaryUploader:
+    """Store videos in Cloudinary (production); the SDK is imported on first use."""
+
+    def upload_video(self, video_file, folder, public_id=None):
+        """Upload a video; with `public_id` a repeated upload overwrites the same asset."""
+        configure_cloudinary()
+        import cloudinary.uploader
+
+        options = {"public_id": public_id, "overwrite": True} if public_id else {}
+        upload_result = cloudinary.uploader.upload(
+            video_file,
+            resource_type="video",
+            folder=folder,  # Specify the folder for the video
+            eager=[{"width": 150, "height": 150, "crop": "fill", "format": "jpg"}],  # Generate thumbnail
+            **options
+        )
+        return {
+            "video_url": upload_result["secure_url"],
+            # The thumbnail URL will be available in the `eager` array of the upload response
+            "thumbnail_url": upload_result["eager"][0]["secure_url"],
+            "public_id": upload_result["public_id"]
+        }
+
+    def destroy_video(self, public_id):
+        configure_cloudinary()
+        import cloudinary.uploader
+
+        cloudinary.uploader.destroy(public_id, resource_type="video")
+
+
+class LocalUploader:
+    """Copy videos into a local directory; a stand-in for Cloudinary in development and tests."""
+
+    def __init__(self, root=None):
+        self.root = root or Config.LOCAL_UPLOAD_DIR
+
+    def upload_video(self, video_file, folder, public_id=None):
+        directory = os.path.join(self.root, folder)
+        os.makedirs(directory, exist_ok=True)
+        public_id = f"{folder}/{public_id or uuid.uuid4().hex}"
+        path = os.path.join(self.root, public_id + os.path.splitext(video_file)[1])
+        shutil.copyfile(video_file, path)
+        return {"video_url": path, "thumbnail_url": "", "public_id": public_id}
+
+    def destroy_video(self, public_id):
+        directory, name = os.path.split(os.path.join(self.root, public_id))
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if os.path.splitext(filename)[0] == name:
+                    os.remove(os.path.join(directory, filename))
+
+
+def get_uploader():
+    """Return the uploader selected by `Config.VIDEO_UPLOADER` ("cloudinary" or "local")."""
+    if Config.VIDEO_UPLOADER == "local":
+        return LocalUploader()
+    return CloudinaryUploader()
@@ -0,0 +1,151 @@
+import os
+import threading
+import uuid
+from config import Config
+
+CACHE_EXTENSION = ".mp4"
+
+
+class VideoCache:
+    """Local disk cache of reference videos transcoded to the live session display size.
+
+    Sessions read `width` x `height` files from `root` instead of streaming
+    and resizing the full-resolution Cloudinary original. Files are
+    written by ingestion jobs (and `manage.py cache-videos`), never by a
+    live session, and the least recently used are deleted to keep the
+    directory under `max_bytes`. Each video has a generation, bumped by
+    `invalidate()`; a transcode that started before an invalidation is
+    discarded instead of caching the replaced file.
+    """
+
+    def __init__(self, root, max_bytes, width, height):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.width = width
+        self.height = height
+        self._lock = threading.Lock()
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, video_id):
+        return os.path.join(self.root, f"{video_id}_{self.width}x{self.height}{CACHE_EXTENSION}")
+
+    def get(self, video_id):
+        """Path of the cached transcode (marked as recently used), or None."""
+        path = self.path_for(video_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def transcode(self, video_id, source):
+        """Decode `source` (a path or URL), resize it to the display size and cache it; returns the path or None."""
+        import cv2
+
+        video_id = str(video_id)
+        with self._lock:
+            generation = self._generations.get(video_id, 0)
+
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            return None
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path_for(video_id)
+        partial = os.path.join(self.root, f".{uuid.uuid4().hex}{CACHE_EXTENSION}")
+        size = (self.width, self.height)
+        writer = cv2.VideoWriter(partial, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        if not writer.isOpened():  # No encoder for mp4v, or the directory is not writable
+            capture.release()
+            self._discard(partial)
+            return None
+        try:
+            while True:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                if frame.shape[1::-1] != size:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+        finally:
+            capture.release()
+            writer.release()
+
+        try:
+            too_large = os.path.getsize(partial) > self.max_bytes  # Would evict everything else and still not fit
+        except FileNotFoundError:
+            return None
+        if too_large:
+            self._discard(partial)
+            return None
+        with self._lock:
+            if self._generations.get(video_id, 0) != generation:
+                self._discard(partial)  # The video was replaced or deleted meanwhile
+                return None
+            os.replace(partial, path)  # Readers never see a half-written file
+        self.evict()
+        return path
+
+    def invalidate(self, video_id):
+        """Delete a video's transcode after its file was replaced or the video deleted."""
+        video_id = str(video_id)
+        with self._lock:
+            self._generations[video_id] = self._generations.get(video_id, 0) + 1
+            self._discard(self.path_for(video_id))
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _files(self):
+        if not os.path.isdir(self.root):
+            return []
+        files = []
+        for name in os.listdir(self.root):
+            if name.endswith(CACHE_EXTENSION) and not name.startswith("."):
+                stat = os.stat(os.path.join(self.root, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        return files
+
+    def evict(self):
+        """Delete least recently used transcodes until the cache fits in `max_bytes`."""
+        with self._lock:
+            files = sorted(self._files())
+            total = sum(size for _, size, _ in files)
+            for _, size, name in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        files = self._files()
+        with self._lock:
+            return {
+                "files": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "size": [self.width, self.height],
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+video_cache = VideoCache(
+    Config.VIDEO_CACHE_DIR, Config.VIDEO_CACHE_BYTES, Config.VIDEO_CACHE_WIDTH, Config.VIDEO_CACHE_HEIGHT
+)
@@ -0,0 +1,72 @@
+import numpy as np
+from services.alignment import OnlineAligner
+
+NUM_KEYPOINTS = 33
+
+
+def reference_sequence(frames=300, seed=0):
+    """A smooth, non-repeating (T, 33, 2) reference motion."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.2, 0.8, size=(NUM_KEYPOINTS, 2))
+    frequency = rng.uniform(0.5, 1.5, size=(NUM_KEYPOINTS, 2))
+    phase = np.linspace(0, 2 * np.pi, frames)[:, None, None]
+    return (base + 0.1 * np.sin(phase * frequency + base * 10)).astype(np.float32)
+
+
+def warp():
+    """Reference index for each live frame: half speed, a pause, then double speed."""
+    slow = np.arange(0, 100, 0.5)
+    pause = np.full(30, 100.0)
+    fast = np.arange(100, 300, 2.0)
+    return np.concatenate([slow, pause, fast]).astype(int)
+
+
+def test_recovers_a_known_warp():
+    reference = reference_sequence()
+    rng = np.random.default_rng(1)
+    aligner = OnlineAligner(reference, lag_window=30, max_step=2)
+
+    found = []
+    for index in warp():
+        live_pose = reference[index] + rng.normal(0, 0.002, size=reference[index].shape)
+        found.append(aligner.update(live_pose)[0])
+
+    errors = np.abs(np.array(found) - warp())
+    assert errors.max() <= 2
+    assert np.all(np.diff(found) >= 0)  # The path never runs backwards
+
+
+def test_lagging_user_is_matched_behind_the_screen():
+    reference = reference_sequence()
+    aligner = OnlineAligner(reference, lag_window=30, max_step=2)
+
+    # The screen shows frame i while the user is still 15 frames behind
+    for on_screen in range(15, 200):
+        index, cost = aligner.update(reference[on_screen - 15], expected_index=on_screen)
+
+    assert index == 184
+    assert cost < 1e-6
+
+
+def test_missing_joints_are_ignored():
+    reference = reference_sequence()
+    aligner = OnlineAligner(reference)
+
+    for index in range(0, 120):
+        live_pose = reference[index].copy()
+        live_pose[:10] = np.nan
+        found, cost = aligner.update(live_pose)
+
+    assert found == 119
+    assert np.isfinite(cost)
+
+
+def test_reset_starts_from_the_first_frame():
+    reference = reference_sequence()
+    aligner = OnlineAligner(reference)
+    for index in range(50):
+        aligner.update(reference[index])
+
+    aligner.reset()
+
+    assert aligner.update(reference[0])[0] == 0
@@ -0,0 +1,39 @@
+import pytest
+from services.extraction import MIN_CHUNK_FRAMES, plan_chunks
+
+
+def covered_frames(ranges, frame_count):
+    return [frame for start, end in ranges for frame in range(start, frame_count if end is None else end)]
+
+
+@pytest.mark.parametrize("frame_count", [0, 1, 299, 300, 599, 600, 1000, 5401])
+@pytest.mark.parametrize("workers", [1, 2, 4, 16])
+def test_chunks_cover_every_frame_once(frame_count, workers):
+    ranges = plan_chunks(frame_count, workers)
+
+    assert 1 <= len(ranges) <= workers
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] is None
+    for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start
+    assert covered_frames(ranges, frame_count) == list(range(frame_count))
+
+
+@pytest.mark.parametrize("frame_count", [600, 1000, 5401])
+def test_chunks_are_at_least_min_chunk_frames(frame_count):
+    ranges = plan_chunks(frame_count, 16)
+    bounds = [start for start, _ in ranges] + [frame_count]
+
+    assert all(end - start >= MIN_CHUNK_FRAMES for start, end in zip(bounds, bounds[1:]))
+
+
+def test_short_video_or_single_worker_is_one_open_ended_chunk():
+    assert plan_chunks(MIN_CHUNK_FRAMES - 1, 8) == [(0, None)]
+    assert plan_chunks(10_000, 1) == [(0, None)]
+    assert plan_chunks(0, 4) == [(0, None)]
+
+
+def test_chunk_boundaries():
+    assert plan_chunks(1000, 4, min_chunk_frames=300) == [(0, 333), (333, 666), (666, None)]
+    assert plan_chunks(1000, 2, min_chunk_frames=300) == [(0, 500), (500, None)]
+    assert plan_chunks(1000, 4, min_chunk_frames=0) == [(0, 250), (250, 500), (500, 750), (750, None)]
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from models.motion import MOTION_FORMAT_VERSION, pack_motion_arrays, unpack_motion_arrays
+from services.keyframes import interpolate_keyframes, reconstruction_error, select_keyframes
+from services.pose_features import pose_features
+
+NUM_KEYPOINTS = 33
+
+
+def synthetic_motion(frames=240, fps=30.0, seed=0):
+    """A smooth (T, 33, 3) pose sequence with a held pose in the middle, plus visibility."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.2, 0.8, size=(NUM_KEYPOINTS, 3))
+    phase = np.linspace(0, 4 * np.pi, frames)
+    phase[frames // 3:frames // 2] = phase[frames // 3]
+    keypoints = (base + 0.05 * np.sin(phase[:, None, None] + base * 10)).astype(np.float32)
+    visibility = rng.uniform(0.5, 1.0, size=(frames, NUM_KEYPOINTS)).astype(np.float32)
+    frame_numbers = np.arange(frames, dtype=np.int32)
+    timestamps = (frame_numbers / fps).astype(np.float32)
+    return frame_numbers, timestamps, keypoints, visibility
+
+
+def legacy_document(frame_numbers, timestamps, keypoints, visibility):
+    """A version 1 document: `frames` as a list of `keypoint_N` dicts."""
+    return {
+        "video_id": "video",
+        "fps": 30.0,
+        "frames": [
+            {
+                "frame_no": int(frame_no),
+                "timestamp": float(timestamp),
+                "keypoints": {
+                    f"keypoint_{i}": {"x": float(x), "y": float(y), "z": float(z), "score": float(score)}
+                    for i, ((x, y, z), score) in enumerate(zip(pose, scores))
+                },
+            }
+            for frame_no, timestamp, pose, scores in zip(frame_numbers, timestamps, keypoints, visibility)
+        ],
+    }
+
+
+def assert_round_trip(arrays, frame_numbers, timestamps, keypoints, visibility):
+    np.testing.assert_array_equal(arrays["frame_numbers"], frame_numbers)
+    np.testing.assert_array_equal(arrays["timestamps"], timestamps)
+    np.testing.assert_array_equal(arrays["keypoints"], keypoints)
+    np.testing.assert_array_equal(arrays["visibility"], visibility)
+
+    normalized, angles = pose_features(keypoints)
+    np.testing.assert_allclose(arrays["normalized"], normalized, atol=1e-6)
+    np.testing.assert_allclose(arrays["angles"], angles, atol=1e-5)
+
+
+def test_v3_round_trip():
+    frame_numbers, timestamps, keypoints, visibility = synthetic_motion()
+    document = pack_motion_arrays(frame_numbers, timestamps, keypoints, visibility)
+
+    assert document["format_version"] == MOTION_FORMAT_VERSION == 3
+    assert_round_trip(unpack_motion_arrays(document), frame_numbers, timestamps, keypoints, visibility)
+
+
+def test_v2_round_trip_recomputes_features():
+    frame_numbers, timestamps, keypoints, visibility = synthetic_motion()
+    document = pack_motion_arrays(frame_numbers, timestamps, keypoints, visibility)
+    for key in ("normalized", "angles", "num_angles"):
+        del document[key]
+    document["format_version"] = 2
+
+    assert_round_trip(unpack_motion_arrays(document), frame_numbers, timestamps, keypoints, visibility)
+
+
+def test_v1_legacy_frames_round_trip():
+    frame_numbers, timestamps, keypoints, visibility = synthetic_motion(frames=60)
+    arrays = unpack_motion_arrays(legacy_document(frame_numbers, timestamps, keypoints, visibility))
+
+    assert arrays["video_id"] == "video"
+    assert_round_trip(arrays, frame_numbers, timestamps, keypoints, visibility)
+
+
+def test_v1_and_v3_unpack_to_the_same_arrays():
+    motion = synthetic_motion(frames=60)
+    legacy = unpack_motion_arrays(legacy_document(*motion))
+    packed = unpack_motion_arrays(pack_motion_arrays(*motion))
+
+    for key in ("frame_numbers", "timestamps", "keypoints", "visibility", "normalized", "angles"):
+        np.testing.assert_allclose(legacy[key], packed[key], atol=1e-5)
+
+
+@pytest.mark.parametrize("max_error", [0.0025, 0.01, 0.02])
+def test_keyframe_round_trip_stays_within_bound(max_error):
+    frame_numbers, timestamps, keypoints, visibility = synthetic_motion()
+    document = pack_motion_arrays(frame_numbers, timestamps, keypoints, visibility, keyframe_error=max_error)
+
+    assert document["keyframe_count"] < len(keypoints)
+    assert document["sampling"]["max_error"] <= max_error + 1e-6
+
+    arrays = unpack_motion_arrays(document)
+    assert arrays["keypoints"].shape == keypoints.shape
+    assert arrays["visibility"].shape == visibility.shape
+    np.testing.assert_array_equal(arrays["frame_numbers"], frame_numbers)
+    distances = np.linalg.norm(arrays["keypoints"][..., :2] - keypoints[..., :2], axis=-1)
+    assert distances.max() <= max_error + 1e-6
+    assert arrays["sampling"] == document["sampling"]
+
+
+def test_select_keyframes_keeps_ends_and_collapses_held_pose():
+    _, _, keypoints, _ = synthetic_motion()
+    keyframes = select_keyframes(keypoints, 0.005)
+
+    assert keyframes[0] == 0 and keyframes[-1] == len(keypoints) - 1
+    assert np.all(np.diff(keyframes) > 0)
+    # The held pose (frames T/3..T/2) is spanned by one interpolated segment
+    held_start, held_end = len(keypoints) // 3, len(keypoints) // 2 - 1
+    assert np.count_nonzero((keyframes >= held_start) & (keyframes <= held_end)) <= 2
+    assert reconstruction_error(keypoints, keyframes) <= 0.005
+
+
+def test_interpolate_keyframes():
+    values = np.array([[0.0, 10.0], [4.0, 30.0], [4.0, 30.0]], dtype=np.float32)
+    rebuilt = interpolate_keyframes([2, 6, 8], values, 10)
+
+    np.testing.assert_array_equal(rebuilt[[2, 6, 8]], values)
+    np.testing.assert_allclose(rebuilt[4], [2.0, 20.0])
+    np.testing.assert_array_equal(rebuilt[:2], values[[0, 0]])  # Before the first keyframe
+    np.testing.assert_array_equal(rebuilt[9], values[2])  # After the last keyframe
+    np.testing.assert_array_equal(interpolate_keyframes([3], values[:1], 4), values[[0, 0, 0, 0]])
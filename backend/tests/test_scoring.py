@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from services.scoring import frames_to_array, pose_to_array, score_pose, score_sequence
+
+NUM_KEYPOINTS = 33
+
+
+# The dict-based scoring the vectorized functions replaced, kept verbatim as the reference
+def dict_similarity(ref_pose, live_pose):
+    if len(ref_pose) != len(live_pose):
+        return 0
+
+    total_score = 0
+    num_keypoints = len(ref_pose)
+
+    for i in range(num_keypoints):
+        ref_key = f"keypoint_{i}"
+        live_key = f"keypoint_{i}"
+
+        if ref_key in ref_pose and live_key in live_pose:
+            ref_coords = np.array([ref_pose[ref_key]['x'], ref_pose[ref_key]['y']])
+            live_coords = np.array([live_pose[live_key]['x'], live_pose[live_key]['y']])
+            distance = np.linalg.norm(ref_coords - live_coords)
+            total_score += max(0, 1 - distance)
+
+    return (total_score / num_keypoints) * 100
+
+
+def dict_distance(ref_pose, live_pose):
+    if len(ref_pose) != len(live_pose):
+        return float('inf')
+
+    total_distance = 0
+    num_keypoints = len(ref_pose)
+
+    for i in range(num_keypoints):
+        ref_key = f"keypoint_{i}"
+        live_key = f"keypoint_{i}"
+
+        if ref_key in ref_pose and live_key in live_pose:
+            ref_coords = np.array([ref_pose[ref_key]['x'], ref_pose[ref_key]['y']])
+            live_coords = np.array([live_pose[live_key]['x'], live_pose[live_key]['y']])
+            distance = np.linalg.norm(ref_coords - live_coords)
+            total_distance += distance
+
+    return total_distance / num_keypoints
+
+
+def random_pose(rng, spread=1.0):
+    coords = rng.uniform(0, spread, size=(NUM_KEYPOINTS, 3))
+    return {f"keypoint_{i}": {"x": float(x), "y": float(y), "z": float(z)} for i, (x, y, z) in enumerate(coords)}
+
+
+def perturbed(pose, rng, scale):
+    return {
+        key: {axis: value + float(rng.normal(0, scale)) for axis, value in keypoint.items()}
+        for key, keypoint in pose.items()
+    }
+
+
+@pytest.mark.parametrize("scale", [0.0, 0.01, 0.1, 0.5, 2.0])
+def test_score_pose_matches_dict_scoring(scale):
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        ref_pose = random_pose(rng)
+        live_pose = perturbed(ref_pose, rng, scale)
+
+        similarity, distance, errors = score_pose(pose_to_array(ref_pose), pose_to_array(live_pose))
+
+        assert similarity == pytest.approx(dict_similarity(ref_pose, live_pose), abs=1e-4)
+        assert distance == pytest.approx(dict_distance(ref_pose, live_pose), abs=1e-5)
+        assert errors.shape == (NUM_KEYPOINTS,)
+
+
+def test_missing_keypoints_drop_out_like_dict_scoring():
+    rng = np.random.default_rng(2)
+    ref_pose = random_pose(rng)
+    live_pose = perturbed(ref_pose, rng, 0.05)
+    for pose in (ref_pose, live_pose):
+        del pose["keypoint_5"], pose["keypoint_20"]
+
+    similarity, distance, errors = score_pose(pose_to_array(ref_pose), pose_to_array(live_pose))
+
+    assert similarity == pytest.approx(dict_similarity(ref_pose, live_pose), abs=1e-4)
+    assert distance == pytest.approx(dict_distance(ref_pose, live_pose), abs=1e-5)
+    assert np.isnan(errors[5]) and np.isnan(errors[20])
+
+
+def test_mismatched_poses_score_zero():
+    rng = np.random.default_rng(3)
+    ref_pose = random_pose(rng)
+    live_pose = dict(ref_pose)
+    del live_pose["keypoint_0"]
+
+    similarity, distance, errors = score_pose(pose_to_array(ref_pose), pose_to_array(live_pose))
+
+    assert (similarity, distance, errors) == (0.0, float("inf"), None)
+    assert dict_similarity(ref_pose, live_pose) == 0
+
+
+def test_score_sequence_matches_per_frame_dict_scoring():
+    rng = np.random.default_rng(4)
+    ref_frames = [{"keypoints": random_pose(rng)} for _ in range(50)]
+    live_frames = [{"keypoints": perturbed(frame["keypoints"], rng, 0.2)} for frame in ref_frames]
+
+    similarity, distance, errors = score_sequence(frames_to_array(ref_frames), frames_to_array(live_frames))
+
+    expected_similarity = [dict_similarity(r["keypoints"], l["keypoints"]) for r, l in zip(ref_frames, live_frames)]
+    expected_distance = [dict_distance(r["keypoints"], l["keypoints"]) for r, l in zip(ref_frames, live_frames)]
+    np.testing.assert_allclose(similarity, expected_similarity, atol=1e-4)
+    np.testing.assert_allclose(distance, expected_distance, atol=1e-5)
+    assert errors.shape == (50, NUM_KEYPOINTS)
+
+
+def test_score_sequence_rejects_mismatched_shapes():
+    with pytest.raises(ValueError):
+        score_sequence(np.zeros((10, NUM_KEYPOINTS, 2)), np.zeros((9, NUM_KEYPOINTS, 2)))
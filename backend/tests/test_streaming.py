@@ -0,0 +1,71 @@
+import heapq
+import numpy as np
+import pytest
+import services.streaming as streaming
+from services.streaming import FrameStreamer, MAX_QUALITY, MAX_SCALE
+
+
+class FakeSocketIO:
+    def emit(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_socketio(monkeypatch):
+    monkeypatch.setattr(streaming, "socketio", FakeSocketIO())
+
+
+def stream(rtt, bandwidth=None, seconds=30, fps=30, target_bitrate=4_000_000):
+    """Send `seconds` of frames through a link with round trip `rtt` and `bandwidth` bits/s (None: unlimited).
+
+    A frame's ack arrives `rtt` after the frame has crossed the link; the
+    clock is simulated.
+    """
+    now = [0.0]
+    streamer = FrameStreamer("session", "room", target_bitrate, fps, clock=lambda: now[0])
+    y, x = np.mgrid[0:240, 0:320]
+    frame = np.dstack([x % 256, y % 256, (x + y) % 256]).astype(np.uint8)
+
+    acks, link_free_at = [], 0.0
+    for i in range(seconds * fps):
+        frame_time = i / fps
+        while acks and acks[0][0] <= frame_time:
+            now[0], seq = heapq.heappop(acks)
+            streamer.ack(seq)
+        now[0] = frame_time
+
+        sent_bytes = streamer.sent_bytes
+        if streamer.send(frame):
+            size = streamer.sent_bytes - sent_bytes
+            link_free_at = max(link_free_at, frame_time) + (size * 8 / bandwidth if bandwidth else 0.0)
+            heapq.heappush(acks, (link_free_at + rtt, streamer.sent_frames))
+    return streamer
+
+
+@pytest.mark.parametrize("rtt", [0.02, 0.1, 0.3])
+def test_round_trip_latency_is_not_congestion(rtt):
+    streamer = stream(rtt)
+
+    assert (streamer.quality, streamer.scale, streamer.fps) == (MAX_QUALITY, MAX_SCALE, 30)
+    assert streamer.skipped_backpressure == 0
+    assert streamer.min_rtt == pytest.approx(rtt)
+
+
+def test_slow_link_steps_down_to_its_bandwidth():
+    streamer = stream(0.05, bandwidth=500_000)
+
+    assert streamer.quality < MAX_QUALITY or streamer.scale < MAX_SCALE
+    assert streamer.bitrate < 500_000
+
+
+def test_step_up_restores_quality_and_scale_before_fps():
+    streamer = FrameStreamer("session", "room", 4_000_000, 30, clock=lambda: 0.0)
+    streamer.quality, streamer.scale, streamer.fps = 35, 0.4, 10
+
+    steps = []
+    while streamer._step_up():
+        steps.append((streamer.quality, streamer.scale, streamer.fps))
+
+    assert steps[-1] == (MAX_QUALITY, MAX_SCALE, 30)
+    first_fps_step = next(i for i, (_, _, fps) in enumerate(steps) if fps > 10)
+    assert all(step[:2] == (MAX_QUALITY, MAX_SCALE) for step in steps[first_fps_step:])
@@ -0,0 +1,4 @@
+"""WSGI entry point for `flask --app wsgi run` or a WSGI server (`wsgi:app`); app.py stays the dev launcher."""
+from app import create_app
+
+app = create_app()
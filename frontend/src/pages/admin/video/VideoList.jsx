@@ -247,17 +247,54 @@ const VideoList = () => {
       const url = editMode ? `http://localhost:5000/api/videos/${selectedVideo.id}` : "http://localhost:5000/api/videos/";
       const method = editMode ? axios.put : axios.post;
 
-      await method(url, formData, { headers: { Authorization: `Bearer ${getToken()}` } });
+      const { data } = await method(url, formData, { headers: { Authorization: `Bearer ${getToken()}` } });
+      setShowModal(false);
+
+      // Uploaded files are processed in the background; follow the ingestion job
+      if (data.job_id) {
+        toast.info("Processing video...");
+        const job = await waitForJob(data.job_id);
+        if (!job) {
+          // The upload was accepted; only following its progress failed or took too long
+          fetchVideos();
+          toast.info("Video saved and still processing; it will be ready shortly");
+          setActionLoading(false);
+          return;
+        }
+        if (job.state === "failed") {
+          toast.error(`Failed to process video: ${job.error}`);
+          setActionLoading(false);
+          return;
+        }
+      }
 
       fetchVideos();
       toast.success(editMode ? "Video updated successfully" : "Video added successfully");
-      setShowModal(false);
     } catch {
       toast.error("Failed to save video");
     }
     setActionLoading(false);
   };
 
+  // Poll an ingestion job until it finishes; null if it is still running at the deadline
+  const waitForJob = async (jobId, deadlineMs = 10 * 60 * 1000) => {
+    const deadline = Date.now() + deadlineMs;
+    let delay = 1000;
+    while (Date.now() < deadline) {
+      try {
+        const { data: job } = await axios.get(`http://localhost:5000/api/videos/jobs/${jobId}`, {
+          headers: { Authorization: `Bearer ${getToken()}` },
+        });
+        if (job.state === "done" || job.state === "failed") return job;
+      } catch (error) {
+        console.error("Error polling ingestion job", error); // Transient; keep polling until the deadline
+      }
+      await new Promise((resolve) => setTimeout(resolve, Math.min(delay, Math.max(0, deadline - Date.now()))));
+      delay = Math.min(delay * 2, 15000);
+    }
+    return null;
+  };
+
   const handlePlayVideo = (videoUrl, e) => {
     e.stopPropagation();
     window.open(videoUrl, "_blank");
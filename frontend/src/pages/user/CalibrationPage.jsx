@@ -1,8 +1,9 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { io } from "socket.io-client";
 import axios from "axios";
 import { getUserId } from "../../utils/auth";
+import { frameToImageSrc, releaseFrameUrl } from "../../utils/videoFrame";
 import Loader from '../../components/Layout/Loader';
 
 const CalibrationPage = () => {
@@ -12,14 +13,16 @@ const CalibrationPage = () => {
   const [distance, setDistance] = useState(0);
   const [isCalibrated, setIsCalibrated] = useState(false);
   const [socket, setSocket] = useState(null);
+  const frameUrlRef = useRef(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [errorMessage, setErrorMessage] = useState(null);
 
   useEffect(() => {
     const newSocket = io("http://localhost:5000");
     setSocket(newSocket);
 
     newSocket.on("video_frame", (data) => {
-      setLiveFrame(data.frame);
+      setLiveFrame(frameToImageSrc(newSocket, data, frameUrlRef));
       setIsLoading(false);
     });
 
@@ -30,12 +33,22 @@ const CalibrationPage = () => {
       }
     });
 
-    newSocket.on("calibration_complete", () => {
-      navigate(`/pose-comparison/${videoId}`); // Navigate to the comparison page
+    const handleSessionError = (data) => {
+      setLiveFrame(null);
+      setIsLoading(false);
+      setErrorMessage(data.message || "Calibration stopped unexpectedly");
+    };
+    newSocket.on("calibration_error", handleSessionError);
+    newSocket.on("session_error", handleSessionError);
+
+    newSocket.on("calibration_complete", (data) => {
+      // The comparison continues in the same session; hand its ID to the comparison page
+      navigate(`/pose-comparison/${videoId}`, { state: { sessionId: data.session_id } });
     });
 
     return () => {
       newSocket.disconnect();
+      releaseFrameUrl(frameUrlRef);
     };
   }, [navigate, videoId]);
 
@@ -46,11 +59,13 @@ const CalibrationPage = () => {
       return;
     }
 
+    setErrorMessage(null);
     setIsLoading(true);
     try {
       const response = await axios.post("http://localhost:5000/start_calibration", {
         video_id: videoId,
         user_id: userId,
+        socket_id: socket?.id,
       });
       if (response.status === 200) {
         console.log("Calibration started");
@@ -108,6 +123,10 @@ const CalibrationPage = () => {
       color: "green",
       fontWeight: "bold",
     },
+    errorMessage: {
+      color: "red",
+      fontWeight: "bold",
+    },
     startButton: {
       padding: "15px 25px",
       fontSize: "25px",
@@ -135,7 +154,7 @@ const CalibrationPage = () => {
             <Loader />
           ) : (
             <img
-              src={`data:image/jpeg;base64,${liveFrame}`}
+              src={liveFrame}
               alt="Live Feed"
               style={styles.liveFrame}
             />
@@ -147,6 +166,7 @@ const CalibrationPage = () => {
         <h1 style={styles.controlsH1}>Calibration: Adjust Your Position</h1>
         <p style={styles.controlsP}>Distance to correct position: {distance.toFixed(2)}</p>
         {isCalibrated && <p style={styles.successMessage}>You are in the correct position!</p>}
+        {errorMessage && <p style={styles.errorMessage}>{errorMessage}</p>}
 
         <button
           style={styles.startButton}
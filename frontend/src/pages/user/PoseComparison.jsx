@@ -1,8 +1,9 @@
-import React, { useState, useEffect } from "react";
-import { useParams, useNavigate } from "react-router-dom"; // Import useNavigate
+import React, { useState, useEffect, useRef } from "react";
+import { useParams, useNavigate, useLocation } from "react-router-dom"; // Import useNavigate
 import { io } from "socket.io-client";
 import axios from "axios";
 import { getUserId } from "../../utils/auth";
+import { frameToImageSrc, releaseFrameUrl } from "../../utils/videoFrame";
 import Loader from '../../components/Layout/Loader';
 import ResultsModal from './ResultModal';
 import "./../../css/PoseComparisonPage.css";
@@ -10,22 +11,50 @@ import "./../../css/PoseComparisonPage.css";
 const PoseComparisonPage = () => {
   const { videoId } = useParams();
   const navigate = useNavigate(); // Initialize useNavigate
+  const location = useLocation();
   const [comparisonStatus, setComparisonStatus] = useState(false);
   const [liveFrame, setLiveFrame] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [showResultsModal, setShowResultsModal] = useState(false);
   const [results, setResults] = useState({});
+  const [errorMessage, setErrorMessage] = useState(null);
   const [socket, setSocket] = useState(null);
+  const frameUrlRef = useRef(null);
+  const [sessionId, setSessionId] = useState(location.state?.sessionId || null);
+  // Read by the connect handler, which outlives renders and fires again on every reconnect
+  const sessionIdRef = useRef(location.state?.sessionId || null);
+  const startRequestedRef = useRef(false);
 
   useEffect(() => {
     const newSocket = io("http://localhost:5000");
     setSocket(newSocket);
 
+    newSocket.on("connect", () => {
+      if (sessionIdRef.current) {
+        // Session started by calibration, or a reconnect: (re)subscribe to its room
+        setIsLoading(true);
+        newSocket.emit("join_session", { session_id: sessionIdRef.current });
+      } else if (!startRequestedRef.current) {
+        // Automatically start comparison (once) when the socket can first join the session room
+        startRequestedRef.current = true;
+        startComparison(newSocket.id);
+      }
+    });
+
     newSocket.on("video_frame", (data) => {
-      setLiveFrame(data.frame);
+      setLiveFrame(frameToImageSrc(newSocket, data, frameUrlRef));
       setIsLoading(false);
     });
 
+    const handleSessionError = (data) => {
+      setComparisonStatus(false);
+      setLiveFrame(null);
+      setIsLoading(false);
+      setErrorMessage(data.message || "The comparison stopped unexpectedly");
+    };
+    newSocket.on("comparison_error", handleSessionError);
+    newSocket.on("session_error", handleSessionError);
+
     newSocket.on("comparison_complete", (data) => {
       setComparisonStatus(false);
       setLiveFrame(null);
@@ -34,32 +63,35 @@ const PoseComparisonPage = () => {
       setShowResultsModal(true); // Show the results modal
     });
 
-    // Automatically start comparison when the component mounts
-    startComparison();
-
     return () => {
       newSocket.disconnect();
+      releaseFrameUrl(frameUrlRef);
     };
   }, []);
 
-  const startComparison = async () => {
+  const startComparison = async (socketId) => {
     const userId = getUserId();
     if (!userId) {
       console.error("User ID not found in session storage");
       return;
     }
 
+    setErrorMessage(null);
     setIsLoading(true);
     try {
       const response = await axios.post("http://localhost:5000/start_comparison", {
         video_id: videoId,
         user_id: userId,
+        socket_id: socketId,
       });
       if (response.status === 200) {
+        sessionIdRef.current = response.data.session_id;
+        setSessionId(response.data.session_id);
         setComparisonStatus(true);
       }
     } catch (error) {
       console.error("Error starting comparison", error);
+      startRequestedRef.current = false;
       setComparisonStatus(false);
       setIsLoading(false);
     }
@@ -67,7 +99,7 @@ const PoseComparisonPage = () => {
 
   const stopComparison = () => {
     if (socket) {
-      socket.emit("stop_comparison");
+      socket.emit("stop_comparison", { session_id: sessionId });
       setComparisonStatus(false);
       setLiveFrame(null);
       setIsLoading(false);
@@ -87,13 +119,15 @@ const PoseComparisonPage = () => {
         </button>
       </div>
 
+      {errorMessage && <p className="error-message">{errorMessage}</p>}
+
       <div className="comparison-results">
         <div className="frame-container">
           {isLoading ? (
             <Loader />
           ) : liveFrame ? (
             <img
-              src={`data:image/jpeg;base64,${liveFrame}`}
+              src={liveFrame}
               alt="Live Comparison"
               className="live-frame"
             />
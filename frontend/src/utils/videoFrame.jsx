@@ -0,0 +1,24 @@
+// Turns a `video_frame` Socket.IO payload into an <img> src.
+// Binary frames arrive as ArrayBuffers and are acknowledged so the server can
+// apply backpressure; legacy base64 frames are passed through as data URLs.
+export const frameToImageSrc = (socket, data, previousUrlRef) => {
+  if (typeof data.frame === "string") {
+    return `data:image/jpeg;base64,${data.frame}`;
+  }
+
+  const url = URL.createObjectURL(new Blob([data.frame], { type: `image/${data.format}` }));
+  if (previousUrlRef.current) {
+    URL.revokeObjectURL(previousUrlRef.current);
+  }
+  previousUrlRef.current = url;
+
+  socket.emit("frame_ack", { session_id: data.session_id, seq: data.seq });
+  return url;
+};
+
+export const releaseFrameUrl = (previousUrlRef) => {
+  if (previousUrlRef.current) {
+    URL.revokeObjectURL(previousUrlRef.current);
+    previousUrlRef.current = null;
+  }
+};